@@ -0,0 +1,298 @@
+# bench_clique.py - Набор бенчмарков движков поиска клики
+
+import argparse
+import itertools
+import json
+import platform
+import random
+import os
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+from clique_app import SEARCH_ENGINES
+
+
+def gnp_graph(n, p, seed=0):
+    # Случайный граф Эрдёша–Реньи G(n, p)
+    rng = random.Random(seed)
+    graph = [[0] * n for _ in range(n)]
+    for i, j in itertools.combinations(range(n), 2):
+        if rng.random() < p:
+            graph[i][j] = graph[j][i] = 1
+    return graph
+
+
+def complete_multipartite_graph(part_sizes):
+    # Вершины разных долей смежны, внутри доли ребер нет;
+    # кликовое число равно числу долей
+    part_of = [part for part, size in enumerate(part_sizes) for _ in range(size)]
+    n = len(part_of)
+    return [[int(part_of[i] != part_of[j]) for j in range(n)] for i in range(n)]
+
+
+def moon_moser_graph(n):
+    # Граф Муна–Мозера: n/3 долей по 3 вершины, 3^(n/3) максимальных клик —
+    # наихудший случай для перечисления клик
+    if n % 3:
+        raise ValueError("Число вершин графа Муна–Мозера должно делиться на 3")
+    return complete_multipartite_graph([3] * (n // 3))
+
+
+def hidden_clique_graph(n, p, clique_size, seed=0):
+    # Аналог brock-графов DIMACS: G(n, p) со спрятанной кликой; вершины
+    # клики теряют часть ребер наружу, чтобы степени их не выдавали
+    rng = random.Random(seed)
+    graph = gnp_graph(n, p, seed)
+    clique = rng.sample(range(n), clique_size)
+    members = set(clique)
+
+    for i, j in itertools.combinations(clique, 2):
+        graph[i][j] = graph[j][i] = 1
+    extra = (clique_size - 1) * (1 - p)
+    for i in clique:
+        outside = [j for j in range(n) if j not in members and graph[i][j]]
+        for j in rng.sample(outside, min(len(outside), round(extra))):
+            graph[i][j] = graph[j][i] = 0
+    return graph
+
+
+def p_hat_graph(n, a, b, seed=0):
+    # Аналог p_hat-графов DIMACS: вероятность ребра зависит от вершин,
+    # поэтому степени сильно различаются при плотности около (a + b) / 2
+    rng = random.Random(seed)
+    weights = [rng.uniform(a, b) for _ in range(n)]
+    graph = [[0] * n for _ in range(n)]
+    for i, j in itertools.combinations(range(n), 2):
+        if rng.random() < (weights[i] + weights[j]) / 2:
+            graph[i][j] = graph[j][i] = 1
+    return graph
+
+
+GENERATORS = {
+    "gnp": gnp_graph,
+    "moon_moser": moon_moser_graph,
+    "multipartite": complete_multipartite_graph,
+    "hidden_clique": hidden_clique_graph,
+    "p_hat": p_hat_graph,
+}
+
+# Семейство, параметры генератора и значения k для перебора
+DEFAULT_SUITE = (
+    [("gnp", {"n": n, "p": 0.5, "seed": 0}, (6, 8, 10)) for n in (25, 50, 100)]
+    + [("gnp", {"n": 80, "p": 0.7, "seed": 0}, (10, 12))]
+    + [("moon_moser", {"n": n}, (n // 3, n // 3 + 1)) for n in (12, 18, 24)]
+    + [
+        ("multipartite", {"part_sizes": [2, 3, 4, 5, 6]}, (5, 6)),
+        (
+            "hidden_clique",
+            {"n": 100, "p": 0.5, "clique_size": 12, "seed": 0},
+            (11, 12, 13),
+        ),
+        ("p_hat", {"n": 100, "a": 0.25, "b": 0.75, "seed": 0}, (10, 11)),
+    ]
+)
+
+QUICK_SUITE = [
+    ("gnp", {"n": 12, "p": 0.5, "seed": 0}, (3, 4)),
+    ("moon_moser", {"n": 9}, (3, 4)),
+    ("hidden_clique", {"n": 15, "p": 0.5, "clique_size": 5, "seed": 0}, (5,)),
+]
+
+DEFAULT_ENGINES = ("bitset", "numpy", "iterative")
+
+
+def time_search(search, graph, k, repeat=5):
+    # Повторные замеры perf_counter; шаги одинаковы во всех повторах
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        found, steps, _ = search(graph, k)
+        timings.append(time.perf_counter() - start)
+
+    median_time = statistics.median(timings)
+    return {
+        "found": found,
+        "steps": steps,
+        "repeat": repeat,
+        "min_time": min(timings),
+        "median_time": median_time,
+        "mean_time": statistics.fmean(timings),
+        "steps_per_sec": steps / median_time if median_time > 0 else 0.0,
+    }
+
+
+# Модули, время импорта которых замеряется, и модули, которые при этом
+# не должны загружаться
+IMPORT_MODULES = ("clique_app", "main")
+HEAVY_MODULES = ("numpy", "matplotlib", "networkx", "sqlite3", "multiprocessing")
+
+_IMPORT_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"time": elapsed, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure_import_time(module, repeat=5):
+    # Каждый замер — в новом интерпретаторе, иначе модуль уже в sys.modules
+    directory = os.path.dirname(os.path.abspath(__file__))
+    code = _IMPORT_PROBE.format(module=module, heavy=HEAVY_MODULES)
+    timings = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=directory,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        probe = json.loads(output)
+        timings.append(probe["time"])
+    return {
+        "module": module,
+        "repeat": repeat,
+        "min_time": min(timings),
+        "median_time": statistics.median(timings),
+        "loaded": probe["loaded"],
+    }
+
+
+def run_benchmarks(suite=DEFAULT_SUITE, engines=DEFAULT_ENGINES, repeat=5):
+    results = []
+    for family, params, k_values in suite:
+        graph = GENERATORS[family](**params)
+        for k, engine in itertools.product(k_values, engines):
+            result = time_search(SEARCH_ENGINES[engine], graph, k, repeat)
+            results.append(
+                {
+                    "engine": engine,
+                    "family": family,
+                    "params": params,
+                    "n": len(graph),
+                    "k": k,
+                    **result,
+                }
+            )
+    return results
+
+
+def _case_key(result):
+    return (
+        result["engine"],
+        result["family"],
+        json.dumps(result["params"], sort_keys=True),
+        result["k"],
+    )
+
+
+def compare_results(baseline, current, threshold=0.1):
+    # Сравнение медианного времени с прошлым прогоном: regression — замедление
+    # больше чем на threshold; изменение числа шагов означает смену алгоритма
+    previous = {_case_key(result): result for result in baseline}
+    report = []
+    for result in current:
+        before = previous.get(_case_key(result))
+        if before is None:
+            continue
+        ratio = (
+            result["median_time"] / before["median_time"]
+            if before["median_time"] > 0
+            else 1.0
+        )
+        report.append(
+            {
+                "engine": result["engine"],
+                "family": result["family"],
+                "n": result["n"],
+                "k": result["k"],
+                "ratio": ratio,
+                "regression": ratio > 1 + threshold,
+                "steps_changed": result["steps"] != before["steps"],
+            }
+        )
+    return report
+
+
+def format_results(results):
+    lines = [
+        f"{'движок':<12}{'семейство':<15}{'n':>5}{'k':>4}{'найдена':>9}"
+        f"{'шаги':>10}{'медиана, с':>13}{'шагов/с':>13}"
+    ]
+    for result in results:
+        lines.append(
+            f"{result['engine']:<12}{result['family']:<15}{result['n']:>5}"
+            f"{result['k']:>4}{'да' if result['found'] else 'нет':>9}"
+            f"{result['steps']:>10}{result['median_time']:>13.6f}"
+            f"{result['steps_per_sec']:>13.0f}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Бенчмарки поиска клики")
+    parser.add_argument(
+        "--engines",
+        nargs="+",
+        default=list(DEFAULT_ENGINES),
+        choices=sorted(SEARCH_ENGINES),
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--quick", action="store_true", help="маленький набор")
+    parser.add_argument("--output", help="файл JSON для результатов")
+    parser.add_argument("--compare", help="файл JSON прошлого прогона")
+    parser.add_argument("--threshold", type=float, default=0.1)
+    parser.add_argument(
+        "--imports", action="store_true", help="замерить время импорта модулей"
+    )
+    args = parser.parse_args(argv)
+
+    if args.imports:
+        for module in IMPORT_MODULES:
+            result = measure_import_time(module, args.repeat)
+            loaded = ", ".join(result["loaded"]) or "—"
+            print(
+                f"{module:<12}{result['median_time'] * 1000:>9.1f} мс"
+                f"  загружены: {loaded}"
+            )
+        return 0
+
+    suite = QUICK_SUITE if args.quick else DEFAULT_SUITE
+    results = run_benchmarks(suite, args.engines, args.repeat)
+    print(format_results(results))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(
+                {
+                    "timestamp": datetime.now().isoformat(timespec="seconds"),
+                    "python": platform.python_version(),
+                    "results": results,
+                },
+                file,
+                ensure_ascii=False,
+                indent=2,
+            )
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            baseline = json.load(file)["results"]
+        report = compare_results(baseline, results, args.threshold)
+        regressions = [entry for entry in report if entry["regression"]]
+        for entry in report:
+            mark = "ЗАМЕДЛЕНИЕ" if entry["regression"] else ""
+            steps = " (изменилось число шагов)" if entry["steps_changed"] else ""
+            print(
+                f"{entry['engine']:<12}{entry['family']:<15}{entry['n']:>5}"
+                f"{entry['k']:>4}  x{entry['ratio']:.2f} {mark}{steps}"
+            )
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
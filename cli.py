@@ -0,0 +1,306 @@
+# cli.py - Поиск клик без графического интерфейса
+
+import argparse
+import functools
+import json
+import math
+import sys
+import time
+
+from clique_app import (
+    GRAPH_FILE_FORMATS,
+    SEARCH_ENGINES,
+    TIME_LIMITED_ENGINES,
+    BinaryTraceWriter,
+    CliqueDatabase,
+    SearchCancelled,
+    check_adjacency_matrix,
+    find_maximum_clique,
+    load_graph,
+    parallel_clique_search,
+    resumable_clique_search,
+    run_search_batch,
+)
+
+# Движки, обход которых можно записать в трассу (--trace)
+TRACED_ENGINES = ("backtracking", "iterative")
+
+
+def _open_database(args):
+    # Без --db результаты никуда не записываются; «--db» без пути —
+    # база по умолчанию (CLIQUE_DB_PATH или clique_results.db)
+    if args.db is None:
+        return None
+    return CliqueDatabase(args.db or None)
+
+
+def _load(args):
+    try:
+        return load_graph(args.graph, args.format, sparse=args.engine == "sparse")
+    except (OSError, ValueError) as error:
+        raise SystemExit(f"Не удалось загрузить граф {args.graph}: {error}")
+
+
+def _result_line(result, **extra):
+    # Одна строка JSON на результат; граф в вывод не попадает
+    line = {
+        **extra,
+        "k": result["k"],
+        "found": result["found"],
+        "clique": result["clique_vertices"] or [],
+        "steps": result["steps"],
+        "time": result["execution_time"],
+        "cached": result.get("cached", False),
+        "timed_out": result.get("timed_out", False),
+    }
+    return json.dumps(line, ensure_ascii=False)
+
+
+def solve(args, output):
+    if args.trace is not None:
+        return solve_traced(args, output)
+
+    graph = _load(args)
+    engine = args.engine
+    if args.workers > 1:
+        # Один граф: процессы делят между собой поддеревья верхнего уровня
+        engine = functools.partial(parallel_clique_search, workers=args.workers)
+
+    # Пакет из одного задания: кэш и известные границы из базы, затравка
+    # известной кликой и запись результата — как в пакетном режиме
+    (result,) = run_search_batch(
+        [(graph, args.k)],
+        engine=engine,
+        max_workers=1,
+        database=_open_database(args),
+        time_limit=args.time_limit,
+    )
+    print(_result_line(result), file=output)
+    return 0
+
+
+def solve_traced(args, output):
+    # Трасса нужна от настоящего перебора, поэтому кэш и границы из базы
+    # не используются; записывается тот же обход, что у backtracking
+    graph = _load(args)
+    database = _open_database(args)
+    deadline = None
+    if args.time_limit is not None:
+        deadline = time.time() + args.time_limit
+
+    start_time = time.time()
+    with open(args.trace, "wb") as trace_file:
+        writer = BinaryTraceWriter(trace_file)
+        found, steps, clique, state = resumable_clique_search(
+            graph, args.k, deadline=deadline, tracer=writer
+        )
+        writer.flush()
+    execution_time = time.time() - start_time
+    timed_out = state is not None
+
+    if database is not None and not timed_out:
+        database.save_search_result(graph, args.k, found, clique, steps, execution_time)
+    result = {
+        "k": args.k,
+        "found": found,
+        "clique_vertices": clique,
+        "steps": steps,
+        "execution_time": execution_time,
+        "timed_out": timed_out,
+    }
+    print(_result_line(result), file=output)
+    return 0
+
+
+def maximum(args, output):
+    graph = _load(args)
+    database = _open_database(args)
+
+    should_stop = None
+    if args.time_limit is not None:
+        deadline = time.time() + args.time_limit
+        should_stop = lambda: time.time() > deadline
+
+    start_time = time.time()
+    stats = {}
+    try:
+        found, steps, clique = find_maximum_clique(graph, should_stop, stats)
+        timed_out = False
+    except SearchCancelled:
+        # По истечении бюджета выдается лучшая найденная клика
+        clique, steps, timed_out = stats["best_clique"], stats["steps"], True
+        found = bool(clique)
+    execution_time = time.time() - start_time
+
+    if database is not None and not timed_out:
+        # Клика наибольшая: клик на одну вершину больше в графе нет
+        database.record_bounds(graph, clique=clique, infeasible_k=len(clique) + 1)
+    elif database is not None and clique:
+        # Наибольшая ли она, неизвестно: записывается только сама клика
+        database.record_bounds(graph, clique=clique)
+    result = {
+        "k": len(clique),
+        "found": found,
+        "clique_vertices": clique,
+        "steps": steps,
+        "execution_time": execution_time,
+        "timed_out": timed_out,
+    }
+    print(_result_line(result), file=output)
+    return 0
+
+
+def _read_jobs(lines, jobs, errors):
+    # Задание — объект JSON в строке: {"k": 4, "graph": [[0, 1], [1, 0]]}
+    # или {"k": 4, "path": "graph.clq"}; необязательный "id" копируется
+    # в результат. Файлы графов читаются один раз на пакет
+    graphs = {}
+    for line_number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        job_id = None
+        try:
+            job = json.loads(line)
+            job_id = job.get("id")
+            k = int(job["k"])
+            if k < 1:
+                raise ValueError("k должно быть не меньше 1")
+            if "path" in job:
+                key = (job["path"], job.get("format"))
+                if key not in graphs:
+                    graphs[key] = load_graph(job["path"], job.get("format"))
+                graph = graphs[key]
+            else:
+                graph = check_adjacency_matrix(job["graph"])
+        except (AttributeError, KeyError, OSError, TypeError, ValueError) as error:
+            errors.append((line_number, job_id, str(error)))
+            continue
+        jobs.append((line_number, job_id))
+        yield graph, k
+
+
+def batch(args, output, input_stream):
+    database = _open_database(args)
+    jobs = []
+    errors = []
+
+    def report_errors():
+        while errors:
+            line_number, job_id, message = errors.pop(0)
+            print(
+                json.dumps(
+                    {"id": job_id, "line": line_number, "error": message},
+                    ensure_ascii=False,
+                ),
+                file=output,
+            )
+
+    results = run_search_batch(
+        _read_jobs(input_stream, jobs, errors),
+        engine=args.engine,
+        max_workers=args.workers,
+        database=database,
+        time_limit=args.time_limit,
+    )
+    failed = 0
+    for result in results:
+        failed += len(errors)
+        report_errors()
+        line_number, job_id = jobs[result["index"]]
+        print(_result_line(result, id=job_id, line=line_number), file=output)
+        output.flush()
+    failed += len(errors)
+    report_errors()
+    return 1 if failed else 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Поиск клик без графического интерфейса"
+    )
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument(
+        "--engine",
+        default="bitset",
+        choices=sorted(SEARCH_ENGINES),
+        help="движок поиска",
+    )
+    common.add_argument(
+        "--workers", type=int, default=1, help="число процессов (1 — без пула)"
+    )
+    common.add_argument(
+        "--time-limit", type=float, help="бюджет времени на один поиск, с"
+    )
+    common.add_argument(
+        "--db",
+        nargs="?",
+        const="",
+        help="сохранять результаты в базу (путь к файлу SQLite)",
+    )
+    graph_file = argparse.ArgumentParser(add_help=False)
+    graph_file.add_argument(
+        "graph", help="файл графа: DIMACS, список ребер или матрица"
+    )
+    graph_file.add_argument("--format", choices=GRAPH_FILE_FORMATS)
+
+    commands = parser.add_subparsers(dest="command", required=True)
+    solve_parser = commands.add_parser(
+        "solve", parents=[common, graph_file], help="найти клику размера k"
+    )
+    solve_parser.add_argument("-k", type=int, required=True)
+    solve_parser.add_argument(
+        "--trace",
+        metavar="FILE",
+        help="записать двоичную трассу поиска (движки backtracking и iterative)",
+    )
+    commands.add_parser(
+        "max", parents=[common, graph_file], help="найти наибольшую клику"
+    )
+    commands.add_parser(
+        "batch",
+        parents=[common],
+        help="задания JSON lines из stdin, результаты в stdout",
+    )
+    return parser
+
+
+def main(argv=None, output=None, input_stream=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    output = output or sys.stdout
+
+    if args.workers < 1:
+        parser.error("--workers должно быть не меньше 1")
+    if args.time_limit is not None and not (
+        math.isfinite(args.time_limit) and args.time_limit > 0
+    ):
+        parser.error("--time-limit должно быть положительным числом")
+    if args.command == "solve" and args.k < 1:
+        parser.error("-k должно быть не меньше 1")
+    if args.command == "solve" and args.workers > 1:
+        if args.engine != "bitset" or args.time_limit is not None:
+            parser.error(
+                "solve --workers поддерживается движком bitset без --time-limit"
+            )
+    if args.command == "solve" and args.trace is not None:
+        if args.engine not in TRACED_ENGINES or args.workers > 1:
+            parser.error(
+                "--trace поддерживается движками backtracking и iterative "
+                "без --workers"
+            )
+    if (
+        args.command != "max"
+        and args.time_limit is not None
+        and args.engine not in TIME_LIMITED_ENGINES
+    ):
+        parser.error(f"движок {args.engine} не поддерживает --time-limit")
+
+    if args.command == "solve":
+        return solve(args, output)
+    if args.command == "max":
+        return maximum(args, output)
+    return batch(args, output, input_stream or sys.stdin)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,13 +1,217 @@
 # clique_app.py - Алгоритмические функции и работа с БД
 
-import sqlite3
+import itertools
 import json
+import math
+import mmap
+import os
+import struct
+import sys
+import threading
 import time
-from datetime import datetime
-from typing import List, Optional, Tuple
+import zlib
+from array import array
+from collections import OrderedDict
+from contextlib import contextmanager
+
+# numpy, sqlite3, hashlib, multiprocessing и tracemalloc импортируются
+# внутри функций: «import clique_app» не должен платить за них, пока
+# они не нужны
+
+
+class BitsetGraph:
+    # Граф, заданный битовыми масками окрестностей (как в graph_to_bitsets).
+    # Строки матрицы смежности строятся по требованию, поэтому граф можно
+    # передавать и в движки, работающие с матрицей
+
+    def __init__(self, adjacency):
+        self.adjacency = adjacency
+        self._rows = {}
+
+    def __len__(self):
+        return len(self.adjacency)
+
+    def __getitem__(self, i):
+        row = self._rows.get(i)
+        if row is None:
+            n = len(self.adjacency)
+            bits = format(self.adjacency[i], f"0{n}b")[::-1] if n else ""
+            row = self._rows[i] = list(map(int, bits))
+        return row
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def edge_count(self):
+        return sum(mask.bit_count() for mask in self.adjacency) // 2
+
+    def to_matrix(self):
+        return [list(row) for row in self]
+
+    def to_numpy(self):
+        import numpy as np
+
+        n = len(self.adjacency)
+        width = (n + 7) // 8
+        packed = np.frombuffer(
+            b"".join(mask.to_bytes(width, "little") for mask in self.adjacency),
+            dtype=np.uint8,
+        ).reshape(n, width)
+        return np.unpackbits(packed, axis=1, count=n, bitorder="little")
+
+
+class _SparseRow:
+    # Строка матрицы смежности разреженного графа: graph[i][j] проверяет
+    # принадлежность j множеству соседей i, не строя строку длины n
+
+    def __init__(self, neighbours, n):
+        self.neighbours = neighbours
+        self.n = n
+
+    def __len__(self):
+        return self.n
+
+    def __getitem__(self, j):
+        return int(j in self.neighbours)
+
+    def __iter__(self):
+        return (int(j in self.neighbours) for j in range(self.n))
+
+
+class SparseGraph:
+    # Разреженный граф в формате CSR: соседи вершины v по возрастанию лежат
+    # в indices[indptr[v]:indptr[v + 1]]. Память O(n + m) вместо O(n^2);
+    # sparse_clique_search работает с ним напрямую, остальные движки — через
+    # graph[i][j] или битовые маски, построенные по требованию
+
+    def __init__(self, indptr, indices):
+        import numpy as np
+
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int64)
+        self._rows = {}
+        self._bitsets = None
+
+    @classmethod
+    def from_edges(cls, n, endpoints):
+        # endpoints — концы ребер подряд: u0, v0, u1, v1, ...;
+        # петли и кратные ребра отбрасываются
+        import numpy as np
+
+        pairs = np.asarray(endpoints, dtype=np.int64).reshape(-1, 2)
+        pairs = pairs[pairs[:, 0] != pairs[:, 1]]
+        keys = np.unique(
+            np.concatenate(
+                (pairs[:, 0] * n + pairs[:, 1], pairs[:, 1] * n + pairs[:, 0])
+            )
+        )
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        if n:
+            rows, indices = np.divmod(keys, n)
+            np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+        else:
+            indices = keys
+        return cls(indptr, indices)
+
+    @classmethod
+    def from_graph(cls, graph):
+        import numpy as np
+
+        if isinstance(graph, SparseGraph):
+            return graph
+        matrix = as_adjacency_matrix(graph)
+        rows, columns = np.nonzero(matrix)
+        return cls.from_edges(len(matrix), np.column_stack((rows, columns)))
+
+    def __len__(self):
+        return len(self.indptr) - 1
+
+    def __getitem__(self, i):
+        row = self._rows.get(i)
+        if row is None:
+            row = self._rows[i] = _SparseRow(
+                set(self.neighbours(i).tolist()), len(self)
+            )
+        return row
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def neighbours(self, vertex):
+        return self.indices[self.indptr[vertex] : self.indptr[vertex + 1]]
+
+    def degrees(self):
+        import numpy as np
+
+        return np.diff(self.indptr)
+
+    def has_edge(self, u, v):
+        import numpy as np
+
+        row = self.neighbours(u)
+        index = np.searchsorted(row, v)
+        return bool(index < len(row) and row[index] == v)
+
+    def edge_count(self):
+        return len(self.indices) // 2
+
+    def to_bitsets(self):
+        import numpy as np
+
+        if self._bitsets is None:
+            n = len(self)
+            row = np.zeros(n, dtype=np.uint8)
+            bitsets = []
+            for vertex in range(n):
+                neighbours = self.neighbours(vertex)
+                row[neighbours] = 1
+                packed = np.packbits(row, bitorder="little").tobytes()
+                bitsets.append(int.from_bytes(packed, "little"))
+                row[neighbours] = 0
+            self._bitsets = bitsets
+        return self._bitsets
+
+    def to_numpy(self):
+        import numpy as np
+
+        n = len(self)
+        matrix = np.zeros((n, n), dtype=np.uint8)
+        matrix[np.repeat(np.arange(n), self.degrees()), self.indices] = 1
+        return matrix
+
+    def to_matrix(self):
+        return self.to_numpy().tolist()
+
+
+def as_adjacency_matrix(graph):
+    # Списки списков приводятся к uint8-матрице один раз, на входе
+    import numpy as np
+
+    if isinstance(graph, np.ndarray) and graph.dtype == np.uint8:
+        return graph
+    if isinstance(graph, (BitsetGraph, SparseGraph)):
+        return graph.to_numpy()
+    return np.asarray(graph, dtype=np.uint8).reshape(len(graph), len(graph))
 
 
 def is_clique(graph, vertices):
+    if isinstance(graph, BitsetGraph):
+        mask = sum(1 << vertex for vertex in set(vertices))
+        return all(
+            (graph.adjacency[vertex] | 1 << vertex) & mask == mask
+            for vertex in vertices
+        )
+
+    if isinstance(graph, SparseGraph):
+        return all(graph.has_edge(u, v) for u, v in itertools.combinations(vertices, 2))
+
+    # Массив numpy может прийти, только если numpy уже загружен
+    np = sys.modules.get("numpy")
+    if np is not None and isinstance(graph, np.ndarray):
+        index = np.asarray(vertices, dtype=np.intp)
+        submatrix = graph[np.ix_(index, index)] != 0
+        return bool((submatrix | np.eye(len(index), dtype=bool)).all())
+
     for i in range(len(vertices)):
         for j in range(i + 1, len(vertices)):
             if graph[vertices[i]][vertices[j]] == 0:
@@ -15,63 +219,1567 @@ def is_clique(graph, vertices):
     return True
 
 
-def backtracking_clique_search(
-    graph, k, current_set, start_index, step_count, log_function=None
-):
+# Трассировка поиска: события передаются трассировщику целыми числами,
+# текст (если нужен) формируется уже на его стороне
+TRACE_ENTER = 0
+TRACE_ADD = 1
+TRACE_BACKTRACK = 2
+TRACE_FOUND = 3
+TRACE_REJECT = 4
+
+TRACE_MAGIC = b"CLQTRACE1"
+# Тип события, шаг или вершина, start_index
+TRACE_RECORD = struct.Struct("<BQI")
+
+
+class SearchTracer:
+    # Базовый трассировщик: все события игнорируются
+
+    def enter(self, step, start_index):
+        pass
+
+    def add(self, vertex):
+        pass
+
+    def backtrack(self, vertex):
+        pass
+
+    def found(self, step):
+        pass
+
+    def reject(self, step):
+        pass
+
+
+class LogTracer(SearchTracer):
+    # Превращает события в прежние текстовые сообщения log_function;
+    # текущее множество восстанавливается по событиям add/backtrack
+
+    def __init__(self, log_function, current_set=()):
+        self.log_function = log_function
+        self.current_set = list(current_set)
+
+    def enter(self, step, start_index):
+        self.log_function(
+            f"Шаг {step}: Текущее множество: {self.current_set}, start_index: {start_index}\n"
+        )
+
+    def add(self, vertex):
+        self.log_function(f"  Добавляем вершину {vertex} в {self.current_set}\n")
+        self.current_set.append(vertex)
+
+    def backtrack(self, vertex):
+        self.log_function(
+            f"  BACKTRACK: убираем вершину {vertex} из {self.current_set}\n"
+        )
+        self.current_set.pop()
+
+    def found(self, step):
+        self.log_function(f"✓ НАЙДЕНА КЛИКА: {self.current_set}\n\n", "success")
+
+    def reject(self, step):
+        self.log_function(f"✗ Множество {self.current_set} не является кликой\n\n")
+
+
+class BinaryTraceWriter(SearchTracer):
+    # Компактная двоичная трасса: заголовок и записи TRACE_RECORD
+
+    def __init__(self, file, buffer_size=1 << 16):
+        self.file = file
+        self.buffer_size = buffer_size
+        self.buffer = bytearray(TRACE_MAGIC)
+
+    def _write(self, kind, value, start_index=0):
+        self.buffer += TRACE_RECORD.pack(kind, value, start_index)
+        if len(self.buffer) >= self.buffer_size:
+            self.flush()
+
+    def enter(self, step, start_index):
+        self._write(TRACE_ENTER, step, start_index)
+
+    def add(self, vertex):
+        self._write(TRACE_ADD, vertex)
+
+    def backtrack(self, vertex):
+        self._write(TRACE_BACKTRACK, vertex)
+
+    def found(self, step):
+        self._write(TRACE_FOUND, step)
+
+    def reject(self, step):
+        self._write(TRACE_REJECT, step)
+
+    def flush(self):
+        self.file.write(self.buffer)
+        self.buffer.clear()
+        self.file.flush()
+
+
+class SamplingTracer(SearchTracer):
+    # Инструментирование поиска: каждые interval шагов записывается образец
+    # (шаг, время с начала, память tracemalloc в байтах, глубина поиска).
+    # События передаются дальше в tracer, если он задан. Используется как
+    # контекстный менеджер: tracemalloc запускается и останавливается им же
+
+    def __init__(self, interval=1000, trace_memory=True, tracer=None, depth=0):
+        self.interval = interval
+        self.trace_memory = trace_memory
+        self.tracer = tracer
+        self.depth = depth
+        self.samples = []
+        self.start_time = None
+        self.last_step = 0
+        self._next_step = 0
+        self._owns_tracemalloc = False
+
+    def __enter__(self):
+        import tracemalloc
+
+        self.start_time = time.perf_counter()
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._owns_tracemalloc = True
+        return self
+
+    def __exit__(self, *exc_info):
+        import tracemalloc
+
+        if not self.samples or self.samples[-1][0] != self.last_step:
+            self.sample(self.last_step)
+        if self._owns_tracemalloc:
+            tracemalloc.stop()
+            self._owns_tracemalloc = False
+
+    def sample(self, step):
+        import tracemalloc
+
+        memory = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else 0
+        self.samples.append(
+            (step, time.perf_counter() - self.start_time, memory, self.depth)
+        )
+
+    def enter(self, step, start_index):
+        self.last_step = step
+        if step >= self._next_step:
+            self.sample(step)
+            self._next_step = step + self.interval
+        if self.tracer is not None:
+            self.tracer.enter(step, start_index)
+
+    def add(self, vertex):
+        self.depth += 1
+        if self.tracer is not None:
+            self.tracer.add(vertex)
+
+    def backtrack(self, vertex):
+        self.depth -= 1
+        if self.tracer is not None:
+            self.tracer.backtrack(vertex)
+
+    def found(self, step):
+        if self.tracer is not None:
+            self.tracer.found(step)
+
+    def reject(self, step):
+        if self.tracer is not None:
+            self.tracer.reject(step)
+
+
+def replay_trace(file, tracer, chunk_records=4096, should_stop=None):
+    # Проигрывает двоичную трассу в трассировщик; возвращает число событий.
+    # should_stop опрашивается между порциями записей
+    if file.read(len(TRACE_MAGIC)) != TRACE_MAGIC:
+        raise ValueError("Файл не является трассой поиска клики")
+
+    handlers = {
+        TRACE_ENTER: tracer.enter,
+        TRACE_ADD: tracer.add,
+        TRACE_BACKTRACK: tracer.backtrack,
+        TRACE_FOUND: tracer.found,
+        TRACE_REJECT: tracer.reject,
+    }
+    events = 0
+    while True:
+        if should_stop is not None and should_stop():
+            raise SearchCancelled
+        chunk = file.read(TRACE_RECORD.size * chunk_records)
+        if not chunk:
+            break
+        if len(chunk) % TRACE_RECORD.size:
+            raise ValueError("Трасса поиска клики обрезана")
+        for kind, value, start_index in TRACE_RECORD.iter_unpack(chunk):
+            if kind == TRACE_ENTER:
+                tracer.enter(value, start_index)
+            elif kind in handlers:
+                handlers[kind](value)
+            else:
+                raise ValueError("Трасса поиска клики повреждена")
+            events += 1
+    return events
+
+
+def backtracking_clique_search(
+    graph, k, current_set, start_index, step_count, log_function=None, tracer=None
+):
+    # Без трассировщика работает отдельный вариант поиска, в котором
+    # нет ни одной проверки на трассировку
+    if tracer is None and log_function is not None:
+        tracer = LogTracer(log_function, current_set)
+
+    if tracer is None:
+        return _backtracking_search(graph, k, current_set, start_index, step_count)
+    return _traced_backtracking_search(
+        graph, k, current_set, start_index, step_count, tracer
+    )
+
+
+def _backtracking_search(graph, k, current_set, start_index, step_count):
+
+    step_count[0] += 1
+
+    if len(current_set) == k:
+        if is_clique(graph, current_set):
+            return True, step_count[0], current_set.copy()
+        else:
+            return False, step_count[0], []
+
+    for i in range(start_index, len(graph)):
+        can_add = True
+        for vertex in current_set:
+            if graph[i][vertex] == 0:
+                can_add = False
+                break
+
+        if can_add:
+            current_set.append(i)
+            found, steps, clique = _backtracking_search(
+                graph, k, current_set, i + 1, step_count
+            )
+
+            if found:
+                return True, steps, clique
+
+            current_set.pop()
+
+    return False, step_count[0], []
+
+
+def _traced_backtracking_search(graph, k, current_set, start_index, step_count, tracer):
+
+    step_count[0] += 1
+    tracer.enter(step_count[0], start_index)
+
+    if len(current_set) == k:
+        if is_clique(graph, current_set):
+            tracer.found(step_count[0])
+            return True, step_count[0], current_set.copy()
+        else:
+            tracer.reject(step_count[0])
+            return False, step_count[0], []
+
+    for i in range(start_index, len(graph)):
+        can_add = True
+        for vertex in current_set:
+            if graph[i][vertex] == 0:
+                can_add = False
+                break
+
+        if can_add:
+            tracer.add(i)
+
+            current_set.append(i)
+            found, steps, clique = _traced_backtracking_search(
+                graph, k, current_set, i + 1, step_count, tracer
+            )
+
+            if found:
+                return True, steps, clique
+
+            tracer.backtrack(i)
+            current_set.pop()
+
+    return False, step_count[0], []
+
+
+def _adjacency_columns(graph):
+    # Бит i в columns[j] установлен, если graph[i][j] != 0
+    if isinstance(graph, BitsetGraph):
+        return list(graph.adjacency)
+    if isinstance(graph, SparseGraph):
+        return list(graph.to_bitsets())
+    n = len(graph)
+    columns = [0] * n
+    for i in range(n):
+        row = graph[i]
+        for j in range(n):
+            if row[j] != 0:
+                columns[j] |= 1 << i
+    return columns
+
+
+def _iterative_search_loop(
+    k,
+    columns,
+    current_set,
+    stack,
+    initial_is_clique,
+    step_count,
+    max_steps=None,
+    deadline=None,
+    should_stop=None,
+):
+    # Возвращает True/False по окончании поиска или None, если исчерпан
+    # бюджет или поиск остановлен; тогда current_set и stack описывают
+    # место остановки
+    step_limit = None if max_steps is None else step_count[0] + max_steps
+    # Часы и should_stop опрашиваются не на каждом шаге, а раз в 256 итераций
+    interrupt_check = 0
+
+    while stack:
+        candidates = stack[-1]
+
+        if not candidates:
+            stack.pop()
+            if stack:
+                current_set.pop()
+            continue
+
+        if step_limit is not None and step_count[0] >= step_limit:
+            return None
+        if deadline is not None or should_stop is not None:
+            if not interrupt_check & 255 and (
+                (deadline is not None and time.time() >= deadline)
+                or (should_stop is not None and should_stop())
+            ):
+                return None
+            interrupt_check += 1
+
+        low_bit = candidates & -candidates
+        vertex = low_bit.bit_length() - 1
+        candidates ^= low_bit
+        stack[-1] = candidates
+
+        current_set.append(vertex)
+        step_count[0] += 1
+
+        if len(current_set) != k:
+            stack.append(candidates & columns[vertex])
+            continue
+
+        if initial_is_clique:
+            return True
+
+        current_set.pop()
+
+    return False
+
+
+def _traced_iterative_search_loop(
+    k,
+    columns,
+    current_set,
+    stack,
+    initial_is_clique,
+    step_count,
+    tracer,
+    max_steps=None,
+    deadline=None,
+    should_stop=None,
+):
+    # То же, что _iterative_search_loop, но с событиями трассировки
+    step_limit = None if max_steps is None else step_count[0] + max_steps
+    interrupt_check = 0
+
+    while stack:
+        candidates = stack[-1]
+
+        if not candidates:
+            stack.pop()
+            if stack:
+                tracer.backtrack(current_set[-1])
+                current_set.pop()
+            continue
+
+        if step_limit is not None and step_count[0] >= step_limit:
+            return None
+        if deadline is not None or should_stop is not None:
+            if not interrupt_check & 255 and (
+                (deadline is not None and time.time() >= deadline)
+                or (should_stop is not None and should_stop())
+            ):
+                return None
+            interrupt_check += 1
+
+        low_bit = candidates & -candidates
+        vertex = low_bit.bit_length() - 1
+        candidates ^= low_bit
+        stack[-1] = candidates
+
+        tracer.add(vertex)
+        current_set.append(vertex)
+
+        step_count[0] += 1
+        tracer.enter(step_count[0], vertex + 1)
+
+        if len(current_set) != k:
+            stack.append(candidates & columns[vertex])
+            continue
+
+        if initial_is_clique:
+            tracer.found(step_count[0])
+            return True
+
+        tracer.reject(step_count[0])
+        tracer.backtrack(vertex)
+        current_set.pop()
+
+    return False
+
+
+def _start_iterative_search(graph, k, current_set, start_index, step_count, tracer):
+    # Корневой шаг поиска; возвращает (found, columns, stack, initial_is_clique),
+    # found = None, если перебор еще предстоит
+    columns = _adjacency_columns(graph)
+
+    # Добавляемые вершины смежны со всеми предыдущими, поэтому
+    # проверять на клику достаточно исходное множество
+    initial_is_clique = is_clique(graph, current_set)
+
+    step_count[0] += 1
+    if tracer is not None:
+        tracer.enter(step_count[0], start_index)
+
+    if len(current_set) == k:
+        if tracer is not None:
+            if initial_is_clique:
+                tracer.found(step_count[0])
+            else:
+                tracer.reject(step_count[0])
+        return initial_is_clique, columns, [], initial_is_clique
+
+    candidates = ((1 << len(graph)) - 1) >> start_index << start_index
+    for vertex in current_set:
+        candidates &= columns[vertex]
+    return None, columns, [candidates], initial_is_clique
+
+
+def _run_iterative_search_loop(
+    k,
+    columns,
+    current_set,
+    stack,
+    initial_is_clique,
+    step_count,
+    tracer,
+    max_steps=None,
+    deadline=None,
+    should_stop=None,
+):
+    if tracer is None:
+        return _iterative_search_loop(
+            k,
+            columns,
+            current_set,
+            stack,
+            initial_is_clique,
+            step_count,
+            max_steps,
+            deadline,
+            should_stop,
+        )
+    return _traced_iterative_search_loop(
+        k,
+        columns,
+        current_set,
+        stack,
+        initial_is_clique,
+        step_count,
+        tracer,
+        max_steps,
+        deadline,
+        should_stop,
+    )
+
+
+def iterative_clique_search(
+    graph, k, current_set, start_index, step_count, log_function=None, tracer=None
+):
+    # Тот же обход и те же шаги, что в backtracking_clique_search, но без
+    # рекурсии: стек хранит для каждого уровня маску еще не перебранных кандидатов
+    if tracer is None and log_function is not None:
+        tracer = LogTracer(log_function, current_set)
+
+    found, columns, stack, initial_is_clique = _start_iterative_search(
+        graph, k, current_set, start_index, step_count, tracer
+    )
+    if found is None:
+        found = _run_iterative_search_loop(
+            k, columns, current_set, stack, initial_is_clique, step_count, tracer
+        )
+
+    if found:
+        return True, step_count[0], current_set.copy()
+    return False, step_count[0], []
+
+
+def resumable_clique_search(
+    graph,
+    k,
+    state=None,
+    max_steps=None,
+    deadline=None,
+    log_function=None,
+    should_stop=None,
+    tracer=None,
+):
+    # Поиск с ограничением по шагам (max_steps — на один вызов) и по времени
+    # (deadline — момент time.time()); should_stop позволяет остановить поиск
+    # извне. Возвращает (found, steps, clique, state): state — сериализуемое
+    # в JSON состояние, если поиск не завершен, иначе None
+    if state is None:
+        current_set = []
+        step_count = [0]
+        if tracer is None and log_function is not None:
+            tracer = LogTracer(log_function)
+        found, columns, stack, initial_is_clique = _start_iterative_search(
+            graph, k, current_set, 0, step_count, tracer
+        )
+    else:
+        if state["vertices"] != len(graph) or state["k"] != k:
+            raise ValueError("Состояние поиска не соответствует графу или k")
+        current_set = list(state["current_set"])
+        step_count = [state["steps"]]
+        stack = list(state["stack"])
+        initial_is_clique = state["initial_is_clique"]
+        columns = _adjacency_columns(graph)
+        found = None
+        if tracer is None and log_function is not None:
+            tracer = LogTracer(log_function, current_set)
+
+    if found is None:
+        found = _run_iterative_search_loop(
+            k,
+            columns,
+            current_set,
+            stack,
+            initial_is_clique,
+            step_count,
+            tracer,
+            max_steps,
+            deadline,
+            should_stop,
+        )
+
+    if found is None:
+        state = {
+            "vertices": len(graph),
+            "k": k,
+            "current_set": current_set,
+            "stack": stack,
+            "steps": step_count[0],
+            "initial_is_clique": initial_is_clique,
+        }
+        return False, step_count[0], [], state
+
+    if found:
+        return True, step_count[0], current_set.copy(), None
+    return False, step_count[0], [], None
+
+
+def numpy_clique_search(graph, k):
+    # Тот же перебор, что и backtracking_clique_search (совпадают и шаги),
+    # но проверка кандидатов — векторное И строк матрицы по current_set
+    import numpy as np
+
+    matrix = as_adjacency_matrix(graph) != 0
+    step_count = [0]
+    current_set = []
+
+    def extend(candidates, start_index):
+        step_count[0] += 1
+
+        if len(current_set) == k:
+            return True
+
+        vertices = np.flatnonzero(candidates[start_index:]) + start_index
+
+        if len(current_set) == k - 2 and len(vertices):
+            # Предпоследний уровень целиком: подграф на кандидатах и поиск
+            # первой вершины, у которой есть сосед правее нее
+            upper = np.triu(matrix[np.ix_(vertices, vertices)], 1)
+            extendable = np.flatnonzero(upper.any(axis=1))
+            if not len(extendable):
+                step_count[0] += len(vertices)
+                return False
+            first = int(extendable[0])
+            step_count[0] += first + 2
+            current_set.append(int(vertices[first]))
+            current_set.append(int(vertices[np.flatnonzero(upper[first])[0]]))
+            return True
+
+        for vertex in vertices:
+            current_set.append(int(vertex))
+            if extend(candidates & matrix[vertex], vertex + 1):
+                return True
+            current_set.pop()
+
+        return False
+
+    if extend(np.ones(len(matrix), dtype=bool), 0):
+        return True, step_count[0], current_set.copy()
+    return False, step_count[0], []
+
+
+def graph_to_bitsets(graph):
+    # Окрестность каждой вершины хранится как битовая маска в int
+    if isinstance(graph, BitsetGraph):
+        return graph.adjacency
+    if isinstance(graph, SparseGraph):
+        return graph.to_bitsets()
+    bitsets = []
+    for i, row in enumerate(graph):
+        mask = 0
+        for j, value in enumerate(row):
+            if value and i != j:
+                mask |= 1 << j
+        bitsets.append(mask)
+    return bitsets
+
+
+def _bits_to_list(mask):
+    vertices = []
+    while mask:
+        low_bit = mask & -mask
+        vertices.append(low_bit.bit_length() - 1)
+        mask ^= low_bit
+    return vertices
+
+
+def k_core_mask(adjacency, core):
+    # Сведение графа к core-ядру: вершины степени меньше core
+    # не могут входить в клику размера core + 1
+    alive = (1 << len(adjacency)) - 1
+    changed = True
+    while changed:
+        changed = False
+        for vertex in _bits_to_list(alive):
+            if (adjacency[vertex] & alive).bit_count() < core:
+                alive ^= 1 << vertex
+                changed = True
+    return alive
+
+
+def _colour_sort(adjacency, candidates):
+    # Жадная раскраска кандидатов (MCQ/MCS): номер цвета вершины —
+    # верхняя оценка размера клики среди вершин до нее включительно
+    order = []
+    colours = []
+    colour = 0
+    uncoloured = candidates
+    while uncoloured:
+        colour += 1
+        available = uncoloured
+        while available:
+            low_bit = available & -available
+            vertex = low_bit.bit_length() - 1
+            available &= ~adjacency[vertex] & ~low_bit
+            uncoloured ^= low_bit
+            order.append(vertex)
+            colours.append(colour)
+    return order, colours
+
+
+class SearchCancelled(Exception):
+    pass
+
+
+def _bitset_subtree_search(adjacency, k, clique, candidates, should_stop=None):
+    # Поиск в поддереве с заданным началом клики; clique дополняется на месте.
+    # Возвращает (found, steps, pruned); found = None, если поиск прерван
+    step_count = [0]
+    pruned = [0]
+
+    def extend(candidates):
+        step_count[0] += 1
+
+        if should_stop is not None and not step_count[0] & 1023 and should_stop():
+            raise SearchCancelled
+
+        if len(clique) == k:
+            return True
+
+        # Кандидаты перебираются от старшего цвета к младшему; как только
+        # оценка раскраски не дотягивает до k, оставшиеся ветви отсекаются
+        order, colours = _colour_sort(adjacency, candidates)
+        for index in range(len(order) - 1, -1, -1):
+            if len(clique) + colours[index] < k:
+                pruned[0] += index + 1
+                return False
+
+            vertex = order[index]
+            clique.append(vertex)
+            if extend(candidates & adjacency[vertex]):
+                return True
+            clique.pop()
+            candidates &= ~(1 << vertex)
+
+        return False
+
+    try:
+        found = extend(candidates)
+    except SearchCancelled:
+        found = None
+    return found, step_count[0], pruned[0]
+
+
+def bitset_clique_search(graph, k, stats=None, should_stop=None, seed=None):
+    # seed — известная клика: сначала ищется ее расширение до размера k,
+    # и только потом выполняется полный поиск
+    if isinstance(graph, SparseGraph):
+        # Маски на n бит для большого разреженного графа не строятся
+        return sparse_clique_search(graph, k, stats, should_stop, seed)
+    adjacency = graph_to_bitsets(graph)
+    alive = k_core_mask(adjacency, k - 1)
+    found, steps, pruned = False, 0, 0
+
+    if seed:
+        clique = list(seed)[:k]
+        seed_mask = sum(1 << vertex for vertex in clique)
+        candidates = alive
+        for vertex in clique:
+            candidates &= adjacency[vertex]
+        # Расширяется только настоящая клика, целиком лежащая в (k-1)-ядре
+        if seed_mask & alive == seed_mask and all(
+            (adjacency[vertex] | 1 << vertex) & seed_mask == seed_mask
+            for vertex in clique
+        ):
+            found, steps, pruned = _bitset_subtree_search(
+                adjacency, k, clique, candidates, should_stop
+            )
+
+    if not found and found is not None:
+        clique = []
+        found, full_steps, full_pruned = _bitset_subtree_search(
+            adjacency, k, clique, alive, should_stop
+        )
+        steps += full_steps
+        pruned += full_pruned
+    if found is None:
+        raise SearchCancelled
+
+    if stats is not None:
+        stats["steps"] = steps
+        stats["pruned"] = pruned
+        stats["core_removed"] = len(adjacency) - alive.bit_count()
+
+    if found:
+        return True, steps, sorted(clique)
+    return False, steps, []
+
+
+def sparse_core_decomposition(graph):
+    # Алгоритм Батагеля–Заверсника за O(n + m): вершины удаляются в порядке
+    # вырождения (каждый раз вершина наименьшей оставшейся степени).
+    # Возвращает (order, core), core[v] — ядерное число вершины v
+    n = len(graph)
+    indptr = graph.indptr.tolist()
+    indices = graph.indices.tolist()
+    degree = graph.degrees().tolist()
+
+    # Вершины отсортированы по степени; start[d] — начало корзины степени d
+    start = [0] * (max(degree, default=0) + 1)
+    for d in degree:
+        start[d] += 1
+    offset = 0
+    for d, count in enumerate(start):
+        start[d] = offset
+        offset += count
+    order = [0] * n
+    position = [0] * n
+    for vertex, d in enumerate(degree):
+        position[vertex] = start[d]
+        order[start[d]] = vertex
+        start[d] += 1
+    for d in range(len(start) - 1, 0, -1):
+        start[d] = start[d - 1]
+    if start:
+        start[0] = 0
+
+    for index in range(n):
+        vertex = order[index]
+        for neighbour in indices[indptr[vertex] : indptr[vertex + 1]]:
+            d = degree[neighbour]
+            if d > degree[vertex]:
+                # Сосед переезжает в начало своей корзины и в корзину d - 1
+                first = start[d]
+                other = order[first]
+                if other != neighbour:
+                    order[position[neighbour]] = other
+                    position[other] = position[neighbour]
+                    order[first] = neighbour
+                    position[neighbour] = first
+                start[d] += 1
+                degree[neighbour] -= 1
+    return order, degree
+
+
+def _sparse_subgraph_search(neighbour_set, members, k, clique, should_stop):
+    # Поиск в подграфе на members (все они смежны с каждой вершиной clique):
+    # подграф небольшой, поэтому для него строятся битовые маски
+    index = {vertex: position for position, vertex in enumerate(members)}
+    member_set = set(members)
+    adjacency = []
+    for vertex in members:
+        mask = 0
+        for other in neighbour_set(vertex) & member_set:
+            mask |= 1 << index[other]
+        adjacency.append(mask)
+
+    local = []
+    candidates = k_core_mask(adjacency, k - len(clique) - 1)
+    if candidates.bit_count() < k - len(clique):
+        return False, 0, 0
+    found, steps, pruned = _bitset_subtree_search(
+        adjacency, k - len(clique), local, candidates, should_stop
+    )
+    if found:
+        clique.extend(members[position] for position in local)
+    return found, steps, pruned
+
+
+def sparse_clique_search(graph, k, stats=None, should_stop=None, seed=None):
+    # Поиск клики размера k в разреженном графе. Вершины (k-1)-ядра
+    # перебираются в порядке вырождения; клика с младшей вершиной v лежит
+    # в «прямой» окрестности v — соседях, идущих позже в порядке, — а ее
+    # размер не превосходит вырожденности графа. Поэтому маски строятся
+    # только для этих небольших подграфов, и работа растет с числом ребер,
+    # а не с n^2
+    if not isinstance(graph, SparseGraph):
+        graph = SparseGraph.from_graph(graph)
+    n = len(graph)
+    order, core = sparse_core_decomposition(graph)
+    alive = [vertex_core >= k - 1 for vertex_core in core]
+    rank = [0] * n
+    for position, vertex in enumerate(order):
+        rank[vertex] = position
+
+    indptr = graph.indptr.tolist()
+    indices = graph.indices.tolist()
+    neighbour_sets = {}
+
+    def neighbour_set(vertex):
+        neighbours = neighbour_sets.get(vertex)
+        if neighbours is None:
+            neighbours = neighbour_sets[vertex] = set(
+                indices[indptr[vertex] : indptr[vertex + 1]]
+            )
+        return neighbours
+
+    # Корень дерева поиска считается одним шагом, как в bitset_clique_search
+    steps, pruned, found, clique = 1, 0, k <= 0, []
+
+    if seed and not found:
+        clique = list(seed)[:k]
+        if all(alive[vertex] for vertex in clique) and all(
+            v in neighbour_set(u) for u, v in itertools.combinations(clique, 2)
+        ):
+            candidates = set.intersection(*map(neighbour_set, clique))
+            members = sorted(vertex for vertex in candidates if alive[vertex])
+            found, seed_steps, seed_pruned = _sparse_subgraph_search(
+                neighbour_set, members, k, clique, should_stop
+            )
+            steps += seed_steps
+            pruned += seed_pruned
+        if not found:
+            clique = []
+
+    if not found and found is not None:
+        for position, vertex in enumerate(order):
+            if should_stop is not None and not position & 1023 and should_stop():
+                found = None
+                break
+            if not alive[vertex]:
+                continue
+            forward = [
+                neighbour
+                for neighbour in indices[indptr[vertex] : indptr[vertex + 1]]
+                if alive[neighbour] and rank[neighbour] > position
+            ]
+            if len(forward) < k - 1:
+                continue
+
+            clique = [vertex]
+            found, local_steps, local_pruned = _sparse_subgraph_search(
+                neighbour_set, forward, k, clique, should_stop
+            )
+            steps += local_steps
+            pruned += local_pruned
+            if found is not False:
+                break
+    if found is None:
+        raise SearchCancelled
+
+    if stats is not None:
+        stats["steps"] = steps
+        stats["pruned"] = pruned
+        stats["core_removed"] = alive.count(False)
+        stats["degeneracy"] = max(core, default=0)
+
+    if found:
+        return True, steps, sorted(clique)
+    return False, steps, []
+
+
+_worker_state = {}
+
+
+def _init_parallel_worker(adjacency, alive, k, stop_event):
+    _worker_state["adjacency"] = adjacency
+    _worker_state["alive"] = alive
+    _worker_state["k"] = k
+    _worker_state["stop_event"] = stop_event
+
+
+def _search_from_vertex(vertex):
+    # Поддерево верхнего уровня: клики, младшая вершина которых — vertex
+    stop_event = _worker_state["stop_event"]
+    if stop_event.is_set():
+        return False, 0, []
+
+    adjacency = _worker_state["adjacency"]
+    higher = _worker_state["alive"] & ~((1 << (vertex + 1)) - 1)
+    clique = [vertex]
+
+    found, steps, pruned = _bitset_subtree_search(
+        adjacency,
+        _worker_state["k"],
+        clique,
+        adjacency[vertex] & higher,
+        stop_event.is_set,
+    )
+
+    if found:
+        stop_event.set()
+        return True, steps, sorted(clique)
+    return False, steps, []
+
+
+def parallel_clique_search(graph, k, workers=None):
+    adjacency = graph_to_bitsets(graph)
+    if k <= 1 or workers == 1:
+        return bitset_clique_search(graph, k)
+
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    alive = k_core_mask(adjacency, k - 1)
+    context = multiprocessing.get_context()
+    stop_event = context.Event()
+
+    # Корень дерева поиска считается одним шагом, как в последовательном поиске
+    total_steps = 1
+    result = []
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=context,
+        initializer=_init_parallel_worker,
+        initargs=(adjacency, alive, k, stop_event),
+    ) as executor:
+        futures = [
+            executor.submit(_search_from_vertex, vertex)
+            for vertex in _bits_to_list(alive)
+        ]
+
+        for future in as_completed(futures):
+            if future.cancelled():
+                continue
+
+            found, steps, clique = future.result()
+            total_steps += steps
+
+            if found and not result:
+                result = clique
+                stop_event.set()
+                for pending in futures:
+                    pending.cancel()
+
+    if result:
+        return True, total_steps, result
+    return False, total_steps, []
+
+
+def degeneracy_order(adjacency):
+    # Последовательно удаляем вершину минимальной степени
+    remaining = (1 << len(adjacency)) - 1
+    degrees = [mask.bit_count() for mask in adjacency]
+    order = []
+    while remaining:
+        vertex = min(
+            (v for v in range(len(adjacency)) if remaining >> v & 1),
+            key=lambda v: degrees[v],
+        )
+        order.append(vertex)
+        remaining ^= 1 << vertex
+        neighbours = adjacency[vertex] & remaining
+        while neighbours:
+            low_bit = neighbours & -neighbours
+            degrees[low_bit.bit_length() - 1] -= 1
+            neighbours ^= low_bit
+    return order
+
+
+def bron_kerbosch(graph):
+    # Перечисление всех максимальных (по включению) клик:
+    # Bron–Kerbosch с опорной вершиной Томиты и вырожденным порядком
+    adjacency = graph_to_bitsets(graph)
+
+    def expand(clique, candidates, excluded):
+        if not candidates and not excluded:
+            yield sorted(clique)
+            return
+
+        pivot_source = candidates | excluded
+        pivot, best = -1, -1
+        while pivot_source:
+            low_bit = pivot_source & -pivot_source
+            vertex = low_bit.bit_length() - 1
+            pivot_source ^= low_bit
+            count = (candidates & adjacency[vertex]).bit_count()
+            if count > best:
+                pivot, best = vertex, count
+
+        for vertex in _bits_to_list(candidates & ~adjacency[pivot]):
+            bit = 1 << vertex
+            clique.append(vertex)
+            yield from expand(
+                clique, candidates & adjacency[vertex], excluded & adjacency[vertex]
+            )
+            clique.pop()
+            candidates ^= bit
+            excluded |= bit
+
+    processed = 0
+    for vertex in degeneracy_order(adjacency):
+        bit = 1 << vertex
+        neighbours = adjacency[vertex]
+        yield from expand([vertex], neighbours & ~processed, neighbours & processed)
+        processed |= bit
+
+
+def find_all_maximal_cliques(graph):
+    return list(bron_kerbosch(graph))
+
+
+def find_maximum_clique(graph, should_stop=None, stats=None):
+    # При остановке через should_stop в stats остаются число шагов и
+    # лучшая найденная к этому моменту клика (best_clique)
+    adjacency = graph_to_bitsets(graph)
+    n = len(adjacency)
+
+    # Перенумеровываем вершины по убыванию степени: раскраска
+    # в таком порядке дает более точные оценки
+    ranking = sorted(range(n), key=lambda v: -adjacency[v].bit_count())
+    position = {vertex: index for index, vertex in enumerate(ranking)}
+    ordered = []
+    for vertex in ranking:
+        mask = 0
+        for neighbour in _bits_to_list(adjacency[vertex]):
+            mask |= 1 << position[neighbour]
+        ordered.append(mask)
+
+    step_count = [0]
+    best = []
+    clique = []
+
+    def expand(candidates):
+        nonlocal best
+        step_count[0] += 1
+
+        if should_stop is not None and not step_count[0] & 1023 and should_stop():
+            raise SearchCancelled
+
+        order, colours = _colour_sort(ordered, candidates)
+        for index in range(len(order) - 1, -1, -1):
+            if len(clique) + colours[index] <= len(best):
+                return
+
+            vertex = order[index]
+            clique.append(vertex)
+            new_candidates = candidates & ordered[vertex]
+            if new_candidates:
+                expand(new_candidates)
+            elif len(clique) > len(best):
+                best = clique.copy()
+            clique.pop()
+            candidates &= ~(1 << vertex)
+
+    try:
+        if n:
+            expand((1 << n) - 1)
+    finally:
+        if stats is not None:
+            stats["steps"] = step_count[0]
+            stats["best_clique"] = sorted(ranking[vertex] for vertex in best)
+
+    result = sorted(ranking[vertex] for vertex in best)
+    return bool(result), step_count[0], result
+
+
+def _backtracking_engine(graph, k):
+    return backtracking_clique_search(graph, k, [], 0, [0])
+
+
+def _iterative_engine(graph, k):
+    return iterative_clique_search(graph, k, [], 0, [0])
+
+
+# Движки поиска клики размера k с единой сигнатурой (graph, k)
+SEARCH_ENGINES = {
+    "backtracking": _backtracking_engine,
+    "iterative": _iterative_engine,
+    "bitset": bitset_clique_search,
+    "numpy": numpy_clique_search,
+    "sparse": sparse_clique_search,
+}
+
+
+# Загрузка графов из файлов: DIMACS (.clq), список ребер, матрица смежности
+GRAPH_FILE_FORMATS = ("dimacs", "edges", "matrix")
+_FORMAT_BY_EXTENSION = {
+    ".clq": "dimacs",
+    ".col": "dimacs",
+    ".dimacs": "dimacs",
+    ".edges": "edges",
+    ".el": "edges",
+    ".adj": "matrix",
+    ".mat": "matrix",
+    ".matrix": "matrix",
+}
+
+
+@contextmanager
+def _graph_file_lines(source):
+    # Строки файла (bytes) без загрузки файла целиком: путь отображается
+    # в память через mmap, открытый файл читается построчно
+    if not isinstance(source, (str, bytes, os.PathLike)):
+        yield iter(source)
+        return
+
+    with open(source, "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            yield iter(())
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield iter(mapped.readline, b"")
+
+
+_COMMENT_PREFIXES = (b"c", b"#", b"%")
+
+
+def _is_comment(line):
+    return not line or line[:1] in _COMMENT_PREFIXES
+
+
+def _matrix_digits(line, min_columns=3):
+    # Цифры строки матрицы смежности или None, если это не строка матрицы:
+    # «0 1 1», «0,1,1» или «011»; при определении формата по содержимому
+    # строки короче трех столбцов не отличить от ребра
+    tokens = line.replace(b",", b" ").split()
+    if len(tokens) == 1:
+        digits = tokens[0]
+    elif all(token in (b"0", b"1") for token in tokens):
+        digits = b"".join(tokens)
+    else:
+        return None
+    if len(digits) < min_columns or not set(digits) <= set(b"01"):
+        return None
+    return digits
+
 
-    step_count[0] += 1
+def _sniff_graph_format(lines):
+    # Формат по первой значимой строке; возвращает формат и эту строку
+    for line in lines:
+        line = line.strip()
+        if _is_comment(line):
+            continue
+        if line[:2] in (b"p ", b"e "):
+            return "dimacs", line
+        if _matrix_digits(line) is not None:
+            return "matrix", line
+        return "edges", line
+    return "edges", b""
+
+
+def _edges_to_bitsets(endpoints, n):
+    # Маски собираются в bytearray по вершине и переводятся в int один раз:
+    # O(m + n^2 / 8) вместо сдвигов длинных чисел на каждое ребро
+    width = (n + 7) // 8
+    rows = [bytearray(width) for _ in range(n)]
+    pairs = iter(endpoints)
+    for u, v in zip(pairs, pairs):
+        rows[u][v >> 3] |= 1 << (v & 7)
+        rows[v][u >> 3] |= 1 << (u & 7)
+    return [
+        int.from_bytes(row, "little") & ~(1 << vertex)
+        for vertex, row in enumerate(rows)
+    ]
+
+
+def _read_edges(lines, first_line, dimacs):
+    # Ребра DIMACS нумеруются с 1 («e u v»), в списке ребер — с 0 («u v»);
+    # концы ребер копятся в компактном массиве, а не в списках соседей
+    endpoints = array("q")
+    append = endpoints.append
+    declared = 0
+    offset = 1 if dimacs else 0
+
+    for line in itertools.chain((first_line,), lines):
+        tokens = line.split()
+        if not tokens or tokens[0][:1] in _COMMENT_PREFIXES:
+            continue
+        if dimacs:
+            if tokens[0] == b"p":
+                # «p edge <вершин> <ребер>»
+                if len(tokens) < 3:
+                    raise ValueError(f"Некорректная строка DIMACS: {line[:40]!r}")
+                declared = int(tokens[2])
+                continue
+            if tokens[0] != b"e":
+                raise ValueError(f"Неизвестная строка DIMACS: {line[:40]!r}")
+            del tokens[0]
+        if len(tokens) < 2:
+            raise ValueError(f"Некорректное ребро: {line[:40]!r}")
+        append(int(tokens[0]) - offset)
+        append(int(tokens[1]) - offset)
+
+    if endpoints and min(endpoints) < 0:
+        raise ValueError("Некорректный номер вершины в списке ребер")
+    n = max(declared, max(endpoints, default=-1) + 1)
+    return endpoints, n
+
+
+def _read_matrix(lines, first_line):
+    # Строка матрицы: младший бит маски — столбец 0. Матрица
+    # симметризуется, диагональ отбрасывается
+    adjacency = []
+    columns = 0
+    for line in itertools.chain((first_line,), lines):
+        line = line.strip()
+        if _is_comment(line):
+            continue
+        digits = _matrix_digits(line, min_columns=1)
+        if digits is None:
+            raise ValueError(f"Некорректная строка матрицы: {line[:40]!r}")
+        adjacency.append(int(digits[::-1], 2))
+        columns = max(columns, len(digits))
+
+    n = len(adjacency)
+    if columns > n:
+        raise ValueError("Матрица смежности должна быть квадратной")
+    for vertex in range(n):
+        adjacency[vertex] &= ~(1 << vertex)
+    for vertex in range(n):
+        mask = adjacency[vertex]
+        while mask:
+            low = mask & -mask
+            adjacency[low.bit_length() - 1] |= 1 << vertex
+            mask ^= low
+    return adjacency
+
+
+def load_graph(source, graph_format=None, sparse=False):
+    # Читает граф из файла (путь или открытый двоичный файл) потоково и
+    # возвращает BitsetGraph, а при sparse=True — SparseGraph (без масок
+    # на n бит); формат определяется по расширению или по первой значимой
+    # строке
+    if graph_format is None and isinstance(source, (str, os.PathLike)):
+        extension = os.path.splitext(os.fspath(source))[1].lower()
+        graph_format = _FORMAT_BY_EXTENSION.get(extension)
+    if graph_format is not None and graph_format not in GRAPH_FILE_FORMATS:
+        raise ValueError(f"Неизвестный формат графа: {graph_format}")
+
+    with _graph_file_lines(source) as lines:
+        sniffed, first_line = _sniff_graph_format(lines)
+        graph_format = graph_format or sniffed
+        if graph_format == "matrix":
+            graph = BitsetGraph(_read_matrix(lines, first_line))
+            return SparseGraph.from_graph(graph) if sparse else graph
+        endpoints, n = _read_edges(lines, first_line, graph_format == "dimacs")
+
+    if sparse:
+        return SparseGraph.from_edges(n, endpoints)
+    return BitsetGraph(_edges_to_bitsets(endpoints, n))
 
-    if log_function:
-        log_function(
-            f"Шаг {step_count[0]}: Текущее множество: {current_set}, start_index: {start_index}\n"
+
+def check_adjacency_matrix(graph):
+    # Матрица из внешнего запроса (JSON): квадратный список списков из целых
+    # 0 и 1, симметричный и с нулями на диагонали
+    if not isinstance(graph, list) or any(
+        not isinstance(row, list) or len(row) != len(graph) for row in graph
+    ):
+        raise ValueError("Граф должен быть квадратной матрицей смежности")
+    for i, row in enumerate(graph):
+        for value in row:
+            if type(value) is not int or value not in (0, 1):
+                raise ValueError("Элементы матрицы смежности должны быть 0 или 1")
+        if row[i]:
+            raise ValueError("На диагонали матрицы смежности должны быть нули")
+        for j in range(i):
+            if row[j] != graph[j][i]:
+                raise ValueError("Матрица смежности должна быть симметричной")
+    return graph
+
+
+# Форматы хранения graph_matrix (столбец graph_format)
+GRAPH_FORMAT_JSON = 0
+GRAPH_FORMAT_PACKED = 1
+GRAPH_FORMAT_PACKED_ZLIB = 2
+# Матрица сессии хранится в таблице graphs (search_sessions.graph_id)
+GRAPH_FORMAT_SHARED = 3
+
+
+def _pack_upper_triangle(graph):
+    import numpy as np
+
+    if isinstance(graph, SparseGraph):
+        # Биты ставятся только для ребер: без плотной матрицы n x n
+        n = len(graph)
+        rows = np.repeat(np.arange(n, dtype=np.int64), graph.degrees())
+        upper = rows < graph.indices
+        rows, columns = rows[upper], graph.indices[upper]
+        positions = rows * n - rows * (rows + 1) // 2 + columns - rows - 1
+        packed = np.zeros((n * (n - 1) // 2 + 7) // 8, dtype=np.uint8)
+        np.bitwise_or.at(
+            packed, positions >> 3, (128 >> (positions & 7)).astype(np.uint8)
         )
+        return packed.tobytes()
 
-    if len(current_set) == k:
-        if is_clique(graph, current_set):
-            if log_function:
-                log_function(f"✓ НАЙДЕНА КЛИКА: {current_set}\n\n", "success")
-            return True, step_count[0], current_set.copy()
-        else:
-            if log_function:
-                log_function(f"✗ Множество {current_set} не является кликой\n\n")
-            return False, step_count[0], []
+    matrix = as_adjacency_matrix(graph) != 0
+    rows, columns = np.triu_indices(len(matrix), 1)
+    return np.packbits(matrix[rows, columns]).tobytes()
 
-    for i in range(start_index, len(graph)):
-        can_add = True
-        for vertex in current_set:
-            if graph[i][vertex] == 0:
-                can_add = False
-                break
 
-        if can_add:
-            if log_function:
-                log_function(f"  Добавляем вершину {i} в {current_set}\n")
+def graph_hash(graph):
+    # Ключ графа в таблице graphs: sha256 от числа вершин и упакованной
+    # матрицы. Графы с разной нумерацией вершин дают разные ключи
+    import hashlib
 
-            current_set.append(i)
-            found, steps, clique = backtracking_clique_search(
-                graph, k, current_set, i + 1, step_count, log_function
-            )
+    digest = hashlib.sha256(struct.pack("<I", len(graph)))
+    digest.update(_pack_upper_triangle(graph))
+    return digest.hexdigest()
 
-            if found:
-                return True, steps, clique
 
-            if log_function:
-                log_function(f"  BACKTRACK: убираем вершину {i} из {current_set}\n")
-            current_set.pop()
+def encode_graph_matrix(graph, compress=True):
+    # Верхний треугольник матрицы, упакованный по биту на ребро;
+    # zlib применяется, только если он действительно уменьшает размер.
+    # Возвращает (graph_format, blob)
+    packed = _pack_upper_triangle(graph)
 
-    return False, step_count[0], []
+    if compress:
+        compressed = zlib.compress(packed)
+        if len(compressed) < len(packed):
+            return GRAPH_FORMAT_PACKED_ZLIB, compressed
+    return GRAPH_FORMAT_PACKED, packed
+
+
+def decode_graph_matrix(data, graph_format, vertices):
+    import numpy as np
+
+    if graph_format == GRAPH_FORMAT_JSON:
+        return json.loads(data) if data else []
+    if graph_format == GRAPH_FORMAT_PACKED_ZLIB:
+        data = zlib.decompress(data)
+    elif graph_format != GRAPH_FORMAT_PACKED:
+        raise ValueError(f"Неизвестный формат матрицы смежности: {graph_format}")
+
+    rows, columns = np.triu_indices(vertices, 1)
+    bits = np.unpackbits(np.frombuffer(data, dtype=np.uint8), count=len(rows))
+    matrix = np.zeros((vertices, vertices), dtype=np.uint8)
+    matrix[rows, columns] = bits
+    matrix[columns, rows] = bits
+    return matrix.tolist()
+
+
+def decode_sparse_graph(data, graph_format, vertices):
+    # То же, что decode_graph_matrix, но в SparseGraph: распаковываются
+    # только ненулевые байты, память O(n + m) вместо n^2
+    import numpy as np
+
+    if graph_format == GRAPH_FORMAT_JSON:
+        return SparseGraph.from_graph(json.loads(data) if data else [])
+    if graph_format == GRAPH_FORMAT_PACKED_ZLIB:
+        data = zlib.decompress(data)
+    elif graph_format != GRAPH_FORMAT_PACKED:
+        raise ValueError(f"Неизвестный формат матрицы смежности: {graph_format}")
+
+    packed = np.frombuffer(data, dtype=np.uint8)
+    nonzero = np.flatnonzero(packed)
+    bits = np.unpackbits(packed[nonzero]).reshape(-1, 8)
+    byte_index, bit = np.nonzero(bits)
+    positions = nonzero[byte_index] * 8 + bit
+    positions = positions[positions < vertices * (vertices - 1) // 2]
+
+    # Номер бита в верхнем треугольнике -> (строка, столбец)
+    row_index = np.arange(vertices, dtype=np.int64)
+    starts = row_index * vertices - row_index * (row_index + 1) // 2
+    rows = np.searchsorted(starts, positions, side="right") - 1
+    columns = positions - starts[rows] + rows + 1
+    return SparseGraph.from_edges(vertices, np.column_stack((rows, columns)))
+
+
+class LatencySketch:
+    # Потоковая оценка квантилей времени поиска: значение x попадает в
+    # логарифмическую корзину ceil(log_gamma(x)), поэтому квантиль
+    # определяется с относительной погрешностью не больше accuracy
+    # при объеме памяти, зависящем только от разброса значений
+    MIN_VALUE = 1e-9
+
+    def __init__(self, accuracy=0.01):
+        self.accuracy = accuracy
+        self.gamma = (1 + accuracy) / (1 - accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.counts = {}
+        self.zero_count = 0
+
+    @property
+    def count(self):
+        return self.zero_count + sum(self.counts.values())
+
+    def add(self, value, count=1):
+        if value < self.MIN_VALUE:
+            self.zero_count += count
+            return
+        index = math.ceil(math.log(value) / self.log_gamma)
+        self.counts[index] = self.counts.get(index, 0) + count
+
+    def merge(self, other):
+        if other.accuracy != self.accuracy:
+            raise ValueError("Нельзя объединить оценки с разной точностью")
+        self.zero_count += other.zero_count
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+
+    def quantile(self, q):
+        total = self.count
+        if not total:
+            return 0.0
+
+        rank = q * (total - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if rank < seen:
+                # Середина корзины (gamma^(i-1), gamma^i] по относительной ошибке
+                return 2 * self.gamma**index / (self.gamma + 1)
+
+    def to_json(self):
+        return json.dumps(
+            {
+                "accuracy": self.accuracy,
+                "zero": self.zero_count,
+                "counts": {str(index): count for index, count in self.counts.items()},
+            }
+        )
+
+    @classmethod
+    def from_json(cls, text):
+        data = json.loads(text)
+        sketch = cls(data["accuracy"])
+        sketch.zero_count = data["zero"]
+        sketch.counts = {int(index): count for index, count in data["counts"].items()}
+        return sketch
+
+
+# Строка search_summary с итогами по всем поискам; остальные строки —
+# итоги по (graph_vertices, target_k). Ключ не совпадает ни с одной
+# настоящей парой: сессия с пустым графом и k = 0 тоже возможна
+SUMMARY_TOTAL = (-1, -1)
+
+
+# Путь к базе по умолчанию; переопределяется переменной окружения
+# CLIQUE_DB_PATH
+DEFAULT_DB_PATH = "clique_results.db"
 
 
 class CliqueDatabase:
 
-    def __init__(self, db_path="clique_results.db"):
+    def __init__(self, db_path=None, cache_size=256):
+        if db_path is None:
+            db_path = os.environ.get("CLIQUE_DB_PATH", DEFAULT_DB_PATH)
         self.db_path = db_path
-        self.init_database()
+        # LRU-кэши перед запросами к БД: результаты (graph_hash, k) -> результат
+        # и известные границы graph_hash -> {"best_clique", "infeasible_k"}
+        self._result_cache = OrderedDict()
+        self._bounds_cache = OrderedDict()
+        self._cache_size = cache_size
+        # Одно постоянное соединение на объект; доступ из разных потоков
+        # сериализуется блокировкой, схема создается при первом обращении
+        self._lock = threading.RLock()
+        self._connection = None
+        self._transaction_depth = 0
+
+    def _connect(self):
+        if self._connection is None:
+            import sqlite3
+
+            conn = sqlite3.connect(
+                self.db_path,
+                timeout=30,
+                isolation_level=None,
+                check_same_thread=False,
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA cache_size=-16000")
+            conn.execute("PRAGMA temp_store=MEMORY")
+            self._connection = conn
+            self._create_schema(conn.cursor())
+        return self._connection
+
+    @contextmanager
+    def transaction(self):
+        # Вложенные вызовы выполняются в рамках внешней транзакции
+        with self._lock:
+            conn = self._connect()
+            if self._transaction_depth:
+                self._transaction_depth += 1
+                try:
+                    yield conn.cursor()
+                finally:
+                    self._transaction_depth -= 1
+                return
+
+            conn.execute("BEGIN IMMEDIATE")
+            self._transaction_depth = 1
+            try:
+                yield conn.cursor()
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            else:
+                conn.execute("COMMIT")
+            finally:
+                self._transaction_depth = 0
+
+    @contextmanager
+    def _reader(self):
+        with self._lock:
+            yield self._connect().cursor()
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
 
     def init_database(self):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with self.transaction():
+            pass
 
+    def _create_schema(self, cursor):
         cursor.execute(
             """
             CREATE TABLE IF NOT EXISTS search_sessions (
@@ -100,47 +1808,503 @@ class CliqueDatabase:
         """
         )
 
-        conn.commit()
-        conn.close()
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS search_checkpoints (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+                graph_vertices INTEGER NOT NULL,
+                target_k INTEGER NOT NULL,
+                steps INTEGER NOT NULL,
+                execution_time REAL NOT NULL,
+                search_state TEXT NOT NULL,
+                graph_matrix TEXT NOT NULL
+            )
+        """
+        )
+
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS graphs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                graph_hash TEXT NOT NULL UNIQUE,
+                graph_vertices INTEGER NOT NULL,
+                graph_matrix BLOB NOT NULL,
+                graph_format INTEGER NOT NULL
+            )
+        """
+        )
 
-    def save_search_result(
-        self, graph, k, found, clique_vertices, steps, execution_time
-    ):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        # Столбцы, которых нет в базах, созданных предыдущими версиями.
+        # graph_format = 0 означает матрицу в JSON; best_clique — наибольшая
+        # известная клика графа, infeasible_k — наименьший k, для которого
+        # доказано отсутствие клики
+        added = set()
+        for table, column, definition in (
+            ("search_sessions", "graph_format", "INTEGER NOT NULL DEFAULT 0"),
+            ("search_checkpoints", "graph_format", "INTEGER NOT NULL DEFAULT 0"),
+            ("search_sessions", "graph_id", "INTEGER REFERENCES graphs(id)"),
+            ("graphs", "best_size", "INTEGER NOT NULL DEFAULT 0"),
+            ("graphs", "best_clique", "TEXT"),
+            ("graphs", "infeasible_k", "INTEGER"),
+            ("performance_stats", "elapsed", "REAL"),
+            ("performance_stats", "depth", "INTEGER"),
+        ):
+            cursor.execute(f"PRAGMA table_info({table})")
+            if column not in {row[1] for row in cursor.fetchall()}:
+                cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+                added.add(column)
 
-        graph_json = json.dumps(graph)
-        clique_json = json.dumps(clique_vertices) if clique_vertices else None
+        # Границы для графов, сохраненных до их появления, восстанавливаются
+        # по истории поисков
+        if "infeasible_k" in added:
+            cursor.execute(
+                """
+                UPDATE graphs SET
+                    best_size = COALESCE((
+                        SELECT MAX(target_k) FROM search_sessions s
+                        WHERE s.graph_id = graphs.id AND s.found_clique
+                        AND s.clique_vertices IS NOT NULL
+                    ), 0),
+                    best_clique = (
+                        SELECT clique_vertices FROM search_sessions s
+                        WHERE s.graph_id = graphs.id AND s.found_clique
+                        AND s.clique_vertices IS NOT NULL
+                        ORDER BY s.target_k DESC LIMIT 1
+                    ),
+                    infeasible_k = (
+                        SELECT MIN(target_k) FROM search_sessions s
+                        WHERE s.graph_id = graphs.id AND NOT s.found_clique
+                    )
+            """
+            )
+
+        cursor.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_sessions_graph
+            ON search_sessions (graph_id, target_k)
+        """
+        )
+        # Итоги для get_statistics; для баз, где таблицы еще не было,
+        # они один раз пересчитываются по истории поисков
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'search_summary'"
+        )
+        summary_exists = cursor.fetchone() is not None
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS search_summary (
+                graph_vertices INTEGER NOT NULL,
+                target_k INTEGER NOT NULL,
+                total INTEGER NOT NULL,
+                successes INTEGER NOT NULL,
+                sum_steps INTEGER NOT NULL,
+                max_steps INTEGER NOT NULL,
+                sum_time REAL NOT NULL,
+                max_time REAL NOT NULL,
+                time_sketch TEXT NOT NULL,
+                PRIMARY KEY (graph_vertices, target_k)
+            )
+        """
+        )
+        if summary_exists:
+            # Прежние версии хранили итоги под ключом (0, 0) вместе с
+            # настоящей парой (0, 0); такие итоги пересчитываются заново
+            cursor.execute(
+                "SELECT 1 FROM search_summary WHERE graph_vertices = ? AND target_k = ?",
+                SUMMARY_TOTAL,
+            )
+            if cursor.fetchone() is None:
+                cursor.execute("DELETE FROM search_summary")
+                summary_exists = False
+        if not summary_exists:
+            cursor.execute(
+                """
+                SELECT graph_vertices, target_k, found_clique, steps, execution_time
+                FROM search_sessions
+            """
+            )
+            self._update_summary(cursor, cursor.fetchall())
+
+        cursor.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_performance_session
+            ON performance_stats (session_id, step_count)
+        """
+        )
+        cursor.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_sessions_timestamp
+            ON search_sessions (timestamp DESC, id DESC)
+        """
+        )
 
+    def _graph_id(self, cursor, graph, key=None):
+        key = key or graph_hash(graph)
+        cursor.execute("SELECT id FROM graphs WHERE graph_hash = ?", (key,))
+        row = cursor.fetchone()
+        if row:
+            return row[0]
+
+        graph_format, graph_blob = encode_graph_matrix(graph)
         cursor.execute(
             """
-            INSERT INTO search_sessions 
-            (graph_vertices, target_k, found_clique, clique_vertices, steps, execution_time, graph_matrix)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
+            INSERT INTO graphs (graph_hash, graph_vertices, graph_matrix, graph_format)
+            VALUES (?, ?, ?, ?)
         """,
-            (len(graph), k, found, clique_json, steps, execution_time, graph_json),
+            (key, len(graph), graph_blob, graph_format),
         )
+        return cursor.lastrowid
 
-        session_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
+    def _update_summary(self, cursor, rows):
+        # rows — (graph_vertices, target_k, found, steps, execution_time) новых
+        # сессий; вызывается в той же транзакции, что и их вставка
+        buckets = {}
+        for vertices, k, found, steps, execution_time in rows:
+            for key in (SUMMARY_TOTAL, (vertices, k)):
+                if key not in buckets:
+                    cursor.execute(
+                        """
+                        SELECT total, successes, sum_steps, max_steps, sum_time, max_time, time_sketch
+                        FROM search_summary WHERE graph_vertices = ? AND target_k = ?
+                    """,
+                        key,
+                    )
+                    row = cursor.fetchone()
+                    if row:
+                        buckets[key] = [*row[:6], LatencySketch.from_json(row[6])]
+                    else:
+                        buckets[key] = [0, 0, 0, 0, 0.0, 0.0, LatencySketch()]
 
-        return session_id
+                bucket = buckets[key]
+                bucket[0] += 1
+                bucket[1] += bool(found)
+                bucket[2] += steps
+                bucket[3] = max(bucket[3], steps)
+                bucket[4] += execution_time
+                bucket[5] = max(bucket[5], execution_time)
+                bucket[6].add(execution_time)
 
-    def get_all_sessions(self):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor.executemany(
+            """
+            INSERT OR REPLACE INTO search_summary
+            (graph_vertices, target_k, total, successes, sum_steps, max_steps, sum_time, max_time, time_sketch)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+            [
+                (*key, *bucket[:6], bucket[6].to_json())
+                for key, bucket in buckets.items()
+            ],
+        )
 
-        cursor.execute(
+    def _update_bounds(self, cursor, graph_id, clique=None, infeasible_k=None):
+        if clique:
+            cursor.execute(
+                """
+                UPDATE graphs SET best_size = ?, best_clique = ?
+                WHERE id = ? AND best_size < ?
+            """,
+                (len(clique), json.dumps(sorted(clique)), graph_id, len(clique)),
+            )
+        if infeasible_k is not None:
+            cursor.execute(
+                """
+                UPDATE graphs SET infeasible_k = ?
+                WHERE id = ? AND (infeasible_k IS NULL OR infeasible_k > ?)
+            """,
+                (infeasible_k, graph_id, infeasible_k),
+            )
+
+    def _insert_samples(self, cursor, session_id, samples):
+        cursor.executemany(
             """
-            SELECT id, timestamp, graph_vertices, target_k, found_clique, clique_vertices, steps, execution_time
-            FROM search_sessions 
-            ORDER BY timestamp DESC
-        """
+            INSERT INTO performance_stats (session_id, step_count, elapsed, memory_usage, depth)
+            VALUES (?, ?, ?, ?, ?)
+        """,
+            [
+                (session_id, step, elapsed, memory, depth)
+                for step, elapsed, memory, depth in samples
+            ],
+        )
+
+    def save_performance_samples(self, session_id, samples):
+        with self.transaction() as cursor:
+            self._insert_samples(cursor, session_id, samples)
+
+    def get_performance_samples(self, session_id):
+        # Образцы сессии по возрастанию шага: (шаг, время, память, глубина)
+        with self._reader() as cursor:
+            cursor.execute(
+                """
+                SELECT step_count, elapsed, memory_usage, depth
+                FROM performance_stats WHERE session_id = ?
+                ORDER BY step_count
+            """,
+                (session_id,),
+            )
+            return cursor.fetchall()
+
+    def get_instrumented_sessions(self, limit=5):
+        # Последние сессии, для которых есть образцы
+        with self._reader() as cursor:
+            cursor.execute(
+                """
+                SELECT id, graph_vertices, target_k, steps, execution_time
+                FROM search_sessions
+                WHERE id IN (SELECT DISTINCT session_id FROM performance_stats)
+                ORDER BY id DESC LIMIT ?
+            """,
+                (limit,),
+            )
+            rows = cursor.fetchall()
+
+        return [
+            {
+                "id": row[0],
+                "graph_vertices": row[1],
+                "target_k": row[2],
+                "steps": row[3],
+                "execution_time": row[4],
+            }
+            for row in rows
+        ]
+
+    def _cache_put(self, cache, key, value):
+        with self._lock:
+            cache[key] = value
+            cache.move_to_end(key)
+            while len(cache) > self._cache_size:
+                cache.popitem(last=False)
+
+    def get_graph_bounds(self, graph, key=None):
+        key = key or graph_hash(graph)
+        with self._lock:
+            bounds = self._bounds_cache.get(key)
+            if bounds is not None:
+                self._bounds_cache.move_to_end(key)
+                return dict(bounds, best_clique=list(bounds["best_clique"]))
+
+        with self._reader() as cursor:
+            cursor.execute(
+                "SELECT best_clique, infeasible_k FROM graphs WHERE graph_hash = ?",
+                (key,),
+            )
+            row = cursor.fetchone()
+
+        bounds = {
+            "best_clique": json.loads(row[0]) if row and row[0] else [],
+            "infeasible_k": row[1] if row else None,
+        }
+        self._cache_put(self._bounds_cache, key, bounds)
+        return dict(bounds, best_clique=list(bounds["best_clique"]))
+
+    def record_bounds(self, graph, clique=None, infeasible_k=None):
+        # Сохраняет найденную клику и/или доказанную недостижимость k;
+        # границы только уточняются, ослабить их нельзя
+        key = graph_hash(graph)
+        with self.transaction() as cursor:
+            self._update_bounds(
+                cursor, self._graph_id(cursor, graph, key), clique, infeasible_k
+            )
+        with self._lock:
+            self._bounds_cache.pop(key, None)
+
+    def find_cached_result(self, graph, k):
+        # Последний сохраненный результат для того же графа и k или None
+        key = (graph_hash(graph), k)
+        with self._lock:
+            result = self._result_cache.get(key)
+            if result is not None:
+                self._result_cache.move_to_end(key)
+                return dict(result)
+
+        with self._reader() as cursor:
+            cursor.execute(
+                """
+                SELECT s.id, s.found_clique, s.clique_vertices, s.steps, s.execution_time
+                FROM search_sessions s JOIN graphs g ON g.id = s.graph_id
+                WHERE g.graph_hash = ? AND s.target_k = ?
+                ORDER BY s.id DESC LIMIT 1
+            """,
+                key,
+            )
+            row = cursor.fetchone()
+
+        if row is None:
+            return self._answer_from_bounds(k, self.get_graph_bounds(graph, key[0]))
+
+        result = {
+            "session_id": row[0],
+            "k": k,
+            "found": bool(row[1]),
+            "clique_vertices": json.loads(row[2]) if row[2] else None,
+            "steps": row[3],
+            "execution_time": row[4],
+        }
+        self._cache_put(self._result_cache, key, result)
+        return dict(result)
+
+    def _answer_from_bounds(self, k, bounds):
+        # Любые k вершин клики образуют клику; если нет клики размера
+        # infeasible_k, то нет и больших
+        best_clique = bounds["best_clique"]
+        infeasible_k = bounds["infeasible_k"]
+        if k <= 0:
+            return None
+        if k <= len(best_clique):
+            found, clique_vertices = True, best_clique[:k]
+        elif infeasible_k is not None and k >= infeasible_k:
+            found, clique_vertices = False, None
+        else:
+            return None
+
+        return {
+            "session_id": None,
+            "k": k,
+            "found": found,
+            "clique_vertices": clique_vertices,
+            "steps": 0,
+            "execution_time": 0.0,
+        }
+
+    def save_search_result(
+        self, graph, k, found, clique_vertices, steps, execution_time, samples=None
+    ):
+        # samples — образцы SamplingTracer, пишутся в performance_stats
+        key = graph_hash(graph)
+        clique_json = json.dumps(clique_vertices) if clique_vertices else None
+
+        with self.transaction() as cursor:
+            graph_id = self._graph_id(cursor, graph, key)
+            cursor.execute(
+                """
+                INSERT INTO search_sessions 
+                (graph_vertices, target_k, found_clique, clique_vertices, steps, execution_time, graph_matrix, graph_format, graph_id)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+                (
+                    len(graph),
+                    k,
+                    found,
+                    clique_json,
+                    steps,
+                    execution_time,
+                    b"",
+                    GRAPH_FORMAT_SHARED,
+                    graph_id,
+                ),
+            )
+            session_id = cursor.lastrowid
+            self._update_bounds(
+                cursor,
+                graph_id,
+                clique_vertices if found else None,
+                None if found else k,
+            )
+            self._update_summary(
+                cursor, [(len(graph), k, found, steps, execution_time)]
+            )
+            if samples:
+                self._insert_samples(cursor, session_id, samples)
+
+        with self._lock:
+            self._bounds_cache.pop(key, None)
+        self._cache_put(
+            self._result_cache,
+            (key, k),
+            {
+                "session_id": session_id,
+                "k": k,
+                "found": bool(found),
+                "clique_vertices": clique_vertices if clique_vertices else None,
+                "steps": steps,
+                "execution_time": execution_time,
+            },
         )
+        return session_id
+
+    def save_search_results_bulk(self, results):
+        # results — словари с теми же ключами, что и аргументы save_search_result
+        results = list(results)
+        keys = [graph_hash(result["graph"]) for result in results]
+
+        with self.transaction() as cursor:
+            graph_ids = {}
+            rows = []
+            for key, result in zip(keys, results):
+                if key not in graph_ids:
+                    graph_ids[key] = self._graph_id(cursor, result["graph"], key)
+                clique_vertices = result["clique_vertices"]
+                rows.append(
+                    (
+                        len(result["graph"]),
+                        result["k"],
+                        result["found"],
+                        json.dumps(clique_vertices) if clique_vertices else None,
+                        result["steps"],
+                        result["execution_time"],
+                        b"",
+                        GRAPH_FORMAT_SHARED,
+                        graph_ids[key],
+                    )
+                )
+
+            cursor.executemany(
+                """
+                INSERT INTO search_sessions
+                (graph_vertices, target_k, found_clique, clique_vertices, steps, execution_time, graph_matrix, graph_format, graph_id)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+                rows,
+            )
+            # Внутри транзакции id новых строк идут подряд
+            cursor.execute("SELECT last_insert_rowid()")
+            first_id = cursor.fetchone()[0] - len(rows) + 1
+
+            for key, result in zip(keys, results):
+                self._update_bounds(
+                    cursor,
+                    graph_ids[key],
+                    result["clique_vertices"] if result["found"] else None,
+                    None if result["found"] else result["k"],
+                )
+            self._update_summary(
+                cursor, [(row[0], row[1], row[2], row[4], row[5]) for row in rows]
+            )
+            for offset, result in enumerate(results):
+                if result.get("samples"):
+                    self._insert_samples(cursor, first_id + offset, result["samples"])
+
+        for offset, (key, result) in enumerate(zip(keys, results)):
+            with self._lock:
+                self._bounds_cache.pop(key, None)
+            self._cache_put(
+                self._result_cache,
+                (key, result["k"]),
+                {
+                    "session_id": first_id + offset,
+                    "k": result["k"],
+                    "found": bool(result["found"]),
+                    "clique_vertices": result["clique_vertices"] or None,
+                    "steps": result["steps"],
+                    "execution_time": result["execution_time"],
+                },
+            )
+        return len(rows)
+
+    def get_all_sessions(self):
+        with self._reader() as cursor:
+            cursor.execute(
+                """
+                SELECT id, timestamp, graph_vertices, target_k, found_clique, clique_vertices, steps, execution_time
+                FROM search_sessions 
+                ORDER BY timestamp DESC
+            """
+            )
+            rows = cursor.fetchall()
 
         sessions = []
-        for row in cursor.fetchall():
+        for row in rows:
             session = {
                 "id": row[0],
                 "timestamp": row[1],
@@ -153,23 +2317,90 @@ class CliqueDatabase:
             }
             sessions.append(session)
 
-        conn.close()
         return sessions
 
-    def get_session_by_id(self, session_id):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+    def get_sessions_page(
+        self,
+        limit=100,
+        before=None,
+        after=None,
+        vertices=None,
+        k=None,
+        found=None,
+    ):
+        # Страница истории от новых записей к старым. before/after — ключ
+        # (timestamp, id) записи, после которой (старше) или до которой
+        # (новее) нужно продолжить; фильтры со значением None не применяются.
+        # С after записи идут от старых к новым: страница начинается сразу
+        # за ключом, и следующая страница продолжает ее без пропусков
+        conditions = []
+        params = []
+        if before is not None:
+            conditions.append("(timestamp, id) < (?, ?)")
+            params.extend(before)
+        if after is not None:
+            conditions.append("(timestamp, id) > (?, ?)")
+            params.extend(after)
+        if vertices is not None:
+            conditions.append("graph_vertices = ?")
+            params.append(vertices)
+        if k is not None:
+            conditions.append("target_k = ?")
+            params.append(k)
+        if found is not None:
+            conditions.append("found_clique = ?")
+            params.append(bool(found))
 
-        cursor.execute(
-            """
-            SELECT id, timestamp, graph_vertices, target_k, found_clique, clique_vertices, steps, execution_time, graph_matrix
-            FROM search_sessions 
-            WHERE id = ?
-        """,
-            (session_id,),
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        direction = "ASC" if after is not None else "DESC"
+        with self._reader() as cursor:
+            cursor.execute(
+                f"""
+                SELECT id, timestamp, graph_vertices, target_k, found_clique, clique_vertices, steps, execution_time
+                FROM search_sessions
+                {where}
+                ORDER BY timestamp {direction}, id {direction}
+                LIMIT ?
+            """,
+                (*params, limit),
+            )
+            rows = cursor.fetchall()
+
+        return [
+            {
+                "id": row[0],
+                "timestamp": row[1],
+                "graph_vertices": row[2],
+                "target_k": row[3],
+                "found_clique": bool(row[4]),
+                "clique_vertices": json.loads(row[5]) if row[5] else [],
+                "steps": row[6],
+                "execution_time": row[7],
+            }
+            for row in rows
+        ]
+
+    def get_session_by_id(self, session_id, include_graph=True):
+        # Без include_graph матрица графа не читается и не распаковывается:
+        # для графа на тысячи вершин это секунды и сотни мегабайт
+        graph_columns = (
+            "COALESCE(g.graph_matrix, s.graph_matrix), "
+            "COALESCE(g.graph_format, s.graph_format)"
+            if include_graph
+            else "NULL, NULL"
         )
+        with self._reader() as cursor:
+            cursor.execute(
+                f"""
+                SELECT s.id, s.timestamp, s.graph_vertices, s.target_k, s.found_clique, s.clique_vertices, s.steps, s.execution_time,
+                       {graph_columns}
+                FROM search_sessions s LEFT JOIN graphs g ON g.id = s.graph_id
+                WHERE s.id = ?
+            """,
+                (session_id,),
+            )
+            row = cursor.fetchone()
 
-        row = cursor.fetchone()
         if row:
             session = {
                 "id": row[0],
@@ -180,53 +2411,409 @@ class CliqueDatabase:
                 "clique_vertices": json.loads(row[5]) if row[5] else [],
                 "steps": row[6],
                 "execution_time": row[7],
-                "graph_matrix": json.loads(row[8]) if row[8] else [],
             }
-            conn.close()
+            if include_graph:
+                session["graph_matrix"] = decode_graph_matrix(row[8], row[9], row[2])
             return session
         else:
-            conn.close()
             return None
 
     def get_statistics(self):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        cursor.execute("SELECT COUNT(*) FROM search_sessions")
-        total_searches = cursor.fetchone()[0]
+        with self._reader() as cursor:
+            cursor.execute(
+                """
+                SELECT total, successes, sum_steps, max_steps, sum_time, max_time, time_sketch
+                FROM search_summary WHERE graph_vertices = ? AND target_k = ?
+            """,
+                SUMMARY_TOTAL,
+            )
+            row = cursor.fetchone()
 
-        cursor.execute("SELECT COUNT(*) FROM search_sessions WHERE found_clique = 1")
-        successful_searches = cursor.fetchone()[0]
+        return self._summary_statistics(row)
 
-        cursor.execute("SELECT AVG(steps), AVG(execution_time) FROM search_sessions")
-        avg_steps, avg_time = cursor.fetchone()
+    def get_bucket_statistics(self):
+        # Итоги по каждой паре (число вершин, k)
+        with self._reader() as cursor:
+            cursor.execute(
+                """
+                SELECT graph_vertices, target_k, total, successes, sum_steps, max_steps, sum_time, max_time, time_sketch
+                FROM search_summary
+                WHERE NOT (graph_vertices = ? AND target_k = ?)
+                ORDER BY graph_vertices, target_k
+            """,
+                SUMMARY_TOTAL,
+            )
+            rows = cursor.fetchall()
 
-        cursor.execute("SELECT MAX(steps), MAX(execution_time) FROM search_sessions")
-        max_steps, max_time = cursor.fetchone()
+        return [
+            {
+                "graph_vertices": row[0],
+                "target_k": row[1],
+                **self._summary_statistics(row[2:]),
+            }
+            for row in rows
+        ]
 
-        conn.close()
+    def _summary_statistics(self, row):
+        if row is None:
+            row = (0, 0, 0, 0, 0.0, 0.0, LatencySketch().to_json())
+        total, successes, sum_steps, max_steps, sum_time, max_time, sketch = row
+        sketch = LatencySketch.from_json(sketch)
 
         return {
-            "total_searches": total_searches,
-            "successful_searches": successful_searches,
-            "success_rate": (
-                successful_searches / total_searches if total_searches > 0 else 0
-            ),
-            "avg_steps": avg_steps or 0,
-            "avg_time": avg_time or 0,
-            "max_steps": max_steps or 0,
-            "max_time": max_time or 0,
+            "total_searches": total,
+            "successful_searches": successes,
+            "success_rate": successes / total if total > 0 else 0,
+            "avg_steps": sum_steps / total if total > 0 else 0,
+            "avg_time": sum_time / total if total > 0 else 0,
+            "max_steps": max_steps,
+            "max_time": max_time,
+            "p50_time": sketch.quantile(0.5),
+            "p90_time": sketch.quantile(0.9),
+            "p99_time": sketch.quantile(0.99),
+        }
+
+    def save_checkpoint(self, graph, k, state, execution_time):
+        graph_format, graph_blob = encode_graph_matrix(graph)
+
+        with self.transaction() as cursor:
+            cursor.execute(
+                """
+                INSERT INTO search_checkpoints
+                (graph_vertices, target_k, steps, execution_time, search_state, graph_matrix, graph_format)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+                (
+                    len(graph),
+                    k,
+                    state["steps"],
+                    execution_time,
+                    json.dumps(state),
+                    graph_blob,
+                    graph_format,
+                ),
+            )
+            return cursor.lastrowid
+
+    def get_checkpoint(self, checkpoint_id=None, include_graph=True, sparse=False):
+        # Без checkpoint_id возвращается последняя сохраненная контрольная
+        # точка. Без include_graph граф не читается; с sparse=True
+        # graph_matrix — SparseGraph, а не плотный список списков
+        graph_columns = "graph_matrix, graph_format" if include_graph else "NULL, NULL"
+        query = f"""
+            SELECT id, timestamp, graph_vertices, target_k, steps, execution_time, search_state, {graph_columns}
+            FROM search_checkpoints
+        """
+        with self._reader() as cursor:
+            if checkpoint_id is None:
+                cursor.execute(query + " ORDER BY id DESC LIMIT 1")
+            else:
+                cursor.execute(query + " WHERE id = ?", (checkpoint_id,))
+            row = cursor.fetchone()
+
+        if row is None:
+            return None
+        checkpoint = {
+            "id": row[0],
+            "timestamp": row[1],
+            "graph_vertices": row[2],
+            "target_k": row[3],
+            "steps": row[4],
+            "execution_time": row[5],
+            "search_state": json.loads(row[6]),
         }
+        if include_graph:
+            decode = decode_sparse_graph if sparse else decode_graph_matrix
+            checkpoint["graph_matrix"] = decode(row[7], row[8], row[2])
+        return checkpoint
+
+    def delete_checkpoint(self, checkpoint_id):
+        with self.transaction() as cursor:
+            cursor.execute(
+                "DELETE FROM search_checkpoints WHERE id = ?", (checkpoint_id,)
+            )
+
+    def migrate_graph_matrices(self, batch_size=500):
+        # Переносит матрицы старых сессий в таблицу graphs, а JSON-матрицы
+        # контрольных точек переписывает в упакованный формат;
+        # возвращает число преобразованных строк
+        migrated = 0
+        while True:
+            with self.transaction() as cursor:
+                cursor.execute(
+                    """
+                    SELECT id, graph_vertices, graph_matrix, graph_format,
+                           target_k, found_clique, clique_vertices
+                    FROM search_sessions WHERE graph_id IS NULL LIMIT ?
+                """,
+                    (batch_size,),
+                )
+                rows = cursor.fetchall()
+                if not rows:
+                    break
+
+                updates = []
+                for row_id, vertices, data, graph_format, k, found, clique in rows:
+                    graph = decode_graph_matrix(data, graph_format, vertices)
+                    graph_id = self._graph_id(cursor, graph)
+                    self._update_bounds(
+                        cursor,
+                        graph_id,
+                        json.loads(clique) if found and clique else None,
+                        None if found else k,
+                    )
+                    updates.append((b"", GRAPH_FORMAT_SHARED, graph_id, row_id))
+                cursor.executemany(
+                    """
+                    UPDATE search_sessions
+                    SET graph_matrix = ?, graph_format = ?, graph_id = ?
+                    WHERE id = ?
+                """,
+                    updates,
+                )
+                migrated += len(updates)
+
+        while True:
+            with self.transaction() as cursor:
+                cursor.execute(
+                    """
+                    SELECT id, graph_matrix FROM search_checkpoints
+                    WHERE graph_format = ? LIMIT ?
+                """,
+                    (GRAPH_FORMAT_JSON, batch_size),
+                )
+                rows = cursor.fetchall()
+                if not rows:
+                    break
+
+                updates = []
+                for row_id, graph_json in rows:
+                    graph_format, graph_blob = encode_graph_matrix(
+                        json.loads(graph_json) if graph_json else []
+                    )
+                    updates.append((graph_blob, graph_format, row_id))
+                cursor.executemany(
+                    """
+                    UPDATE search_checkpoints
+                    SET graph_matrix = ?, graph_format = ?
+                    WHERE id = ?
+                """,
+                    updates,
+                )
+                migrated += len(updates)
+        return migrated
 
     def clear_all_data(self):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with self.transaction() as cursor:
+            cursor.execute("DELETE FROM search_sessions")
+            cursor.execute("DELETE FROM performance_stats")
+            cursor.execute("DELETE FROM search_checkpoints")
+            cursor.execute("DELETE FROM graphs")
+            cursor.execute("DELETE FROM search_summary")
+        with self._lock:
+            self._result_cache.clear()
+            self._bounds_cache.clear()
+
+
+# Движки, которые можно остановить по времени или событием (см. run_search_job)
+TIME_LIMITED_ENGINES = ("backtracking", "iterative", "bitset", "sparse")
+
+# Событие остановки из другого процесса опрашивается не чаще, чем раз
+# в столько секунд: каждый опрос — обращение к процессу-менеджеру
+STOP_POLL_INTERVAL = 0.05
+
+
+def run_search_job(engine, graph, k, seed=None, time_limit=None, stop_event=None):
+    # time_limit — бюджет в секундах; прерванный поиск возвращается с
+    # timed_out=True и ничего не говорит о существовании клики. stop_event —
+    # событие (например, multiprocessing.Manager().Event()), которым поиск
+    # останавливают извне; такой результат помечен cancelled=True
+    search = SEARCH_ENGINES[engine] if isinstance(engine, str) else engine
+
+    start_time = time.time()
+    timed_out = cancelled = False
+    if time_limit is not None or stop_event is not None:
+        deadline = None if time_limit is None else start_time + time_limit
+        next_poll = start_time
+
+        def should_stop():
+            nonlocal next_poll, cancelled
+            now = time.time()
+            if deadline is not None and now > deadline:
+                return True
+            if stop_event is not None and now >= next_poll:
+                next_poll = now + STOP_POLL_INTERVAL
+                cancelled = stop_event.is_set()
+            return cancelled
+
+        if search in (_backtracking_engine, _iterative_engine):
+            # Тот же перебор, что и без бюджета, но с проверкой времени
+            found, steps, clique, state = resumable_clique_search(
+                graph, k, deadline=deadline, should_stop=should_stop
+            )
+            timed_out = state is not None and not cancelled
+        elif search in (bitset_clique_search, sparse_clique_search):
+            stats = {}
+            try:
+                found, steps, clique = search(
+                    graph, k, stats, should_stop=should_stop, seed=seed
+                )
+            except SearchCancelled:
+                found, steps, clique = False, stats.get("steps", 0), []
+                timed_out = not cancelled
+        else:
+            raise ValueError(f"Движок {engine} нельзя прервать")
+    elif seed and search is bitset_clique_search:
+        found, steps, clique = search(graph, k, seed=seed)
+    else:
+        found, steps, clique = search(graph, k)
+    execution_time = time.time() - start_time
+
+    return {
+        "k": k,
+        "found": found,
+        "clique_vertices": clique if found else None,
+        "steps": steps,
+        "execution_time": execution_time,
+        "timed_out": timed_out,
+        "cancelled": cancelled,
+    }
+
+
+def run_search_batch(
+    jobs,
+    engine="bitset",
+    max_workers=None,
+    database=None,
+    chunk_size=100,
+    time_limit=None,
+):
+    # Выполняет задания (graph, k) и выдает результаты по мере готовности
+    # (ключ "index" — номер задания). Одновременно выполняется не больше
+    # 2 * max_workers заданий; в database результаты пишутся пачками.
+    # Задания, результат которых уже есть в database или следует из
+    # известных границ, не выполняются: такие результаты помечены ключом
+    # "cached". Остальные задания начинают с наибольшей известной клики.
+    # time_limit — бюджет на одно задание; прерванные по времени задания
+    # (timed_out) в database не записываются
+    from concurrent.futures import (
+        FIRST_COMPLETED,
+        ProcessPoolExecutor,
+        as_completed,
+        wait,
+    )
+
+    pending_rows = []
+    # Результаты этого пакета по (graph_hash, k): повторы заданий отвечают
+    # сразу, не дожидаясь записи в database, и не записываются повторно
+    known = {}
+    # Повторы заданий, которые еще выполняются в пуле: ключ -> [(index, graph)]
+    followers = {}
+
+    def shared(result, index, graph):
+        return dict(result, index=index, graph=graph, cached=True)
+
+    def lookup(index, key, graph, k):
+        if key in known:
+            return shared(known[key], index, graph)
+        if database is None:
+            return None
+        result = database.find_cached_result(graph, k)
+        if result is not None:
+            result["index"] = index
+            result["graph"] = graph
+            result["cached"] = True
+        return result
+
+    def seed(graph):
+        if database is None:
+            return None
+        return database.get_graph_bounds(graph)["best_clique"]
+
+    def flush():
+        if database is not None and pending_rows:
+            database.save_search_results_bulk(pending_rows)
+        pending_rows.clear()
+
+    def collect(result, index, graph, key):
+        result["index"] = index
+        result["graph"] = graph
+        result["cached"] = False
+        if not result["timed_out"]:
+            pending_rows.append(result)
+            known[key] = result
+        if len(pending_rows) >= chunk_size:
+            flush()
+        return result
+
+    def finish(future):
+        # Результат выполненного задания и всех его повторов
+        index, graph, key = in_flight.pop(future)
+        result = collect(future.result(), index, graph, key)
+        yield result
+        for index, graph in followers.pop(key, ()):
+            yield dict(shared(result, index, graph), cached=not result["timed_out"])
+
+    try:
+        if max_workers == 1:
+            for index, (graph, k) in enumerate(jobs):
+                key = (graph_hash(graph), k)
+                result = lookup(index, key, graph, k)
+                if result is None:
+                    result = collect(
+                        run_search_job(engine, graph, k, seed(graph), time_limit),
+                        index,
+                        graph,
+                        key,
+                    )
+                yield result
+            return
+
+        workers = max_workers or os.cpu_count() or 1
+        in_flight = {}
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for index, (graph, k) in enumerate(jobs):
+                key = (graph_hash(graph), k)
+                result = lookup(index, key, graph, k)
+                if result is not None:
+                    yield result
+                    continue
+                if key in followers:
+                    followers[key].append((index, graph))
+                    continue
+
+                if len(in_flight) >= 2 * workers:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield from finish(future)
+
+                future = executor.submit(
+                    run_search_job, engine, graph, k, seed(graph), time_limit
+                )
+                in_flight[future] = (index, graph, key)
+                followers[key] = []
+
+            for future in as_completed(list(in_flight)):
+                yield from finish(future)
+    finally:
+        flush()
+
+
+_database = None
+_database_lock = threading.Lock()
 
-        cursor.execute("DELETE FROM search_sessions")
-        cursor.execute("DELETE FROM performance_stats")
 
-        conn.commit()
-        conn.close()
+def get_database():
+    # Общая база приложения создается при первом обращении, а не при импорте
+    global _database
+    with _database_lock:
+        if _database is None:
+            _database = CliqueDatabase()
+        return _database
 
 
-db = CliqueDatabase()
+def __getattr__(name):
+    # clique_app.db — прежнее имя общей базы, тоже ленивое
+    if name == "db":
+        return get_database()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,15 +1,266 @@
+import math
+import queue
+import threading
 import tkinter as tk
-from tkinter import ttk, messagebox
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import networkx as nx
+from collections import deque
+from tkinter import filedialog, ttk, messagebox
 import time
-from clique_app import backtracking_clique_search, is_clique, db
+from clique_app import (
+    BitsetGraph,
+    LogTracer,
+    SamplingTracer,
+    SearchCancelled,
+    SparseGraph,
+    bitset_clique_search,
+    find_maximum_clique,
+    get_database,
+    graph_to_bitsets,
+    is_clique,
+    load_graph,
+    replay_trace,
+    resumable_clique_search,
+)
+
+MODE_K_CLIQUE = "клика размера k"
+MODE_MAXIMUM = "максимальная клика"
+
+# Журнал поиска: размер кольцевого буфера (и число строк в окне),
+# сколько сообщений выводить за один проход и как часто (мс)
+LOG_BUFFER_SIZE = 5000
+LOG_BATCH_SIZE = 500
+LOG_POLL_INTERVAL = 50
+
+# История: сколько записей подгружать за раз и когда (доля прокрутки)
+HISTORY_PAGE_SIZE = 100
+HISTORY_PREFETCH = 0.9
+HISTORY_FOUND_FILTERS = {"все": None, "да": True, "нет": False}
+
+# Графы больше этих размеров не редактируются и не рисуются
+MATRIX_EDITOR_LIMIT = 500
+DRAW_LIMIT = 150
+# С этого числа вершин загруженный граф хранится списками соседей (CSR),
+# а не битовыми масками на n бит
+SPARSE_GRAPH_LIMIT = 2000
+
+# Редактор матрицы: размер ячейки, ширина подписей и видимого окна (пиксели)
+MATRIX_CELL_SIZE = 18
+MATRIX_HEADER_SIZE = 30
+MATRIX_VIEWPORT = 360
+MATRIX_COLOURS = {"diagonal": "#000000", "edge": "#4a7fd0", "empty": "#ffffff"}
+
+# Раскладка графа: фиксированное начальное состояние, число итераций
+# дораскладки после правки ребер и поля вокруг вершин
+LAYOUT_SEED = 0
+LAYOUT_WARM_ITERATIONS = 15
+LAYOUT_MARGIN = 0.2
+
+# Инструментирование: шагов между образцами и число кривых на графике
+SAMPLE_INTERVAL = 100
+PLOTTED_SESSIONS = 5
+
+
+class MatrixEditor:
+    # Матрица смежности на одном tk.Canvas вместо n^2 флажков: существуют
+    # только ячейки видимого окна, щелчок меняет граф напрямую и
+    # перерисовывает лишь две симметричные ячейки
+
+    def __init__(self, parent, on_toggle):
+        self.on_toggle = on_toggle
+        self.graph = []
+        self.size = 0
+        self.editable = False
+        self.cells = {}
+
+        self.frame = ttk.Frame(parent)
+        self.canvas = tk.Canvas(
+            self.frame,
+            width=MATRIX_VIEWPORT,
+            height=MATRIX_VIEWPORT,
+            background="white",
+            highlightthickness=0,
+        )
+        x_scroll = ttk.Scrollbar(
+            self.frame, orient=tk.HORIZONTAL, command=self.scroll_x
+        )
+        y_scroll = ttk.Scrollbar(self.frame, orient=tk.VERTICAL, command=self.scroll_y)
+        self.canvas.configure(xscrollcommand=x_scroll.set, yscrollcommand=y_scroll.set)
+        self.status = ttk.Label(self.frame, text="")
+
+        self.canvas.grid(row=0, column=0, sticky=tk.NSEW)
+        y_scroll.grid(row=0, column=1, sticky=tk.NS)
+        x_scroll.grid(row=1, column=0, sticky=tk.EW)
+        self.status.grid(row=2, column=0, columnspan=2, sticky=tk.W)
+
+        self.canvas.bind("<Button-1>", self.on_click)
+        self.canvas.bind("<Motion>", self.on_motion)
+        self.canvas.bind("<Configure>", lambda event: self.render())
+        self.canvas.bind("<MouseWheel>", self.on_wheel)
+        self.canvas.bind(
+            "<Button-4>", lambda event: self.scroll_y("scroll", -1, "units")
+        )
+        self.canvas.bind(
+            "<Button-5>", lambda event: self.scroll_y("scroll", 1, "units")
+        )
+
+    def set_graph(self, graph, size, editable):
+        self.graph = graph
+        self.size = size
+        self.editable = editable
+        self.cells.clear()
+        self.canvas.delete("all")
+
+        extent = MATRIX_HEADER_SIZE + size * MATRIX_CELL_SIZE
+        self.canvas.configure(
+            scrollregion=(0, 0, extent, extent),
+            xscrollincrement=MATRIX_CELL_SIZE,
+            yscrollincrement=MATRIX_CELL_SIZE,
+        )
+        self.canvas.xview_moveto(0)
+        self.canvas.yview_moveto(0)
+        self.status.configure(text="" if editable else "Только просмотр")
+        self.render()
+
+    def scroll_x(self, *args):
+        self.canvas.xview(*args)
+        self.render()
+
+    def scroll_y(self, *args):
+        self.canvas.yview(*args)
+        self.render()
+
+    def on_wheel(self, event):
+        self.scroll_y("scroll", -1 if event.delta > 0 else 1, "units")
+
+    def visible_range(self, offset, extent):
+        first = max(0, int((offset - MATRIX_HEADER_SIZE) // MATRIX_CELL_SIZE))
+        last = int((offset + extent - MATRIX_HEADER_SIZE) // MATRIX_CELL_SIZE)
+        return range(first, min(self.size, last + 1))
+
+    def cell_colour(self, i, j):
+        if i == j:
+            return MATRIX_COLOURS["diagonal"]
+        return MATRIX_COLOURS["edge" if self.graph[i][j] else "empty"]
+
+    def render(self):
+        # Ячейки, ушедшие из окна, удаляются, новые видимые — создаются;
+        # уже нарисованные не трогаются
+        left = self.canvas.canvasx(0)
+        top = self.canvas.canvasy(0)
+        rows = self.visible_range(top, self.canvas.winfo_height())
+        columns = self.visible_range(left, self.canvas.winfo_width())
+
+        for key in [
+            key for key in self.cells if key[0] not in rows or key[1] not in columns
+        ]:
+            self.canvas.delete(self.cells.pop(key))
+
+        for i in rows:
+            y = MATRIX_HEADER_SIZE + i * MATRIX_CELL_SIZE
+            for j in columns:
+                if (i, j) in self.cells:
+                    continue
+                x = MATRIX_HEADER_SIZE + j * MATRIX_CELL_SIZE
+                self.cells[i, j] = self.canvas.create_rectangle(
+                    x,
+                    y,
+                    x + MATRIX_CELL_SIZE,
+                    y + MATRIX_CELL_SIZE,
+                    fill=self.cell_colour(i, j),
+                    outline="#c0c0c0",
+                )
+
+        # Номера вершин прижаты к краям окна и видны при любой прокрутке
+        self.canvas.delete("header")
+        self.canvas.create_rectangle(
+            left,
+            top,
+            left + self.canvas.winfo_width(),
+            top + MATRIX_HEADER_SIZE,
+            fill="white",
+            outline="",
+            tags="header",
+        )
+        self.canvas.create_rectangle(
+            left,
+            top,
+            left + MATRIX_HEADER_SIZE,
+            top + self.canvas.winfo_height(),
+            fill="white",
+            outline="",
+            tags="header",
+        )
+        centre = MATRIX_HEADER_SIZE + MATRIX_CELL_SIZE / 2
+        for j in columns:
+            self.canvas.create_text(
+                centre + j * MATRIX_CELL_SIZE,
+                top + MATRIX_HEADER_SIZE / 2,
+                text=str(j),
+                font=("TkDefaultFont", 7),
+                tags="header",
+            )
+        for i in rows:
+            self.canvas.create_text(
+                left + MATRIX_HEADER_SIZE / 2,
+                centre + i * MATRIX_CELL_SIZE,
+                text=str(i),
+                font=("TkDefaultFont", 7),
+                tags="header",
+            )
+
+    def cell_at(self, event):
+        x = self.canvas.canvasx(event.x) - MATRIX_HEADER_SIZE
+        y = self.canvas.canvasy(event.y) - MATRIX_HEADER_SIZE
+        if event.x < MATRIX_HEADER_SIZE or event.y < MATRIX_HEADER_SIZE:
+            return None
+        i, j = int(y // MATRIX_CELL_SIZE), int(x // MATRIX_CELL_SIZE)
+        if 0 <= i < self.size and 0 <= j < self.size:
+            return i, j
+        return None
+
+    def on_motion(self, event):
+        cell = self.cell_at(event)
+        if cell is None:
+            return
+        i, j = cell
+        state = "есть" if i != j and self.graph[i][j] else "нет"
+        suffix = "" if self.editable else " (только просмотр)"
+        self.status.configure(text=f"Вершины {i} и {j}: ребро {state}{suffix}")
+
+    def on_click(self, event):
+        cell = self.cell_at(event)
+        if not self.editable or cell is None or cell[0] == cell[1]:
+            return
+        i, j = cell
+        value = 0 if self.graph[i][j] else 1
+        self.graph[i][j] = value
+        self.graph[j][i] = value
+        self.refresh_cell(i, j)
+        self.refresh_cell(j, i)
+        self.on_motion(event)
+        self.on_toggle(i, j, value)
+
+    def refresh_cell(self, i, j):
+        item = self.cells.get((i, j))
+        if item is not None:
+            self.canvas.itemconfigure(item, fill=self.cell_colour(i, j))
+
+
+def create_figure(parent, figsize):
+    # matplotlib загружается при первой отрисовке, а не при запуске:
+    # окно появляется до импорта тяжелых модулей
+    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+    from matplotlib.figure import Figure
+
+    figure = Figure(figsize=figsize, dpi=100)
+    canvas = FigureCanvasTkAgg(figure, parent)
+    canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+    return figure, canvas
 
 
 class CliqueFinderApp:
-    def __init__(self, root):
+    def __init__(self, root, database=None):
         self.root = root
+        self.db = database if database is not None else get_database()
         self.root.title("Clique Finder - Backtracking Algorithm with Database")
         self.root.geometry("1200x800")
 
@@ -18,6 +269,25 @@ class CliqueFinderApp:
         self.current_clique = []
         self.solution_clique = []
 
+        # Кэш раскладки и артисты рисунка графа; redraw_job — отложенная
+        # перерисовка
+        self.layout_positions = None
+        self.layout_edges = None
+        self.graph_artists = None
+        self.redraw_job = None
+
+        self.search_thread = None
+        self.search_events = queue.Queue()
+        self.cancel_event = threading.Event()
+        self.log_buffer = deque(maxlen=LOG_BUFFER_SIZE)
+
+        # Ключи (timestamp, id) самой новой и самой старой записи в таблице истории
+        self.history_newest = None
+        self.history_oldest = None
+        self.history_exhausted = False
+        self.history_filters = {}
+        self.history_page_job = None
+
         self.setup_ui()
 
     def setup_ui(self):
@@ -36,6 +306,7 @@ class CliqueFinderApp:
         self.setup_search_tab()
         self.setup_history_tab()
         self.setup_stats_tab()
+        self.notebook.bind("<<NotebookTabChanged>>", self.on_tab_changed)
 
     def setup_search_tab(self):
         control_frame = ttk.Frame(self.search_frame, padding="10")
@@ -65,9 +336,10 @@ class CliqueFinderApp:
         self.k_entry.insert(0, "3")
         self.k_entry.grid(row=0, column=4, padx=5, pady=5)
 
-        ttk.Button(control_frame, text="Найти клику", command=self.find_clique).grid(
-            row=0, column=5, padx=5, pady=5
+        self.find_button = ttk.Button(
+            control_frame, text="Найти клику", command=self.find_clique
         )
+        self.find_button.grid(row=0, column=5, padx=5, pady=5)
 
         ttk.Button(control_frame, text="Очистить", command=self.clear_all).grid(
             row=0, column=6, padx=5, pady=5
@@ -80,21 +352,78 @@ class CliqueFinderApp:
         ttk.Label(control_frame, text="Матрица смежности:").grid(
             row=1, column=0, padx=5, pady=5, sticky=tk.W
         )
-        self.matrix_frame = ttk.Frame(control_frame)
-        self.matrix_frame.grid(
+
+        ttk.Button(
+            control_frame, text="Открыть граф...", command=self.load_graph_file
+        ).grid(row=1, column=1, columnspan=2, padx=5, pady=5)
+
+        ttk.Label(control_frame, text="Режим:").grid(row=1, column=3, padx=5, pady=5)
+        self.mode_var = tk.StringVar(value=MODE_K_CLIQUE)
+        ttk.Combobox(
+            control_frame,
+            textvariable=self.mode_var,
+            values=(MODE_K_CLIQUE, MODE_MAXIMUM),
+            state="readonly",
+            width=20,
+        ).grid(row=1, column=4, columnspan=2, padx=5, pady=5, sticky=tk.W)
+
+        self.pruning_var = tk.IntVar(value=0)
+        ttk.Checkbutton(
+            control_frame,
+            text="Отсечения (ядро, раскраска)",
+            variable=self.pruning_var,
+        ).grid(row=1, column=6, columnspan=2, padx=5, pady=5, sticky=tk.W)
+        self.matrix_editor = MatrixEditor(control_frame, self.toggle_edge)
+        self.matrix_editor.frame.grid(
             row=2, column=0, columnspan=8, padx=5, pady=5, sticky=tk.W
         )
 
+        budget_frame = ttk.Frame(control_frame)
+        budget_frame.grid(row=3, column=0, columnspan=8, padx=5, pady=5, sticky=tk.W)
+
+        ttk.Label(budget_frame, text="Лимит шагов:").pack(side=tk.LEFT, padx=5)
+        self.steps_limit_entry = ttk.Entry(budget_frame, width=10)
+        self.steps_limit_entry.pack(side=tk.LEFT, padx=5)
+
+        self.instrument_var = tk.IntVar(value=0)
+        ttk.Checkbutton(
+            budget_frame, text="Инструментирование", variable=self.instrument_var
+        ).pack(side=tk.LEFT, padx=5)
+
+        ttk.Label(budget_frame, text="Лимит времени (с):").pack(side=tk.LEFT, padx=5)
+        self.time_limit_entry = ttk.Entry(budget_frame, width=10)
+        self.time_limit_entry.pack(side=tk.LEFT, padx=5)
+
+        self.resume_button = ttk.Button(
+            budget_frame, text="Продолжить поиск", command=self.resume_search
+        )
+        self.resume_button.pack(side=tk.LEFT, padx=5)
+
+        self.cancel_button = ttk.Button(
+            budget_frame,
+            text="Остановить поиск",
+            command=self.cancel_search,
+            state=tk.DISABLED,
+        )
+        self.cancel_button.pack(side=tk.LEFT, padx=5)
+
+        self.replay_button = ttk.Button(
+            budget_frame, text="Воспроизвести трассу", command=self.replay_search_trace
+        )
+        self.replay_button.pack(side=tk.LEFT, padx=5)
+
         ttk.Label(graph_frame, text="Визуализация графа").pack()
-        self.figure = plt.Figure(figsize=(6, 5), dpi=100)
-        self.ax = self.figure.add_subplot(111)
-        self.canvas = FigureCanvasTkAgg(self.figure, graph_frame)
-        self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        # Рисунок создается при первой отрисовке (см. create_figure)
+        self.graph_frame = graph_frame
+        self.figure = self.ax = self.canvas = None
 
         ttk.Label(result_frame, text="Процесс поиска").pack()
 
         self.process_text = tk.Text(result_frame, height=15, width=40)
         self.process_text.pack(fill=tk.BOTH, expand=True, pady=5)
+        self.process_text.tag_configure(
+            "success", foreground="green", font=("TkDefaultFont", 10, "bold")
+        )
 
         scrollbar = ttk.Scrollbar(
             result_frame, orient=tk.VERTICAL, command=self.process_text.yview
@@ -119,6 +448,28 @@ class CliqueFinderApp:
             history_control_frame, text="Очистить историю", command=self.clear_history
         ).pack(side=tk.LEFT, padx=5)
 
+        ttk.Label(history_control_frame, text="Вершин:").pack(side=tk.LEFT, padx=5)
+        self.history_vertices_entry = ttk.Entry(history_control_frame, width=5)
+        self.history_vertices_entry.pack(side=tk.LEFT)
+
+        ttk.Label(history_control_frame, text="k:").pack(side=tk.LEFT, padx=5)
+        self.history_k_entry = ttk.Entry(history_control_frame, width=5)
+        self.history_k_entry.pack(side=tk.LEFT)
+
+        ttk.Label(history_control_frame, text="Найдена:").pack(side=tk.LEFT, padx=5)
+        self.history_found_var = tk.StringVar(value="все")
+        ttk.Combobox(
+            history_control_frame,
+            textvariable=self.history_found_var,
+            values=list(HISTORY_FOUND_FILTERS),
+            state="readonly",
+            width=5,
+        ).pack(side=tk.LEFT)
+
+        ttk.Button(
+            history_control_frame, text="Применить", command=self.apply_history_filters
+        ).pack(side=tk.LEFT, padx=5)
+
         columns = (
             "ID",
             "Время",
@@ -140,13 +491,13 @@ class CliqueFinderApp:
         self.history_tree.column("Время", width=150)
         self.history_tree.column("Клика", width=120)
 
-        history_scrollbar = ttk.Scrollbar(
+        self.history_scrollbar = ttk.Scrollbar(
             self.history_frame, orient=tk.VERTICAL, command=self.history_tree.yview
         )
-        self.history_tree.configure(yscrollcommand=history_scrollbar.set)
+        self.history_tree.configure(yscrollcommand=self.on_history_scroll)
 
         self.history_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=5, pady=5)
-        history_scrollbar.pack(side=tk.RIGHT, fill=tk.Y, pady=5)
+        self.history_scrollbar.pack(side=tk.RIGHT, fill=tk.Y, pady=5)
 
         details_frame = ttk.LabelFrame(
             self.history_frame, text="Детали записи", padding="10"
@@ -168,9 +519,35 @@ class CliqueFinderApp:
             stats_frame, text="Статистика поисков клик", font=("Arial", 14, "bold")
         ).pack(pady=10)
 
+        # Кривые «шаги от времени» для последних инструментированных поисков;
+        # рисунок создается, когда вкладка статистики впервые открыта
+        self.stats_plot_frame = ttk.Frame(stats_frame)
+        self.stats_plot_frame.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=10)
+        self.stats_figure = self.stats_ax = self.stats_canvas = None
+        self.stats_plot_stale = True
+
         self.stats_text = tk.Text(stats_frame, height=15, width=60, font=("Arial", 10))
         self.stats_text.pack(fill=tk.BOTH, expand=True, pady=10)
 
+        ttk.Label(stats_frame, text="По размеру графа и k").pack()
+
+        columns = (
+            "Вершин",
+            "k",
+            "Поисков",
+            "Успех (%)",
+            "Ср. шагов",
+            "Медиана (с)",
+            "p90 (с)",
+        )
+        self.buckets_tree = ttk.Treeview(
+            stats_frame, columns=columns, show="headings", height=8
+        )
+        for col in columns:
+            self.buckets_tree.heading(col, text=col)
+            self.buckets_tree.column(col, width=90)
+        self.buckets_tree.pack(fill=tk.BOTH, expand=True, pady=10)
+
         ttk.Button(
             stats_frame, text="Обновить статистику", command=self.load_statistics
         ).pack(pady=5)
@@ -191,100 +568,234 @@ class CliqueFinderApp:
             [0, 0, 1, 1, 1, 0],
         ]
 
+        self.reset_layout()
         self.update_matrix_display()
-        self.visualize_graph()
+        self.request_redraw()
 
     def create_graph(self):
         try:
             self.num_vertices = int(self.vertices_entry.get())
-            if self.num_vertices < 1 or self.num_vertices > 10:
+            if self.num_vertices < 1 or self.num_vertices > MATRIX_EDITOR_LIMIT:
                 messagebox.showerror(
-                    "Ошибка", "Количество вершин должно быть от 1 до 10"
+                    "Ошибка",
+                    f"Количество вершин должно быть от 1 до {MATRIX_EDITOR_LIMIT}",
                 )
                 return
 
             self.graph = [
                 [0 for _ in range(self.num_vertices)] for _ in range(self.num_vertices)
             ]
+            self.reset_layout()
             self.update_matrix_display()
-            self.visualize_graph()
+            self.request_redraw()
             self.clear_results()
 
         except ValueError:
             messagebox.showerror("Ошибка", "Введите корректное число вершин")
 
     def update_matrix_display(self):
-        for widget in self.matrix_frame.winfo_children():
-            widget.destroy()
-
-        for i in range(self.num_vertices):
-            for j in range(self.num_vertices):
-                if i == j:
-                    ttk.Label(
-                        self.matrix_frame, text="0", width=3, background="#000000"
-                    ).grid(row=i, column=j, padx=1, pady=1)
-                else:
-                    var = tk.IntVar(value=self.graph[i][j])
-                    cb = ttk.Checkbutton(
-                        self.matrix_frame,
-                        variable=var,
-                        command=lambda i=i, j=j, var=var: self.toggle_edge(i, j, var),
-                    )
-                    cb.grid(row=i, column=j, padx=1, pady=1)
+        if self.num_vertices > MATRIX_EDITOR_LIMIT and isinstance(self.graph, list):
+            self.graph = BitsetGraph(graph_to_bitsets(self.graph))
+        # Загруженные большие графы можно только просматривать
+        self.matrix_editor.set_graph(
+            self.graph, self.num_vertices, isinstance(self.graph, list)
+        )
+
+    def load_graph_file(self):
+        if self.search_thread is not None:
+            messagebox.showwarning("Предупреждение", "Поиск уже выполняется")
+            return
+
+        path = filedialog.askopenfilename(
+            title="Открыть граф",
+            filetypes=[
+                ("DIMACS", "*.clq *.col *.dimacs"),
+                ("Список ребер", "*.edges *.el *.txt"),
+                ("Матрица смежности", "*.adj *.mat *.matrix"),
+                ("Все файлы", "*"),
+            ],
+        )
+        if not path:
+            return
+
+        try:
+            graph = load_graph(path, sparse=True)
+        except (OSError, ValueError) as error:
+            messagebox.showerror("Ошибка", f"Не удалось загрузить граф: {error}")
+            return
 
-    def toggle_edge(self, i, j, var):
-        self.graph[i][j] = var.get()
-        self.graph[j][i] = var.get()
-        self.visualize_graph()
+        self.set_loaded_graph(graph)
         self.clear_results()
+        self.process_text.insert(
+            tk.END,
+            f"Загружен граф {path}: {len(graph)} вершин, {graph.edge_count()} ребер\n",
+        )
 
-    def visualize_graph(self):
-        self.ax.clear()
+    def set_loaded_graph(self, graph):
+        # Небольшой граф становится обычной редактируемой матрицей, средний —
+        # битовым, большой остается разреженным: поиск с отсечениями работает
+        # с обоими напрямую
+        if len(graph) <= MATRIX_EDITOR_LIMIT:
+            self.graph = graph.to_matrix()
+        elif len(graph) < SPARSE_GRAPH_LIMIT:
+            self.graph = BitsetGraph(graph.to_bitsets())
+        else:
+            self.graph = graph
+        self.num_vertices = len(graph)
+        self.reset_layout()
+        self.vertices_entry.delete(0, tk.END)
+        self.vertices_entry.insert(0, str(self.num_vertices))
+        self.update_matrix_display()
 
-        G = nx.Graph()
+    def copy_graph(self):
+        # Рабочий поток получает копию графа: матрицу можно править во время
+        # поиска; загруженный граф не редактируется и не копируется
+        if isinstance(self.graph, (BitsetGraph, SparseGraph)):
+            return self.graph
+        return [row[:] for row in self.graph]
 
-        for i in range(self.num_vertices):
-            G.add_node(i)
+    def toggle_edge(self, i, j, value):
+        # Редактор уже изменил матрицу; остается перерисовать граф
+        self.request_redraw()
+        self.clear_results()
 
-        for i in range(self.num_vertices):
-            for j in range(i + 1, self.num_vertices):
-                if self.graph[i][j] == 1:
-                    G.add_edge(i, j)
+    def request_redraw(self):
+        # Перерисовка откладывается до простоя Tk: несколько вызовов за одно
+        # событие (правка ребра, сброс результатов, поиск) дают одну отрисовку
+        if self.redraw_job is None:
+            self.redraw_job = self.root.after_idle(self.visualize_graph)
+
+    def reset_layout(self):
+        # Новый граф раскладывается заново, а не от позиций прежнего
+        self.layout_positions = None
+        self.layout_edges = None
+
+    def graph_edges(self):
+        n = self.num_vertices
+        return [
+            (i, j) for i in range(n) for j in range(i + 1, n) if self.graph[i][j] == 1
+        ]
 
-        pos = nx.spring_layout(G)
+    def update_layout(self, edges):
+        # Позиции вершин кэшируются, пока не изменились ребра; после правки
+        # раскладка продолжается от прежних позиций, поэтому вершины не прыгают.
+        # Возвращает True, если позиции пересчитаны
+        if self.layout_edges == edges:
+            return False
 
-        nx.draw_networkx_nodes(
-            G,
-            pos,
-            ax=self.ax,
-            node_size=500,
-            node_color="lightblue",
-            edgecolors="black",
-        )
-        nx.draw_networkx_edges(G, pos, ax=self.ax, width=2)
-        nx.draw_networkx_labels(G, pos, ax=self.ax, font_size=16, font_weight="bold")
+        import networkx as nx
 
-        if self.solution_clique:
-            clique_nodes = self.solution_clique
-            nx.draw_networkx_nodes(
+        G = nx.Graph()
+        G.add_nodes_from(range(self.num_vertices))
+        G.add_edges_from(edges)
+        if self.layout_positions is not None and len(self.layout_positions) == len(G):
+            pos = nx.spring_layout(
                 G,
-                pos,
-                nodelist=clique_nodes,
-                ax=self.ax,
-                node_size=500,
-                node_color="red",
-                edgecolors="black",
+                pos=self.layout_positions,
+                iterations=LAYOUT_WARM_ITERATIONS,
+                seed=LAYOUT_SEED,
             )
+        else:
+            pos = nx.spring_layout(G, seed=LAYOUT_SEED)
 
-            clique_edges = [
-                (u, v)
-                for u in clique_nodes
-                for v in clique_nodes
-                if u < v and self.graph[u][v] == 1
-            ]
-            nx.draw_networkx_edges(
-                G, pos, edgelist=clique_edges, ax=self.ax, width=3, edge_color="red"
+        self.layout_positions = {vertex: tuple(map(float, pos[vertex])) for vertex in G}
+        self.layout_edges = edges
+        return True
+
+    def create_graph_artists(self):
+        from matplotlib.collections import LineCollection
+
+        self.ax.clear()
+        self.ax.axis("off")
+        n = self.num_vertices
+        self.graph_artists = {
+            "edges": self.ax.add_collection(
+                LineCollection([], linewidths=2, colors="black", zorder=1)
+            ),
+            "clique_edges": self.ax.add_collection(
+                LineCollection([], linewidths=3, colors="red", zorder=1.5)
+            ),
+            "nodes": self.ax.scatter(
+                [0] * n,
+                [0] * n,
+                s=500,
+                c="lightblue",
+                edgecolors="black",
+                zorder=2,
+            ),
+            "labels": [
+                self.ax.text(
+                    0,
+                    0,
+                    str(vertex),
+                    ha="center",
+                    va="center",
+                    fontsize=16,
+                    fontweight="bold",
+                    zorder=3,
+                )
+                for vertex in range(n)
+            ],
+        }
+
+    def visualize_graph(self):
+        # Артисты matplotlib создаются один раз на граф и дальше только
+        # обновляются: позиции — после правки ребер, цвета — после поиска
+        self.redraw_job = None
+        if self.figure is None:
+            self.figure, self.canvas = create_figure(self.graph_frame, (6, 5))
+            self.ax = self.figure.add_subplot(111)
+
+        if self.num_vertices > DRAW_LIMIT:
+            self.graph_artists = None
+            self.ax.clear()
+            self.ax.text(
+                0.5,
+                0.5,
+                f"Граф из {self.num_vertices} вершин слишком велик для отрисовки"
+                + (
+                    f"\nНайдена клика: {self.solution_clique}"
+                    if self.solution_clique
+                    else ""
+                ),
+                ha="center",
+                va="center",
+                wrap=True,
             )
+            self.ax.axis("off")
+            self.canvas.draw_idle()
+            return
+
+        edges = self.graph_edges()
+        moved = self.update_layout(edges)
+        if self.graph_artists is None or len(self.graph_artists["labels"]) != len(
+            self.layout_positions
+        ):
+            self.create_graph_artists()
+            moved = True
+
+        artists = self.graph_artists
+        pos = self.layout_positions
+        if moved:
+            points = [pos[vertex] for vertex in range(self.num_vertices)]
+            if points:
+                artists["nodes"].set_offsets(points)
+            for vertex, label in enumerate(artists["labels"]):
+                label.set_position(pos[vertex])
+            artists["edges"].set_segments([(pos[u], pos[v]) for u, v in edges])
+
+            xs = [x for x, _ in points] or [0.0]
+            ys = [y for _, y in points] or [0.0]
+            self.ax.set_xlim(min(xs) - LAYOUT_MARGIN, max(xs) + LAYOUT_MARGIN)
+            self.ax.set_ylim(min(ys) - LAYOUT_MARGIN, max(ys) + LAYOUT_MARGIN)
+
+        clique = set(self.solution_clique)
+        artists["nodes"].set_facecolor(
+            ["red" if vertex in clique else "lightblue" for vertex in range(len(pos))]
+        )
+        artists["clique_edges"].set_segments(
+            [(pos[u], pos[v]) for u, v in edges if u in clique and v in clique]
+        )
 
         self.ax.set_title(
             "Граф"
@@ -294,61 +805,382 @@ class CliqueFinderApp:
                 else ""
             )
         )
-        self.ax.axis("off")
-        self.canvas.draw()
-
-    def find_clique_backtracking(self, k, current_set, start_index, step_count):
-
+        self.canvas.draw_idle()
+
+    def read_budget(self):
+        # Пустое поле означает отсутствие ограничения
+        steps_text = self.steps_limit_entry.get().strip()
+        time_text = self.time_limit_entry.get().strip()
+
+        max_steps = int(steps_text) if steps_text else None
+        time_limit = float(time_text) if time_text else None
+        # Нулевой бюджет сохранил бы контрольную точку без единого шага
+        if max_steps is not None and max_steps <= 0:
+            raise ValueError("Лимит шагов должен быть положительным")
+        if time_limit is not None and not (
+            math.isfinite(time_limit) and time_limit > 0
+        ):
+            raise ValueError("Лимит времени должен быть положительным")
+        deadline = time.time() + time_limit if time_limit is not None else None
+        return max_steps, deadline
+
+    def find_clique_backtracking(
+        self, graph, k, state=None, max_steps=None, deadline=None, sampler=None
+    ):
+        # Выполняется в рабочем потоке: сообщения складываются в кольцевой
+        # буфер, который Tk-поток разбирает пачками в poll_search
         def log_function(message, tag=None):
-            self.process_text.insert(tk.END, message)
-            if tag:
-                self.process_text.tag_add(tag, "end-2l", "end-1l")
-            self.process_text.see(tk.END)
-            self.root.update()
+            self.log_buffer.append((message, tag))
+
+        if sampler is None:
+            return resumable_clique_search(
+                graph,
+                k,
+                state,
+                max_steps,
+                deadline,
+                log_function,
+                self.cancel_event.is_set,
+            )
 
-        return backtracking_clique_search(
-            self.graph, k, current_set, start_index, step_count, log_function
-        )
+        current_set = state["current_set"] if state else ()
+        sampler.tracer = LogTracer(log_function, current_set)
+        sampler.depth = len(current_set)
+        with sampler:
+            return resumable_clique_search(
+                graph,
+                k,
+                state,
+                max_steps,
+                deadline,
+                should_stop=self.cancel_event.is_set,
+                tracer=sampler,
+            )
+
+    def make_sampler(self):
+        if self.instrument_var.get():
+            return SamplingTracer(SAMPLE_INTERVAL)
+        return None
 
     def find_clique(self):
-        try:
-            k = int(self.k_entry.get())
-            if k < 1 or k > self.num_vertices:
-                messagebox.showerror(
-                    "Ошибка", f"Размер клики должен быть от 1 до {self.num_vertices}"
-                )
+        if self.search_thread is not None:
+            messagebox.showwarning("Предупреждение", "Поиск уже выполняется")
+            return
+
+        maximum_mode = self.mode_var.get() == MODE_MAXIMUM
+
+        if not maximum_mode:
+            try:
+                k = int(self.k_entry.get())
+                if k < 1 or k > self.num_vertices:
+                    messagebox.showerror(
+                        "Ошибка",
+                        f"Размер клики должен быть от 1 до {self.num_vertices}",
+                    )
+                    return
+
+            except ValueError:
+                messagebox.showerror("Ошибка", "Введите корректный размер клики")
                 return
 
+        try:
+            max_steps, deadline = self.read_budget()
         except ValueError:
-            messagebox.showerror("Ошибка", "Введите корректный размер клики")
+            messagebox.showerror("Ошибка", "Введите корректные лимиты поиска")
             return
 
+        graph = self.copy_graph()
         self.clear_results()
         self.solution_clique = []
 
-        self.process_text.insert(tk.END, f"=== ПОИСК КЛИКИ РАЗМЕРА {k} ===\n\n")
+        # Тот же граф с тем же k уже искали: ответ берется из кэша/БД
+        if not maximum_mode:
+            cached = self.db.find_cached_result(graph, k)
+            if cached is not None:
+                self.show_cached_result(k, cached)
+                return
+
+        if maximum_mode:
+            self.process_text.insert(tk.END, "=== ПОИСК МАКСИМАЛЬНОЙ КЛИКИ ===\n\n")
+
+            def search():
+                return find_maximum_clique(graph, self.cancel_event.is_set)
+
+            def on_done(result, execution_time):
+                found, total_steps, clique = result
+                # Клики на одну вершину больше в графе нет
+                self.db.record_bounds(graph, infeasible_k=len(clique) + 1)
+                self.show_search_result(
+                    graph, len(clique), found, total_steps, clique, execution_time
+                )
+
+        elif self.pruning_var.get():
+            self.process_text.insert(tk.END, f"=== ПОИСК КЛИКИ РАЗМЕРА {k} ===\n\n")
+            stats = {}
+            # Поиск начинается с расширения наибольшей известной клики
+            seed = self.db.get_graph_bounds(graph)["best_clique"]
+
+            def search():
+                return bitset_clique_search(
+                    graph, k, stats, self.cancel_event.is_set, seed
+                )
+
+            def on_done(result, execution_time):
+                found, total_steps, clique = result
+                self.process_text.insert(
+                    tk.END,
+                    f"Удалено вершин при сведении к {k - 1}-ядру: "
+                    f"{stats['core_removed']}\n",
+                )
+                self.process_text.insert(
+                    tk.END, f"Отсечено ветвей: {stats['pruned']}\n\n"
+                )
+                self.show_search_result(
+                    graph,
+                    k,
+                    found,
+                    total_steps,
+                    clique,
+                    execution_time,
+                    stats["pruned"],
+                )
+
+        else:
+            self.process_text.insert(tk.END, f"=== ПОИСК КЛИКИ РАЗМЕРА {k} ===\n\n")
+            self.current_clique = []
+            sampler = self.make_sampler()
+
+            def search():
+                return self.find_clique_backtracking(
+                    graph, k, max_steps=max_steps, deadline=deadline, sampler=sampler
+                )
+
+            def on_done(result, execution_time):
+                found, total_steps, clique, state = result
+                if state is not None:
+                    self.show_checkpoint(graph, k, state, execution_time)
+                else:
+                    self.show_search_result(
+                        graph,
+                        k,
+                        found,
+                        total_steps,
+                        clique,
+                        execution_time,
+                        samples=sampler.samples if sampler else None,
+                    )
+
+        self.start_search(search, on_done)
+
+    def resume_search(self):
+        if self.search_thread is not None:
+            messagebox.showwarning("Предупреждение", "Поиск уже выполняется")
+            return
+
+        latest = self.db.get_checkpoint(include_graph=False)
+        if latest is None:
+            messagebox.showwarning("Предупреждение", "Нет прерванных поисков")
+            return
+
+        try:
+            max_steps, deadline = self.read_budget()
+        except ValueError:
+            messagebox.showerror("Ошибка", "Введите корректные лимиты поиска")
+            return
+
+        # Граф распаковывается в разреженный вид, без матрицы n x n
+        checkpoint = self.db.get_checkpoint(latest["id"], sparse=True)
+        k = checkpoint["target_k"]
+        self.set_loaded_graph(checkpoint["graph_matrix"])
+        graph = self.copy_graph()
+        self.k_entry.delete(0, tk.END)
+        self.k_entry.insert(0, str(k))
+        self.mode_var.set(MODE_K_CLIQUE)
+
+        self.clear_results()
+        self.process_text.insert(
+            tk.END,
+            f"=== ПРОДОЛЖЕНИЕ ПОИСКА КЛИКИ РАЗМЕРА {k} "
+            f"(контрольная точка #{checkpoint['id']}) ===\n\n",
+        )
+
+        sampler = self.make_sampler()
+
+        def search():
+            return self.find_clique_backtracking(
+                graph, k, checkpoint["search_state"], max_steps, deadline, sampler
+            )
+
+        def on_done(result, execution_time):
+            found, total_steps, clique, state = result
+            execution_time += checkpoint["execution_time"]
+            self.db.delete_checkpoint(checkpoint["id"])
+
+            if state is not None:
+                self.show_checkpoint(graph, k, state, execution_time)
+            else:
+                self.show_search_result(
+                    graph,
+                    k,
+                    found,
+                    total_steps,
+                    clique,
+                    execution_time,
+                    samples=sampler.samples if sampler else None,
+                )
+
+        self.start_search(search, on_done)
 
+    def replay_search_trace(self):
+        if self.search_thread is not None:
+            messagebox.showwarning("Предупреждение", "Поиск уже выполняется")
+            return
+
+        path = filedialog.askopenfilename(
+            title="Трасса поиска",
+            filetypes=[("Трасса поиска", "*.trace"), ("Все файлы", "*")],
+        )
+        if not path:
+            return
+
+        self.clear_results()
+        self.process_text.insert(tk.END, f"=== ТРАССА {path} ===\n\n")
+        tracer = LogTracer(
+            lambda message, tag=None: self.log_buffer.append((message, tag))
+        )
+
+        def search():
+            with open(path, "rb") as trace_file:
+                return replay_trace(
+                    trace_file, tracer, should_stop=self.cancel_event.is_set
+                )
+
+        def on_done(events, execution_time):
+            self.result_text.insert(tk.END, f"Воспроизведено событий: {events}\n")
+
+        self.start_search(search, on_done)
+
+    def start_search(self, search, on_done):
+        self.log_buffer.clear()
+        self.cancel_event.clear()
+        self.set_search_running(True)
+
+        self.search_thread = threading.Thread(
+            target=self.run_search_worker, args=(search, on_done), daemon=True
+        )
+        self.search_thread.start()
+        self.root.after(LOG_POLL_INTERVAL, self.poll_search)
+
+    def run_search_worker(self, search, on_done):
+        # Рабочий поток не трогает виджеты: результат передается через очередь
         start_time = time.time()
-        step_count = [0]
-        self.current_clique = []
-        found, total_steps, clique = self.find_clique_backtracking(
-            k, self.current_clique, 0, step_count
+        try:
+            result = search()
+        except SearchCancelled:
+            self.search_events.put((self.show_cancelled, ()))
+        except Exception as error:
+            self.search_events.put((self.show_search_error, (error,)))
+        else:
+            self.search_events.put((on_done, (result, time.time() - start_time)))
+
+    def poll_search(self):
+        self.flush_log(LOG_BATCH_SIZE)
+
+        try:
+            callback, args = self.search_events.get_nowait()
+        except queue.Empty:
+            self.root.after(LOG_POLL_INTERVAL, self.poll_search)
+            return
+
+        self.flush_log(len(self.log_buffer))
+        self.search_thread = None
+        self.set_search_running(False)
+        callback(*args)
+
+    def flush_log(self, limit):
+        # Соседние сообщения с одинаковым тегом вставляются одним вызовом
+        chunk = []
+        chunk_tag = None
+        for _ in range(min(limit, len(self.log_buffer))):
+            message, tag = self.log_buffer.popleft()
+            if chunk and tag != chunk_tag:
+                self.process_text.insert(tk.END, "".join(chunk), chunk_tag)
+                chunk = []
+            chunk.append(message)
+            chunk_tag = tag
+        if not chunk:
+            return
+        self.process_text.insert(tk.END, "".join(chunk), chunk_tag)
+
+        # В виджете остаются только последние LOG_BUFFER_SIZE строк
+        lines = int(self.process_text.index("end-1c").split(".")[0])
+        if lines > LOG_BUFFER_SIZE:
+            self.process_text.delete("1.0", f"{lines - LOG_BUFFER_SIZE}.0")
+        self.process_text.see(tk.END)
+
+    def set_search_running(self, running):
+        search_state = tk.DISABLED if running else tk.NORMAL
+        self.find_button.configure(state=search_state)
+        self.resume_button.configure(state=search_state)
+        self.replay_button.configure(state=search_state)
+        self.cancel_button.configure(state=tk.NORMAL if running else tk.DISABLED)
+
+    def cancel_search(self):
+        if self.search_thread is not None:
+            self.cancel_event.set()
+            self.process_text.insert(tk.END, "\nОстановка поиска...\n")
+
+    def show_cancelled(self):
+        self.result_text.insert(tk.END, "ПОИСК ОТМЕНЕН\n")
+        self.request_redraw()
+
+    def show_search_error(self, error):
+        messagebox.showerror("Ошибка", f"Ошибка при поиске клики: {error}")
+
+    def show_checkpoint(self, graph, k, state, execution_time):
+        checkpoint_id = self.db.save_checkpoint(graph, k, state, execution_time)
+
+        self.result_text.insert(tk.END, f"ПОИСК ПРЕРВАН:\n")
+        self.result_text.insert(tk.END, f"Контрольная точка: #{checkpoint_id}\n")
+        self.result_text.insert(tk.END, f"Размер клики: k = {k}\n")
+        self.result_text.insert(tk.END, f"Выполнено шагов: {state['steps']}\n")
+        self.result_text.insert(tk.END, f"Время выполнения: {execution_time:.4f} сек\n")
+        self.result_text.insert(
+            tk.END, "Нажмите «Продолжить поиск», чтобы возобновить\n"
         )
-        execution_time = time.time() - start_time
 
-        session_id = db.save_search_result(
-            graph=self.graph,
+        self.request_redraw()
+
+    def show_search_result(
+        self,
+        graph,
+        k,
+        found,
+        total_steps,
+        clique,
+        execution_time,
+        pruned=None,
+        samples=None,
+    ):
+        session_id = self.db.save_search_result(
+            graph=graph,
             k=k,
             found=found,
             clique_vertices=clique if found else None,
             steps=total_steps,
             execution_time=execution_time,
+            samples=samples,
         )
 
         self.result_text.insert(tk.END, f"РЕЗУЛЬТАТ ПОИСКА:\n")
         self.result_text.insert(tk.END, f"ID в базе данных: {session_id}\n")
         self.result_text.insert(tk.END, f"Размер клики: k = {k}\n")
-        self.result_text.insert(tk.END, f"Выполнено шагов: {total_steps}\n")
+        if pruned is None:
+            self.result_text.insert(tk.END, f"Выполнено шагов: {total_steps}\n")
+        else:
+            self.result_text.insert(
+                tk.END, f"Выполнено шагов: {total_steps} (отсечено ветвей: {pruned})\n"
+            )
         self.result_text.insert(tk.END, f"Время выполнения: {execution_time:.4f} сек\n")
         self.result_text.insert(
             tk.END, f"Результат: {'КЛИКА НАЙДЕНА' if found else 'КЛИКА НЕ НАЙДЕНА'}\n"
@@ -358,22 +1190,48 @@ class CliqueFinderApp:
             self.solution_clique = clique.copy()
             self.result_text.insert(tk.END, f"Вершины клики: {self.solution_clique}\n")
 
-        self.visualize_graph()
+        self.request_redraw()
 
-        self.process_text.tag_configure(
-            "success", foreground="green", font=("TkDefaultFont", 10, "bold")
+        self.append_new_history()
+        self.load_statistics()
+
+    def show_cached_result(self, k, cached):
+        found = cached["found"]
+
+        self.result_text.insert(tk.END, f"РЕЗУЛЬТАТ ИЗ КЭША:\n")
+        if cached["session_id"] is None:
+            self.result_text.insert(
+                tk.END, "Ответ следует из известных для графа клик\n"
+            )
+        else:
+            self.result_text.insert(
+                tk.END, f"ID в базе данных: {cached['session_id']}\n"
+            )
+        self.result_text.insert(tk.END, f"Размер клики: k = {k}\n")
+        if cached["session_id"] is not None:
+            self.result_text.insert(
+                tk.END, f"Шагов при исходном поиске: {cached['steps']}\n"
+            )
+        self.result_text.insert(
+            tk.END, f"Результат: {'КЛИКА НАЙДЕНА' if found else 'КЛИКА НЕ НАЙДЕНА'}\n"
         )
 
-        self.load_history()
-        self.load_statistics()
+        if found:
+            self.solution_clique = list(cached["clique_vertices"])
+            self.result_text.insert(tk.END, f"Вершины клики: {self.solution_clique}\n")
+
+        self.request_redraw()
 
     def save_current_to_db(self):
         if not hasattr(self, "current_clique") or not self.solution_clique:
             messagebox.showwarning("Предупреждение", "Сначала выполните поиск клики")
             return
 
-        k = int(self.k_entry.get())
-        session_id = db.save_search_result(
+        if self.mode_var.get() == MODE_MAXIMUM:
+            k = len(self.solution_clique)
+        else:
+            k = int(self.k_entry.get())
+        session_id = self.db.save_search_result(
             graph=self.graph,
             k=k,
             found=bool(self.solution_clique),
@@ -383,37 +1241,99 @@ class CliqueFinderApp:
         )
 
         messagebox.showinfo("Успех", f"Результат сохранен в БД с ID: {session_id}")
-        self.load_history()
+        self.append_new_history()
 
     def load_history(self):
-        for item in self.history_tree.get_children():
-            self.history_tree.delete(item)
-
-        sessions = db.get_all_sessions()
+        if self.history_page_job is not None:
+            self.root.after_cancel(self.history_page_job)
+        self.history_tree.delete(*self.history_tree.get_children())
+
+        self.history_newest = None
+        self.history_oldest = None
+        self.history_exhausted = False
+        self.load_history_page()
+
+    def load_history_page(self):
+        # Следующая страница более старых записей — в конец таблицы
+        self.history_page_job = None
+        if self.history_exhausted:
+            return
 
+        sessions = self.db.get_sessions_page(
+            HISTORY_PAGE_SIZE, before=self.history_oldest, **self.history_filters
+        )
         for session in sessions:
-            clique_str = (
-                ", ".join(map(str, session["clique_vertices"]))
-                if session["clique_vertices"]
-                else "Не найдена"
-            )
-            found_str = "Да" if session["found_clique"] else "Нет"
+            self.history_tree.insert("", "end", values=self.history_values(session))
 
-            self.history_tree.insert(
-                "",
-                "end",
-                values=(
-                    session["id"],
-                    session["timestamp"],
-                    session["graph_vertices"],
-                    session["target_k"],
-                    found_str,
-                    clique_str,
-                    session["steps"],
-                    f"{session['execution_time']:.4f}",
-                ),
+        if sessions:
+            self.history_oldest = (sessions[-1]["timestamp"], sessions[-1]["id"])
+            if self.history_newest is None:
+                self.history_newest = (sessions[0]["timestamp"], sessions[0]["id"])
+        self.history_exhausted = len(sessions) < HISTORY_PAGE_SIZE
+
+    def append_new_history(self):
+        # После поиска в начало таблицы добавляются только новые записи
+        if self.history_newest is None:
+            self.load_history()
+            return
+
+        sessions = self.db.get_sessions_page(
+            HISTORY_PAGE_SIZE, after=self.history_newest, **self.history_filters
+        )
+        while sessions:
+            # Страница идет от старых к новым: каждая запись встает выше прежних
+            for session in sessions:
+                self.history_tree.insert("", 0, values=self.history_values(session))
+            self.history_newest = (sessions[-1]["timestamp"], sessions[-1]["id"])
+            if len(sessions) < HISTORY_PAGE_SIZE:
+                break
+            sessions = self.db.get_sessions_page(
+                HISTORY_PAGE_SIZE, after=self.history_newest, **self.history_filters
             )
 
+    def on_history_scroll(self, first, last):
+        self.history_scrollbar.set(first, last)
+        if (
+            not self.history_exhausted
+            and self.history_page_job is None
+            and float(last) >= HISTORY_PREFETCH
+        ):
+            self.history_page_job = self.root.after_idle(self.load_history_page)
+
+    def apply_history_filters(self):
+        try:
+            vertices_text = self.history_vertices_entry.get().strip()
+            k_text = self.history_k_entry.get().strip()
+            self.history_filters = {
+                "vertices": int(vertices_text) if vertices_text else None,
+                "k": int(k_text) if k_text else None,
+                "found": HISTORY_FOUND_FILTERS[self.history_found_var.get()],
+            }
+        except ValueError:
+            messagebox.showerror("Ошибка", "Введите корректные значения фильтров")
+            return
+
+        self.load_history()
+
+    def history_values(self, session):
+        clique_str = (
+            ", ".join(map(str, session["clique_vertices"]))
+            if session["clique_vertices"]
+            else "Не найдена"
+        )
+        found_str = "Да" if session["found_clique"] else "Нет"
+
+        return (
+            session["id"],
+            session["timestamp"],
+            session["graph_vertices"],
+            session["target_k"],
+            found_str,
+            clique_str,
+            session["steps"],
+            f"{session['execution_time']:.4f}",
+        )
+
     def on_history_select(self, event):
         selection = self.history_tree.selection()
         if not selection:
@@ -422,7 +1342,7 @@ class CliqueFinderApp:
         item = self.history_tree.item(selection[0])
         session_id = item["values"][0]
 
-        session = db.get_session_by_id(session_id)
+        session = self.db.get_session_by_id(session_id, include_graph=False)
         if session:
             self.details_text.delete(1.0, tk.END)
             self.details_text.insert(tk.END, f"Детали поиска (ID: {session['id']})\n")
@@ -443,7 +1363,7 @@ class CliqueFinderApp:
             )
 
     def load_statistics(self):
-        stats = db.get_statistics()
+        stats = self.db.get_statistics()
 
         self.stats_text.delete(1.0, tk.END)
         self.stats_text.insert(tk.END, "ОБЩАЯ СТАТИСТИКА ПОИСКОВ\n\n")
@@ -468,14 +1388,73 @@ class CliqueFinderApp:
             tk.END, f"Максимальное количество шагов: {stats['max_steps']}\n"
         )
         self.stats_text.insert(
-            tk.END, f"Максимальное время выполнения: {stats['max_time']:.4f} сек\n"
+            tk.END, f"Максимальное время выполнения: {stats['max_time']:.4f} сек\n\n"
+        )
+
+        self.stats_text.insert(tk.END, "РАСПРЕДЕЛЕНИЕ ВРЕМЕНИ\n\n")
+        self.stats_text.insert(tk.END, f"Медиана: {stats['p50_time']:.4f} сек\n")
+        self.stats_text.insert(
+            tk.END, f"90-й процентиль: {stats['p90_time']:.4f} сек\n"
         )
+        self.stats_text.insert(
+            tk.END, f"99-й процентиль: {stats['p99_time']:.4f} сек\n"
+        )
+
+        self.stats_plot_stale = True
+        self.on_tab_changed()
+
+        self.buckets_tree.delete(*self.buckets_tree.get_children())
+        for bucket in self.db.get_bucket_statistics():
+            self.buckets_tree.insert(
+                "",
+                "end",
+                values=(
+                    bucket["graph_vertices"],
+                    bucket["target_k"],
+                    bucket["total_searches"],
+                    f"{bucket['success_rate']*100:.1f}",
+                    f"{bucket['avg_steps']:.1f}",
+                    f"{bucket['p50_time']:.4f}",
+                    f"{bucket['p90_time']:.4f}",
+                ),
+            )
+
+    def on_tab_changed(self, event=None):
+        # График строится, только когда вкладка статистики открыта
+        if self.stats_plot_stale and self.notebook.select() == str(self.stats_frame):
+            self.plot_performance()
+
+    def plot_performance(self):
+        if self.stats_figure is None:
+            self.stats_figure, self.stats_canvas = create_figure(
+                self.stats_plot_frame, (5, 4)
+            )
+            self.stats_ax = self.stats_figure.add_subplot(111)
+        self.stats_plot_stale = False
+        self.stats_ax.clear()
+
+        for session in self.db.get_instrumented_sessions(PLOTTED_SESSIONS):
+            samples = self.db.get_performance_samples(session["id"])
+            self.stats_ax.plot(
+                [sample[1] for sample in samples],
+                [sample[0] for sample in samples],
+                marker=".",
+                label=f"#{session['id']}: n={session['graph_vertices']}, "
+                f"k={session['target_k']}",
+            )
+
+        self.stats_ax.set_title("Шаги поиска во времени")
+        self.stats_ax.set_xlabel("Время, с")
+        self.stats_ax.set_ylabel("Шаги")
+        if self.stats_ax.lines:
+            self.stats_ax.legend(fontsize=8)
+        self.stats_canvas.draw_idle()
 
     def clear_history(self):
         if messagebox.askyesno(
             "Подтверждение", "Вы уверены, что хотите очистить всю историю?"
         ):
-            db.clear_all_data()
+            self.db.clear_all_data()
             self.load_history()
             self.load_statistics()
             messagebox.showinfo("Успех", "История очищена")
@@ -485,7 +1464,7 @@ class CliqueFinderApp:
         self.result_text.delete(1.0, tk.END)
         self.current_clique = []
         self.solution_clique = []
-        self.visualize_graph()
+        self.request_redraw()
 
     def clear_all(self):
         self.clear_results()
@@ -0,0 +1,443 @@
+# server.py - Локальный HTTP-сервис поиска клик
+#
+# Долгоживущий процесс держит загруженные графы, кэши и соединение с БД;
+# поиски выполняются в пуле процессов. Запросы и ответы — JSON:
+#   POST   /jobs       {"k": 4, "graph": [[...]]} или {"k": 4, "path": "g.clq"},
+#                      необязательно "engine" и "time_limit"; "path" — файл
+#                      внутри каталога графов (--graph-dir)
+#   GET    /jobs/<id>  состояние задания и результат
+#   DELETE /jobs/<id>  отмена задания
+#   GET    /health     число заданий и выполняемых поисков
+
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import multiprocessing
+import os
+import sys
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urlsplit
+
+from clique_app import (
+    SEARCH_ENGINES,
+    TIME_LIMITED_ENGINES,
+    CliqueDatabase,
+    check_adjacency_matrix,
+    get_database,
+    graph_hash,
+    load_graph,
+    run_search_job,
+)
+
+HTTP_REASONS = {
+    200: "OK",
+    202: "Accepted",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    409: "Conflict",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+}
+MAX_BODY_SIZE = 64 * 1024 * 1024
+
+# Сколько завершенных заданий помнить и сколько загруженных файлов графов
+# держать в памяти
+FINISHED_JOBS_KEPT = 1000
+GRAPH_CACHE_SIZE = 32
+
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_CANCELLED = "cancelled"
+JOB_FAILED = "failed"
+
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class Job:
+    # Запрос клиента; несколько заданий с одинаковыми (граф, k, движок,
+    # бюджет) разделяют один поиск
+
+    def __init__(self, job_id, k, engine):
+        self.id = job_id
+        self.k = k
+        self.engine = engine
+        self.status = JOB_RUNNING
+        self.coalesced = False
+        self.result = None
+        self.error = None
+        self.search = None
+
+    def finish(self, result):
+        self.status = JOB_DONE
+        self.result = {
+            "found": result["found"],
+            "clique": result["clique_vertices"] or [],
+            "steps": result["steps"],
+            "time": result["execution_time"],
+            "cached": result.get("cached", False),
+            "timed_out": result.get("timed_out", False),
+        }
+
+    def to_json(self):
+        return {
+            "id": self.id,
+            "status": self.status,
+            "k": self.k,
+            "engine": self.engine,
+            "coalesced": self.coalesced,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class Search:
+    # Один поиск в пуле процессов и задания, ожидающие его результата.
+    # stop_event останавливает уже начавшийся поиск; у движков, которые
+    # нельзя прервать, его нет
+
+    def __init__(self, key, stop_event=None):
+        self.key = key
+        self.jobs = set()
+        self.stop_event = stop_event
+        self.pool_future = None
+        self.future = None
+        self.task = None
+
+    def stop(self):
+        # Ожидающий поиск снимается с очереди, выполняющийся — получает сигнал
+        if not self.pool_future.cancel() and self.stop_event is not None:
+            self.stop_event.set()
+        self.future.cancel()
+
+
+class CliqueServer:
+
+    def __init__(
+        self, database=None, host="127.0.0.1", port=0, workers=None, graph_dir=None
+    ):
+        self.database = database if database is not None else get_database()
+        # Файлы графов читаются только из этого каталога; без него задания
+        # с "path" отклоняются
+        self.graph_dir = os.path.realpath(graph_dir) if graph_dir else None
+        self.host = host
+        self.port = port
+        self.workers = workers or os.cpu_count() or 1
+        self._jobs = OrderedDict()
+        self._searches = {}
+        self._graphs = OrderedDict()
+        self._ids = itertools.count(1)
+        self._pool = None
+        self._manager = None
+        self._server = None
+
+    async def start(self):
+        # События остановки передаются в процессы пула через менеджер:
+        # обычное multiprocessing.Event нельзя передать в submit
+        self._manager = await asyncio.to_thread(multiprocessing.Manager)
+        self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        self._server = await asyncio.start_server(
+            self._handle_connection, self.host, self.port
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        self._server.close()
+        await self._server.wait_closed()
+        for search in list(self._searches.values()):
+            search.stop()
+        await asyncio.to_thread(self._pool.shutdown, True, cancel_futures=True)
+        await asyncio.to_thread(self._manager.shutdown)
+
+    async def serve_forever(self):
+        await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.close()
+
+    # Задания
+
+    async def submit(self, request):
+        if not isinstance(request, dict):
+            raise HttpError(400, "Ожидается объект JSON")
+        engine = request.get("engine", "bitset")
+        if engine not in SEARCH_ENGINES:
+            raise HttpError(400, f"Неизвестный движок: {engine}")
+        time_limit = request.get("time_limit")
+        try:
+            k = int(request["k"])
+            if time_limit is not None:
+                time_limit = float(time_limit)
+                if not math.isfinite(time_limit) or time_limit <= 0:
+                    raise ValueError("time_limit должно быть положительным числом")
+                if engine not in TIME_LIMITED_ENGINES:
+                    raise ValueError(
+                        f"Движок {engine} не поддерживает ограничение времени"
+                    )
+            if "path" in request:
+                graph = await self._load_graph(request["path"], request.get("format"))
+            else:
+                graph = check_adjacency_matrix(request["graph"])
+            if not 1 <= k <= len(graph):
+                raise ValueError(f"k должно быть от 1 до {len(graph)}")
+        except KeyError as error:
+            raise HttpError(400, f"Не задано поле {error}")
+        except (TypeError, ValueError) as error:
+            raise HttpError(400, str(error))
+
+        key = (await asyncio.to_thread(graph_hash, graph), k, engine, time_limit)
+        cached = await asyncio.to_thread(self.database.find_cached_result, graph, k)
+        bounds = await asyncio.to_thread(self.database.get_graph_bounds, graph)
+
+        job = Job(next(self._ids), k, engine)
+        self._jobs[job.id] = job
+        if cached is not None:
+            cached["cached"] = True
+            job.finish(cached)
+            self._forget_finished()
+            return job
+
+        # Между проверкой и созданием поиска нет await: одинаковый запрос,
+        # пришедший раньше, уже зарегистрировал свой поиск
+        search = self._searches.get(key)
+        if search is None:
+            stop_event = None
+            if engine in TIME_LIMITED_ENGINES:
+                stop_event = self._manager.Event()
+            search = Search(key, stop_event)
+            search.pool_future = self._pool.submit(
+                run_search_job,
+                engine,
+                graph,
+                k,
+                bounds["best_clique"],
+                time_limit,
+                stop_event,
+            )
+            search.future = asyncio.wrap_future(search.pool_future)
+            self._searches[key] = search
+            search.task = asyncio.create_task(self._finish_search(search, graph, k))
+        else:
+            job.coalesced = True
+        search.jobs.add(job)
+        job.search = search
+        return job
+
+    async def _finish_search(self, search, graph, k):
+        try:
+            result = await search.future
+        except asyncio.CancelledError:
+            return
+        except Exception as error:
+            for job in search.jobs:
+                job.status = JOB_FAILED
+                job.error = str(error)
+            return
+        finally:
+            if self._searches.get(search.key) is search:
+                del self._searches[search.key]
+
+        # Остановленный поиск нужен только отмененным заданиям
+        if result["cancelled"]:
+            return
+        # Прерванный по времени поиск ничего не говорит о клике и не пишется
+        if not result["timed_out"]:
+            await asyncio.to_thread(
+                self.database.save_search_result,
+                graph,
+                k,
+                result["found"],
+                result["clique_vertices"],
+                result["steps"],
+                result["execution_time"],
+            )
+        for job in search.jobs:
+            job.finish(result)
+        self._forget_finished()
+
+    def cancel(self, job):
+        # Поиск останавливается, когда от него отказались все задания: из
+        # очереди он снимается, а выполняющийся получает stop_event. Поиск
+        # движком без остановки занимал бы процесс до конца, поэтому такое
+        # задание не отменяется
+        if job.status != JOB_RUNNING:
+            raise HttpError(409, f"Задание {job.id} уже завершено: {job.status}")
+        search = job.search
+        if (
+            search.jobs == {job}
+            and search.stop_event is None
+            and search.pool_future.running()
+        ):
+            raise HttpError(
+                409, f"Поиск движком {job.engine} уже выполняется и не прерывается"
+            )
+        job.status = JOB_CANCELLED
+        search.jobs.discard(job)
+        if not search.jobs:
+            search.stop()
+            if self._searches.get(search.key) is search:
+                del self._searches[search.key]
+        self._forget_finished()
+        return job
+
+    def _forget_finished(self):
+        finished = [
+            job_id for job_id, job in self._jobs.items() if job.status != JOB_RUNNING
+        ]
+        for job_id in finished[: max(0, len(finished) - FINISHED_JOBS_KEPT)]:
+            del self._jobs[job_id]
+
+    def _graph_path(self, path):
+        # Путь из запроса разрешается внутри каталога графов; ссылки и ".."
+        # за его пределы не выводят
+        if self.graph_dir is None:
+            raise HttpError(400, "Загрузка графов из файлов не настроена")
+        if not isinstance(path, str):
+            raise HttpError(400, "Путь к графу должен быть строкой")
+        resolved = os.path.realpath(os.path.join(self.graph_dir, path))
+        if os.path.commonpath([resolved, self.graph_dir]) != self.graph_dir:
+            raise HttpError(400, f"Файл {path} вне каталога графов")
+        return resolved
+
+    async def _load_graph(self, path, graph_format):
+        # Файлы графов читаются один раз; изменение файла сбрасывает кэш.
+        # Текст ошибок не содержит содержимого файла
+        resolved = self._graph_path(path)
+        try:
+            key = (resolved, graph_format, os.stat(resolved).st_mtime_ns)
+        except OSError:
+            raise HttpError(400, f"Нет файла графа {path}")
+        graph = self._graphs.get(key)
+        if graph is None:
+            try:
+                graph = await asyncio.to_thread(load_graph, resolved, graph_format)
+            except (OSError, ValueError):
+                raise HttpError(400, f"Не удалось прочитать граф из файла {path}")
+            self._graphs[key] = graph
+            if len(self._graphs) > GRAPH_CACHE_SIZE:
+                self._graphs.popitem(last=False)
+        else:
+            self._graphs.move_to_end(key)
+        return graph
+
+    # HTTP
+
+    def _job(self, job_id):
+        try:
+            return self._jobs[int(job_id)]
+        except (KeyError, ValueError):
+            raise HttpError(404, f"Нет задания {job_id}")
+
+    async def _route(self, method, path, body):
+        if path == "/health":
+            if method != "GET":
+                raise HttpError(405, "Ожидается GET")
+            running = sum(job.status == JOB_RUNNING for job in self._jobs.values())
+            return 200, {
+                "status": "ok",
+                "jobs": len(self._jobs),
+                "running_jobs": running,
+                "searches": len(self._searches),
+            }
+
+        if path == "/jobs":
+            if method != "POST":
+                raise HttpError(405, "Ожидается POST")
+            try:
+                request = json.loads(body or b"null")
+            except ValueError as error:
+                raise HttpError(400, f"Некорректный JSON: {error}")
+            job = await self.submit(request)
+            return (200 if job.status == JOB_DONE else 202), job.to_json()
+
+        if path.startswith("/jobs/"):
+            job = self._job(path[len("/jobs/") :])
+            if method == "GET":
+                return 200, job.to_json()
+            if method == "DELETE":
+                return 200, self.cancel(job).to_json()
+            raise HttpError(405, "Ожидается GET или DELETE")
+
+        raise HttpError(404, f"Нет ресурса {path}")
+
+    async def _read_request(self, reader):
+        try:
+            method, target, _ = (
+                (await reader.readline()).decode("latin-1").split(" ", 2)
+            )
+        except ValueError:
+            raise HttpError(400, "Некорректная строка запроса")
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get("content-length", 0))
+        except ValueError:
+            raise HttpError(400, "Некорректный Content-Length")
+        if length > MAX_BODY_SIZE:
+            raise HttpError(413, "Слишком большой запрос")
+        body = await reader.readexactly(length) if length > 0 else b""
+        return method.upper(), urlsplit(target).path.rstrip("/") or "/", body
+
+    async def _handle_connection(self, reader, writer):
+        # Один запрос на соединение (Connection: close)
+        try:
+            status, payload = await self._route(*await self._read_request(reader))
+        except HttpError as error:
+            status, payload = error.status, {"error": error.message}
+        except asyncio.IncompleteReadError:
+            status, payload = 400, {"error": "Запрос оборван"}
+        except Exception as error:
+            status, payload = 500, {"error": str(error)}
+
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        writer.write(
+            f"HTTP/1.1 {status} {HTTP_REASONS[status]}\r\n"
+            "Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Connection: close\r\n\r\n".encode("latin-1") + body
+        )
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Локальный сервис поиска клик")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, help="число процессов поиска")
+    parser.add_argument("--db", help="путь к базе (по умолчанию CLIQUE_DB_PATH)")
+    parser.add_argument(
+        "--graph-dir", help="каталог, из которого разрешено читать файлы графов"
+    )
+    args = parser.parse_args(argv)
+
+    database = CliqueDatabase(args.db) if args.db else get_database()
+    server = CliqueServer(database, args.host, args.port, args.workers, args.graph_dir)
+    print(f"Сервис поиска клик: http://{args.host}:{args.port}")
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
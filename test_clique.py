@@ -1,11 +1,74 @@
 import pytest
+import io
+import json
 import sys
 import os
+import sqlite3
+import asyncio
+import threading
 import time
+import urllib.error
+import urllib.request
+import tracemalloc
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from clique_app import backtracking_clique_search, is_clique
+import numpy as np
+
+import cli
+import clique_app
+import server as clique_server
+from bench_clique import (
+    QUICK_SUITE,
+    compare_results,
+    complete_multipartite_graph,
+    hidden_clique_graph,
+    measure_import_time,
+    moon_moser_graph,
+    p_hat_graph,
+    run_benchmarks,
+)
+from clique_app import (
+    BinaryTraceWriter,
+    CliqueDatabase,
+    GRAPH_FORMAT_JSON,
+    GRAPH_FORMAT_PACKED,
+    GRAPH_FORMAT_PACKED_ZLIB,
+    GRAPH_FORMAT_SHARED,
+    TRACE_MAGIC,
+    TRACE_RECORD,
+    LatencySketch,
+    LogTracer,
+    SamplingTracer,
+    SearchTracer,
+    SearchCancelled,
+    BitsetGraph,
+    SparseGraph,
+    as_adjacency_matrix,
+    backtracking_clique_search,
+    bitset_clique_search,
+    bron_kerbosch,
+    decode_graph_matrix,
+    decode_sparse_graph,
+    degeneracy_order,
+    encode_graph_matrix,
+    find_all_maximal_cliques,
+    find_maximum_clique,
+    get_database,
+    graph_hash,
+    graph_to_bitsets,
+    is_clique,
+    iterative_clique_search,
+    k_core_mask,
+    load_graph,
+    numpy_clique_search,
+    parallel_clique_search,
+    replay_trace,
+    resumable_clique_search,
+    run_search_batch,
+    sparse_clique_search,
+    sparse_core_decomposition,
+)
 
 
 class TestCliqueAlgorithm:
@@ -220,6 +283,1851 @@ class TestEdgeCases:
         assert found == False
 
 
+def random_graph(n, p, seed):
+    import random
+
+    rng = random.Random(seed)
+    graph = [[0] * n for _ in range(n)]
+    for i in range(n):
+        for j in range(i + 1, n):
+            if rng.random() < p:
+                graph[i][j] = graph[j][i] = 1
+    return graph
+
+
+class TestBitsetSearch:
+
+    def test_graph_to_bitsets(self):
+        graph = [[0, 1, 1], [1, 0, 0], [1, 0, 0]]
+        assert graph_to_bitsets(graph) == [0b110, 0b001, 0b001]
+
+    def test_ignores_self_loops(self):
+        graph = [[1, 1], [1, 1]]
+        assert graph_to_bitsets(graph) == [0b10, 0b01]
+
+    def test_empty_graph(self):
+        assert bitset_clique_search([], 1) == (False, 1, [])
+
+    def test_no_clique(self):
+        graph = [[0, 1, 0, 0], [1, 0, 0, 0], [0, 0, 0, 1], [0, 0, 1, 0]]
+        found, steps, clique = bitset_clique_search(graph, 3)
+        assert found == False
+        assert clique == []
+
+    @pytest.mark.parametrize("seed", range(5))
+    @pytest.mark.parametrize("k", [2, 3, 4, 5])
+    def test_matches_backtracking(self, seed, k):
+        graph = random_graph(12, 0.5, seed)
+
+        expected = backtracking_clique_search(graph, k, [], 0, [0])
+        found, steps, clique = bitset_clique_search(graph, k)
+
+        assert found == expected[0]
+        if found:
+            assert len(clique) == k
+            assert is_clique(graph, clique)
+        else:
+            assert clique == []
+
+    def test_k_core_mask(self):
+        # Треугольник 0-1-2 с висячей вершиной 3
+        adjacency = graph_to_bitsets(
+            [[0, 1, 1, 0], [1, 0, 1, 0], [1, 1, 0, 1], [0, 0, 1, 0]]
+        )
+        assert k_core_mask(adjacency, 2) == 0b0111
+        assert k_core_mask(adjacency, 3) == 0
+
+    def test_stats_report_pruning(self):
+        graph = random_graph(30, 0.3, 7)
+        stats = {}
+
+        found, steps, clique = bitset_clique_search(graph, 8, stats)
+
+        assert found == False
+        assert stats["steps"] == steps
+        assert stats["pruned"] > 0
+        assert stats["core_removed"] > 0
+
+    def test_prunes_harder_than_backtracking(self):
+        graph = random_graph(40, 0.5, 3)
+
+        found, bitset_steps, clique = bitset_clique_search(graph, 9)
+        expected, naive_steps, _ = backtracking_clique_search(graph, 9, [], 0, [0])
+
+        assert found == expected
+        assert bitset_steps * 10 < naive_steps
+
+
+def brute_force_maximal_cliques(graph):
+    from itertools import combinations
+
+    n = len(graph)
+    cliques = [
+        set(c)
+        for size in range(1, n + 1)
+        for c in combinations(range(n), size)
+        if is_clique(graph, c)
+    ]
+    return sorted(sorted(c) for c in cliques if not any(c < other for other in cliques))
+
+
+class TestBronKerbosch:
+
+    def test_degeneracy_order_is_permutation(self):
+        graph = random_graph(10, 0.4, 0)
+        order = degeneracy_order(graph_to_bitsets(graph))
+        assert sorted(order) == list(range(10))
+
+    def test_triangle_with_tail(self):
+        graph = [
+            [0, 1, 1, 0],
+            [1, 0, 1, 0],
+            [1, 1, 0, 1],
+            [0, 0, 1, 0],
+        ]
+        assert sorted(find_all_maximal_cliques(graph)) == [[0, 1, 2], [2, 3]]
+
+    def test_isolated_vertices(self):
+        graph = [[0, 0], [0, 0]]
+        assert sorted(find_all_maximal_cliques(graph)) == [[0], [1]]
+
+    def test_is_lazy(self):
+        graph = random_graph(10, 0.5, 1)
+        first = next(bron_kerbosch(graph))
+        assert is_clique(graph, first)
+
+    @pytest.mark.parametrize("seed", range(6))
+    def test_matches_brute_force(self, seed):
+        graph = random_graph(9, 0.5, seed)
+        assert sorted(find_all_maximal_cliques(graph)) == (
+            brute_force_maximal_cliques(graph)
+        )
+
+
+class TestMaximumClique:
+
+    def test_empty_graph(self):
+        assert find_maximum_clique([]) == (False, 0, [])
+
+    def test_no_edges(self):
+        found, steps, clique = find_maximum_clique([[0, 0], [0, 0]])
+        assert found == True
+        assert len(clique) == 1
+
+    def test_specific_graph(self):
+        graph = [
+            [0, 1, 1, 0, 0, 0],
+            [1, 0, 1, 0, 0, 0],
+            [1, 1, 0, 1, 1, 1],
+            [0, 0, 1, 0, 1, 1],
+            [0, 0, 1, 1, 0, 1],
+            [0, 0, 1, 1, 1, 0],
+        ]
+        found, steps, clique = find_maximum_clique(graph)
+        assert found == True
+        assert clique == [2, 3, 4, 5]
+
+    @pytest.mark.parametrize("seed", range(6))
+    def test_matches_brute_force(self, seed):
+        graph = random_graph(10, 0.6, seed)
+        expected = max(len(c) for c in brute_force_maximal_cliques(graph))
+
+        found, steps, clique = find_maximum_clique(graph)
+
+        assert len(clique) == expected
+        assert is_clique(graph, clique)
+        assert clique == sorted(clique)
+
+
+class TestNumpyBackend:
+
+    def test_as_adjacency_matrix(self):
+        matrix = as_adjacency_matrix([[0, 1], [1, 0]])
+        assert matrix.dtype == np.uint8
+        assert matrix.shape == (2, 2)
+        assert as_adjacency_matrix(matrix) is matrix
+
+    def test_as_adjacency_matrix_empty(self):
+        assert as_adjacency_matrix([]).shape == (0, 0)
+
+    @pytest.mark.parametrize(
+        "graph,vertices,expected",
+        [
+            ([[0, 1, 1], [1, 0, 1], [1, 1, 0]], [0, 1, 2], True),
+            ([[0, 1, 0], [1, 0, 1], [0, 1, 0]], [0, 1, 2], False),
+            ([[0]], [0], True),
+            ([[0, 1], [1, 0]], [], True),
+        ],
+    )
+    def test_is_clique_matches_lists(self, graph, vertices, expected):
+        assert is_clique(as_adjacency_matrix(graph), vertices) == expected
+
+    @pytest.mark.parametrize("seed", range(5))
+    @pytest.mark.parametrize("k", [0, 1, 2, 3, 4, 5])
+    def test_matches_backtracking_exactly(self, seed, k):
+        graph = random_graph(12, 0.5, seed)
+
+        expected = backtracking_clique_search(graph, k, [], 0, [0])
+
+        assert numpy_clique_search(graph, k) == expected
+        assert numpy_clique_search(as_adjacency_matrix(graph), k) == expected
+
+    def test_steps_are_python_ints(self):
+        found, steps, clique = numpy_clique_search(random_graph(10, 0.5, 0), 3)
+        assert type(steps) is int
+        assert all(type(v) is int for v in clique)
+
+
+class TestParallelSearch:
+
+    @pytest.mark.parametrize("seed,k", [(0, 3), (1, 4), (2, 5), (3, 6)])
+    def test_matches_sequential(self, seed, k):
+        graph = random_graph(20, 0.5, seed)
+
+        expected = bitset_clique_search(graph, k)
+        found, steps, clique = parallel_clique_search(graph, k, workers=2)
+
+        assert found == expected[0]
+        assert steps >= 1
+        if found:
+            assert len(clique) == k
+            assert is_clique(graph, clique)
+        else:
+            assert clique == []
+
+    def test_steps_aggregate_all_subtrees(self):
+        graph = [[0, 1, 0, 0], [1, 0, 0, 0], [0, 0, 0, 1], [0, 0, 1, 0]]
+
+        found, steps, clique = parallel_clique_search(graph, 2, workers=2)
+        assert found == True
+
+        found, steps, clique = parallel_clique_search(graph, 3, workers=2)
+        assert found == False
+        assert steps == 1
+
+    def test_single_worker_is_sequential(self):
+        graph = random_graph(15, 0.5, 4)
+        assert parallel_clique_search(graph, 4, workers=1) == bitset_clique_search(
+            graph, 4
+        )
+
+
+class TestIterativeSearch:
+
+    def run_logged(self, search, graph, k, current_set=(), start_index=0):
+        messages = []
+        current_set = list(current_set)
+        step_count = [0]
+
+        result = search(
+            graph,
+            k,
+            current_set,
+            start_index,
+            step_count,
+            lambda message, tag=None: messages.append((message, tag)),
+        )
+        return result, messages, current_set, step_count
+
+    @pytest.mark.parametrize("seed", range(5))
+    @pytest.mark.parametrize("k", [0, 1, 2, 3, 4, 5])
+    def test_identical_to_backtracking(self, seed, k):
+        graph = random_graph(9, 0.5, seed)
+
+        expected = self.run_logged(backtracking_clique_search, graph, k)
+        assert self.run_logged(iterative_clique_search, graph, k) == expected
+
+    @pytest.mark.parametrize(
+        "current_set,start_index", [([0], 1), ([2, 3], 4), ([0, 4], 2), ([1], 6)]
+    )
+    def test_identical_with_initial_set(self, current_set, start_index):
+        graph = random_graph(7, 0.6, 11)
+
+        expected = self.run_logged(
+            backtracking_clique_search, graph, 3, current_set, start_index
+        )
+        actual = self.run_logged(
+            iterative_clique_search, graph, 3, current_set, start_index
+        )
+        assert actual == expected
+
+    def test_step_count_without_log(self):
+        graph = [[0, 1, 1, 0], [1, 0, 1, 0], [1, 1, 0, 1], [0, 0, 1, 0]]
+
+        for k in range(1, 5):
+            expected = backtracking_clique_search(graph, k, [], 0, [0])
+            assert iterative_clique_search(graph, k, [], 0, [0]) == expected
+
+    def test_no_recursion_limit(self):
+        n = sys.getrecursionlimit() + 50
+        graph = [[int(i != j) for j in range(n)] for i in range(n)]
+
+        found, steps, clique = iterative_clique_search(graph, n, [], 0, [0])
+
+        assert found == True
+        assert clique == list(range(n))
+        assert steps == n + 1
+
+
+class TestResumableSearch:
+
+    def test_without_budget_matches_iterative(self):
+        graph = random_graph(12, 0.5, 3)
+
+        for k in range(1, 7):
+            found, steps, clique = iterative_clique_search(graph, k, [], 0, [0])
+            assert resumable_clique_search(graph, k) == (found, steps, clique, None)
+
+    @pytest.mark.parametrize("k,max_steps", [(4, 1), (5, 7), (6, 50)])
+    def test_resume_until_done(self, k, max_steps):
+        graph = random_graph(14, 0.5, 5)
+        expected = iterative_clique_search(graph, k, [], 0, [0])
+
+        state = None
+        calls = 0
+        while True:
+            found, steps, clique, state = resumable_clique_search(
+                graph, k, state=state, max_steps=max_steps
+            )
+            calls += 1
+            if state is None:
+                break
+            # Состояние должно переживать сериализацию
+            state = json.loads(json.dumps(state))
+
+        assert (found, steps, clique) == expected
+        assert calls > 1
+
+    def test_expired_deadline_returns_state(self):
+        graph = random_graph(12, 0.5, 1)
+
+        found, steps, clique, state = resumable_clique_search(
+            graph, 5, deadline=time.time() - 1
+        )
+
+        assert found == False
+        assert state is not None
+        assert state["steps"] == steps == 1
+
+    def test_state_must_match_graph(self):
+        graph = random_graph(12, 0.5, 1)
+        state = resumable_clique_search(graph, 5, max_steps=1)[3]
+
+        with pytest.raises(ValueError):
+            resumable_clique_search(random_graph(10, 0.5, 1), 5, state=state)
+
+
+class TestCheckpoints:
+
+    def test_checkpoint_roundtrip(self, tmp_path):
+        database = CliqueDatabase(str(tmp_path / "test.db"))
+        graph = random_graph(12, 0.5, 2)
+        state = resumable_clique_search(graph, 6, max_steps=5)[3]
+
+        checkpoint_id = database.save_checkpoint(graph, 6, state, 0.5)
+        checkpoint = database.get_checkpoint(checkpoint_id)
+
+        assert checkpoint["target_k"] == 6
+        assert checkpoint["steps"] == state["steps"]
+        assert checkpoint["graph_matrix"] == graph
+        assert checkpoint["search_state"] == state
+        assert database.get_checkpoint()["id"] == checkpoint_id
+
+        found, steps, clique, state = resumable_clique_search(
+            checkpoint["graph_matrix"], 6, state=checkpoint["search_state"]
+        )
+        assert state is None
+        assert (found, steps, clique) == iterative_clique_search(graph, 6, [], 0, [0])
+
+    def test_delete_checkpoint(self, tmp_path):
+        database = CliqueDatabase(str(tmp_path / "test.db"))
+        graph = random_graph(8, 0.5, 2)
+        state = resumable_clique_search(graph, 4, max_steps=1)[3]
+
+        checkpoint_id = database.save_checkpoint(graph, 4, state, 0.0)
+        database.delete_checkpoint(checkpoint_id)
+
+        assert database.get_checkpoint(checkpoint_id) is None
+        assert database.get_checkpoint() is None
+
+    def test_checkpoint_without_dense_matrix(self, tmp_path):
+        # Большой разреженный граф возобновляется без матрицы n x n
+        database = CliqueDatabase(str(tmp_path / "sparse_checkpoint.db"))
+        n = 3000
+        endpoints = [(vertex, (vertex + 1) % n) for vertex in range(n)]
+        graph = SparseGraph.from_edges(n, np.array(endpoints).ravel())
+        state = resumable_clique_search(graph, 3, max_steps=10)[3]
+        checkpoint_id = database.save_checkpoint(graph, 3, state, 0.1)
+
+        latest = database.get_checkpoint(include_graph=False)
+        assert latest["id"] == checkpoint_id and "graph_matrix" not in latest
+
+        checkpoint = database.get_checkpoint(checkpoint_id, sparse=True)
+        loaded = checkpoint["graph_matrix"]
+        assert isinstance(loaded, SparseGraph)
+        assert loaded.edge_count() == n
+        assert (loaded.indices == graph.indices).all()
+        found, _, _, state = resumable_clique_search(
+            loaded, 3, state=checkpoint["search_state"]
+        )
+        assert not found and state is None
+
+
+class TestCancellation:
+
+    def test_resumable_stops_with_state(self):
+        graph = random_graph(12, 0.5, 1)
+
+        found, steps, clique, state = resumable_clique_search(
+            graph, 6, should_stop=lambda: True
+        )
+
+        assert found == False
+        assert state is not None
+        final = resumable_clique_search(graph, 6, state=state)
+        assert final[:3] == iterative_clique_search(graph, 6, [], 0, [0])
+
+    def test_bitset_raises(self):
+        graph = random_graph(80, 0.8, 0)
+        with pytest.raises(SearchCancelled):
+            bitset_clique_search(graph, 18, should_stop=lambda: True)
+
+    def test_maximum_raises(self):
+        graph = random_graph(80, 0.8, 0)
+        stats = {}
+        with pytest.raises(SearchCancelled):
+            find_maximum_clique(graph, should_stop=lambda: True, stats=stats)
+        # Лучшая клика к моменту остановки не теряется
+        assert stats["steps"] == 1024
+        assert stats["best_clique"] and is_clique(graph, stats["best_clique"])
+
+    def test_should_stop_not_called_when_fast(self):
+        calls = []
+        graph = [[0, 1], [1, 0]]
+
+        def should_stop():
+            calls.append(1)
+            return True
+
+        assert bitset_clique_search(graph, 2, should_stop=should_stop)[0] == True
+
+
+class RecordingTracer(SearchTracer):
+
+    def __init__(self):
+        self.events = []
+
+    def enter(self, step, start_index):
+        self.events.append(("enter", step, start_index))
+
+    def add(self, vertex):
+        self.events.append(("add", vertex))
+
+    def backtrack(self, vertex):
+        self.events.append(("backtrack", vertex))
+
+    def found(self, step):
+        self.events.append(("found", step))
+
+    def reject(self, step):
+        self.events.append(("reject", step))
+
+
+class TestTracing:
+
+    def test_events_for_triangle(self):
+        graph = [[0, 1, 1], [1, 0, 1], [1, 1, 0]]
+        tracer = RecordingTracer()
+
+        backtracking_clique_search(graph, 2, [], 0, [0], tracer=tracer)
+
+        assert tracer.events == [
+            ("enter", 1, 0),
+            ("add", 0),
+            ("enter", 2, 1),
+            ("add", 1),
+            ("enter", 3, 2),
+            ("found", 3),
+        ]
+
+    @pytest.mark.parametrize(
+        "search", [backtracking_clique_search, iterative_clique_search]
+    )
+    def test_same_events_in_both_engines(self, search):
+        graph = random_graph(9, 0.5, 4)
+        expected = RecordingTracer()
+        backtracking_clique_search(graph, 4, [], 0, [0], tracer=expected)
+
+        tracer = RecordingTracer()
+        search(graph, 4, [], 0, [0], tracer=tracer)
+
+        assert tracer.events == expected.events
+
+    def test_tracer_does_not_change_result(self):
+        graph = random_graph(12, 0.5, 2)
+
+        for k in range(1, 7):
+            plain = iterative_clique_search(graph, k, [], 0, [0])
+            traced = iterative_clique_search(
+                graph, k, [], 0, [0], tracer=SearchTracer()
+            )
+            assert traced == plain
+
+    def test_binary_trace_replays_to_same_log(self):
+        graph = random_graph(10, 0.5, 6)
+        expected = []
+        backtracking_clique_search(
+            graph, 4, [], 0, [0], lambda m, tag=None: expected.append((m, tag))
+        )
+
+        trace = io.BytesIO()
+        writer = BinaryTraceWriter(trace)
+        iterative_clique_search(graph, 4, [], 0, [0], tracer=writer)
+        writer.flush()
+
+        trace.seek(0)
+        replayed = []
+        events = replay_trace(
+            trace, LogTracer(lambda m, tag=None: replayed.append((m, tag)))
+        )
+
+        assert replayed == expected
+        assert events * 13 + 9 == len(trace.getvalue())
+
+    def test_replay_rejects_foreign_file(self):
+        with pytest.raises(ValueError):
+            replay_trace(io.BytesIO(b"not a trace"), SearchTracer())
+
+    def test_replay_rejects_unknown_record(self):
+        trace = io.BytesIO(TRACE_MAGIC + TRACE_RECORD.pack(99, 0, 0))
+        with pytest.raises(ValueError):
+            replay_trace(trace, SearchTracer())
+
+    def test_replay_can_be_stopped(self):
+        trace = io.BytesIO()
+        writer = BinaryTraceWriter(trace)
+        iterative_clique_search(random_graph(10, 0.5, 6), 4, [], 0, [0], tracer=writer)
+        writer.flush()
+
+        trace.seek(0)
+        with pytest.raises(SearchCancelled):
+            replay_trace(trace, SearchTracer(), should_stop=lambda: True)
+
+
+class TestDatabaseAccess:
+
+    def test_schema_created_lazily(self, tmp_path):
+        path = tmp_path / "lazy.db"
+        database = CliqueDatabase(str(path))
+        assert not path.exists()
+
+        assert database.get_all_sessions() == []
+        assert path.exists()
+
+    def test_wal_mode(self, tmp_path):
+        database = CliqueDatabase(str(tmp_path / "wal.db"))
+        with database.transaction() as cursor:
+            cursor.execute("PRAGMA journal_mode")
+            assert cursor.fetchone()[0] == "wal"
+
+    def test_transaction_rollback(self, tmp_path):
+        database = CliqueDatabase(str(tmp_path / "rollback.db"))
+
+        with pytest.raises(RuntimeError):
+            with database.transaction():
+                database.save_search_result([[0]], 1, True, [0], 1, 0.0)
+                raise RuntimeError
+
+        assert database.get_statistics()["total_searches"] == 0
+
+    def test_nested_transaction_joins_outer(self, tmp_path):
+        database = CliqueDatabase(str(tmp_path / "nested.db"))
+
+        with database.transaction():
+            for _ in range(3):
+                database.save_search_result([[0]], 1, True, [0], 1, 0.0)
+
+        assert database.get_statistics()["total_searches"] == 3
+
+    def test_concurrent_writers(self, tmp_path):
+        import threading
+
+        database = CliqueDatabase(str(tmp_path / "concurrent.db"))
+        graph = random_graph(8, 0.5, 0)
+        errors = []
+
+        def writer():
+            try:
+                for i in range(200):
+                    database.save_search_result(graph, 3, i % 2 == 0, [0], i, 0.01)
+            except Exception as error:
+                errors.append(error)
+
+        threads = [threading.Thread(target=writer) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
+        stats = database.get_statistics()
+        assert stats["total_searches"] == 800
+        assert stats["successful_searches"] == 400
+
+    def test_separate_connections_share_data(self, tmp_path):
+        path = str(tmp_path / "shared.db")
+        first = CliqueDatabase(path)
+        second = CliqueDatabase(path)
+
+        session_id = first.save_search_result([[0, 1], [1, 0]], 2, True, [0, 1], 3, 0.1)
+
+        assert second.get_session_by_id(session_id)["clique_vertices"] == [0, 1]
+        first.close()
+        second.close()
+
+
+class TestBatchSearch:
+
+    def test_bulk_insert(self, tmp_path):
+        database = CliqueDatabase(str(tmp_path / "bulk.db"))
+        graph = [[0, 1], [1, 0]]
+        results = [
+            {
+                "graph": graph,
+                "k": 2,
+                "found": i % 2 == 0,
+                "clique_vertices": [0, 1] if i % 2 == 0 else None,
+                "steps": i,
+                "execution_time": 0.001,
+            }
+            for i in range(1000)
+        ]
+
+        assert database.save_search_results_bulk(results) == 1000
+
+        stats = database.get_statistics()
+        assert stats["total_searches"] == 1000
+        assert stats["successful_searches"] == 500
+        assert stats["max_steps"] == 999
+
+    @pytest.mark.parametrize("max_workers", [1, 2])
+    def test_batch_matches_engine(self, max_workers):
+        jobs = [(random_graph(10, 0.5, seed), k) for seed in range(3) for k in (2, 4)]
+
+        results = list(run_search_batch(jobs, max_workers=max_workers))
+
+        assert sorted(r["index"] for r in results) == list(range(len(jobs)))
+        for result in results:
+            graph, k = jobs[result["index"]]
+            assert result["graph"] is graph
+            assert result["found"] == bitset_clique_search(graph, k)[0]
+
+    def test_batch_streams_to_database_in_chunks(self, tmp_path):
+        database = CliqueDatabase(str(tmp_path / "batch.db"))
+        jobs = [(random_graph(8, 0.5, seed), 3) for seed in range(7)]
+
+        results = run_search_batch(
+            jobs, engine="iterative", max_workers=1, database=database, chunk_size=3
+        )
+        next(results)
+        next(results)
+        assert database.get_statistics()["total_searches"] == 0
+        next(results)
+        assert database.get_statistics()["total_searches"] == 3
+
+        list(results)
+        assert database.get_statistics()["total_searches"] == 7
+
+    def test_batch_accepts_callable_engine(self):
+        jobs = [(random_graph(8, 0.5, 0), 3)]
+        result = next(run_search_batch(jobs, engine=numpy_clique_search, max_workers=1))
+        assert result["steps"] == numpy_clique_search(jobs[0][0], 3)[1]
+
+
+class TestGraphEncoding:
+
+    @pytest.mark.parametrize("n", [0, 1, 2, 7, 8, 9, 40])
+    def test_round_trip(self, n):
+        graph = random_graph(n, 0.5, n)
+        graph_format, blob = encode_graph_matrix(graph)
+        assert decode_graph_matrix(blob, graph_format, n) == graph
+
+    def test_packed_size(self):
+        graph = random_graph(100, 0.5, 1)
+        graph_format, blob = encode_graph_matrix(graph, compress=False)
+        assert graph_format == GRAPH_FORMAT_PACKED
+        assert len(blob) == (100 * 99 // 2 + 7) // 8
+
+    def test_compression_only_when_smaller(self):
+        sparse = [[0] * 60 for _ in range(60)]
+        assert encode_graph_matrix(sparse)[0] == GRAPH_FORMAT_PACKED_ZLIB
+        assert encode_graph_matrix(random_graph(60, 0.5, 2))[0] == GRAPH_FORMAT_PACKED
+
+    def test_decode_json(self):
+        graph = [[0, 1], [1, 0]]
+        assert decode_graph_matrix(json.dumps(graph), GRAPH_FORMAT_JSON, 2) == graph
+
+    @pytest.mark.parametrize("n, density", [(0, 0.5), (1, 0.5), (9, 0.5), (40, 0.1)])
+    def test_decode_sparse(self, n, density):
+        graph = random_graph(n, density, 5)
+        graph_format, blob = encode_graph_matrix(graph)
+        decoded = decode_sparse_graph(blob, graph_format, n)
+        assert isinstance(decoded, SparseGraph)
+        assert decoded.to_matrix() == graph
+        assert (
+            decode_sparse_graph(json.dumps(graph), GRAPH_FORMAT_JSON, n).to_matrix()
+            == graph
+        )
+
+    def test_database_round_trip(self, tmp_path):
+        database = CliqueDatabase(str(tmp_path / "encoded.db"))
+        graph = random_graph(12, 0.5, 3)
+
+        session_id = database.save_search_result(graph, 3, True, [0, 1, 2], 5, 0.1)
+        assert database.get_session_by_id(session_id)["graph_matrix"] == graph
+
+        state = resumable_clique_search(graph, 5, max_steps=3)[3]
+        checkpoint_id = database.save_checkpoint(np.array(graph), 5, state, 0.1)
+        assert database.get_checkpoint(checkpoint_id)["graph_matrix"] == graph
+
+    def test_migrates_legacy_rows(self, tmp_path):
+        path = str(tmp_path / "legacy.db")
+        graph = random_graph(10, 0.5, 4)
+        connection = sqlite3.connect(path)
+        connection.execute(
+            """
+            CREATE TABLE search_sessions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+                graph_vertices INTEGER NOT NULL,
+                target_k INTEGER NOT NULL,
+                found_clique BOOLEAN NOT NULL,
+                clique_vertices TEXT,
+                steps INTEGER NOT NULL,
+                execution_time REAL NOT NULL,
+                graph_matrix TEXT NOT NULL
+            )
+        """
+        )
+        for _ in range(3):
+            connection.execute(
+                """
+                INSERT INTO search_sessions
+                (graph_vertices, target_k, found_clique, clique_vertices, steps, execution_time, graph_matrix)
+                VALUES (10, 3, 0, NULL, 1, 0.1, ?)
+            """,
+                (json.dumps(graph),),
+            )
+        connection.commit()
+        connection.close()
+
+        database = CliqueDatabase(path)
+        assert database.get_session_by_id(1)["graph_matrix"] == graph
+
+        assert database.migrate_graph_matrices(batch_size=2) == 3
+        assert database.migrate_graph_matrices() == 0
+        assert database.get_graph_bounds(graph)["infeasible_k"] == 3
+        for session_id in (1, 2, 3):
+            assert database.get_session_by_id(session_id)["graph_matrix"] == graph
+        database.close()
+
+        connection = sqlite3.connect(path)
+        rows = set(
+            connection.execute("SELECT graph_format, graph_id FROM search_sessions")
+        )
+        graphs = connection.execute("SELECT COUNT(*) FROM graphs").fetchone()[0]
+        connection.close()
+        assert rows == {(GRAPH_FORMAT_SHARED, 1)}
+        assert graphs == 1
+
+
+class TestResultCache:
+
+    def test_graph_hash(self):
+        graph = random_graph(10, 0.5, 0)
+        assert graph_hash(graph) == graph_hash(np.array(graph))
+        assert graph_hash([[0] * 8 for _ in range(8)]) != graph_hash(
+            [[0] * 9 for _ in range(9)]
+        )
+        graph[0][1] = graph[1][0] = 1 - graph[0][1]
+        assert graph_hash(graph) != graph_hash(random_graph(10, 0.5, 0))
+
+    def test_lookup_after_save(self, tmp_path):
+        path = str(tmp_path / "cache.db")
+        database = CliqueDatabase(path)
+        graph = random_graph(10, 0.5, 1)
+
+        assert database.find_cached_result(graph, 3) is None
+        session_id = database.save_search_result(graph, 3, True, [0, 2, 5], 42, 0.5)
+        database.save_search_result(graph, 4, False, None, 99, 0.7)
+
+        cached = database.find_cached_result([row[:] for row in graph], 3)
+        assert cached["session_id"] == session_id
+        assert cached["found"] is True
+        assert cached["clique_vertices"] == [0, 2, 5]
+        assert cached["steps"] == 42
+        assert database.find_cached_result(graph, 5)["session_id"] is None
+        database.close()
+
+        # Холодный кэш: результат читается из БД
+        reopened = CliqueDatabase(path)
+        assert reopened.find_cached_result(graph, 4)["steps"] == 99
+        assert reopened.get_session_by_id(session_id)["graph_matrix"] == graph
+
+    def test_graph_stored_once(self, tmp_path):
+        database = CliqueDatabase(str(tmp_path / "graphs.db"))
+        graph = random_graph(10, 0.5, 2)
+        for k in range(1, 6):
+            database.save_search_result(graph, k, False, None, k, 0.1)
+
+        with database._reader() as cursor:
+            cursor.execute("SELECT COUNT(*) FROM graphs")
+            assert cursor.fetchone()[0] == 1
+
+        database.clear_all_data()
+        assert database.find_cached_result(graph, 1) is None
+
+    def test_lru_is_bounded(self, tmp_path):
+        database = CliqueDatabase(str(tmp_path / "lru.db"), cache_size=2)
+        graph = random_graph(6, 0.5, 3)
+        for k in range(1, 5):
+            database.save_search_result(graph, k, False, None, k, 0.1)
+
+        assert len(database._result_cache) == 2
+        assert database.find_cached_result(graph, 1)["steps"] == 1
+
+    def test_batch_reuses_results(self, tmp_path):
+        database = CliqueDatabase(str(tmp_path / "batch_cache.db"))
+        jobs = [(random_graph(10, 0.5, seed), 4) for seed in range(4)]
+
+        first = list(run_search_batch(jobs, max_workers=1, database=database))
+        second = list(run_search_batch(jobs, max_workers=1, database=database))
+
+        assert not any(result["cached"] for result in first)
+        assert all(result["cached"] for result in second)
+        for before, after in zip(first, second):
+            assert after["found"] == before["found"]
+            assert after["steps"] == before["steps"]
+        assert database.get_statistics()["total_searches"] == len(jobs)
+
+    @pytest.mark.parametrize("max_workers", [1, 2])
+    def test_batch_answers_repeated_jobs(self, tmp_path, max_workers):
+        # Повторы внутри пакета не ждут записи в базу и не выполняются заново
+        database = CliqueDatabase(str(tmp_path / "repeats.db"))
+        graph = random_graph(12, 0.5, 8)
+        jobs = [(graph, 4), ([row[:] for row in graph], 4), (graph, 4), (graph, 3)]
+
+        results = sorted(
+            run_search_batch(jobs, max_workers=max_workers, database=database),
+            key=lambda result: result["index"],
+        )
+
+        assert [result["cached"] for result in results] == [False, True, True, False]
+        assert len({result["found"] for result in results[:3]}) == 1
+        assert results[1]["graph"] is jobs[1][0]
+        assert database.get_statistics()["total_searches"] == 2
+
+
+class TestGraphBounds:
+
+    def test_bounds_follow_results(self, tmp_path):
+        path = str(tmp_path / "bounds.db")
+        database = CliqueDatabase(path)
+        graph = random_graph(12, 0.6, 5)
+
+        assert database.get_graph_bounds(graph) == {
+            "best_clique": [],
+            "infeasible_k": None,
+        }
+        database.save_search_result(graph, 3, True, [4, 1, 7], 10, 0.1)
+        database.save_search_result(graph, 7, False, None, 10, 0.1)
+        database.save_search_result(graph, 2, True, [1, 4], 10, 0.1)
+        database.save_search_results_bulk(
+            [
+                {
+                    "graph": graph,
+                    "k": 9,
+                    "found": False,
+                    "clique_vertices": None,
+                    "steps": 1,
+                    "execution_time": 0.1,
+                }
+            ]
+        )
+        database.close()
+
+        bounds = CliqueDatabase(path).get_graph_bounds(graph)
+        assert bounds == {"best_clique": [1, 4, 7], "infeasible_k": 7}
+
+    def test_answers_from_bounds(self, tmp_path):
+        database = CliqueDatabase(str(tmp_path / "answers.db"))
+        graph = random_graph(12, 0.6, 6)
+        found, _, clique = bitset_clique_search(graph, 4)
+        assert found
+        database.record_bounds(graph, clique, 6)
+
+        smaller = database.find_cached_result(graph, 2)
+        assert smaller["found"] and smaller["steps"] == 0
+        assert smaller["clique_vertices"] == clique[:2]
+        assert is_clique(graph, smaller["clique_vertices"])
+
+        assert database.find_cached_result(graph, 8)["found"] is False
+        assert database.find_cached_result(graph, 5) is None
+        # Границы ничего не говорят о k <= 0
+        assert database.find_cached_result(graph, 0) is None
+        assert database.find_cached_result(graph, -1) is None
+
+    def test_bounds_only_tighten(self, tmp_path):
+        database = CliqueDatabase(str(tmp_path / "tighten.db"))
+        graph = [[0, 1, 1], [1, 0, 1], [1, 1, 0]]
+        database.record_bounds(graph, [0, 1, 2], 4)
+        database.record_bounds(graph, [0, 1], 5)
+        assert database.get_graph_bounds(graph) == {
+            "best_clique": [0, 1, 2],
+            "infeasible_k": 4,
+        }
+
+    @pytest.mark.parametrize("seed", range(10))
+    def test_seeded_search(self, seed):
+        graph = random_graph(30, 0.5, seed)
+        for k in range(3, 8):
+            _, _, known = bitset_clique_search(graph, k - 1)
+            expected = bitset_clique_search(graph, k)[0]
+
+            found, steps, clique = bitset_clique_search(graph, k, seed=known)
+
+            assert found == expected
+            if found:
+                assert len(clique) == k and is_clique(graph, clique)
+
+    def test_seed_is_extended_first(self):
+        graph = [[1 if i != j else 0 for j in range(6)] for i in range(6)]
+        graph[0][5] = graph[5][0] = 0
+        found, steps, clique = bitset_clique_search(graph, 5, seed=[1, 2, 3, 4])
+        assert found and steps == 2
+        assert is_clique(graph, clique)
+
+    def test_invalid_seed_ignored(self):
+        graph = [[0, 1, 0, 0], [1, 0, 1, 0], [0, 1, 0, 1], [0, 0, 1, 0]]
+        assert bitset_clique_search(graph, 3, seed=[0, 2]) == (False, 1, [])
+        found, _, clique = bitset_clique_search(graph, 2, seed=[0, 2])
+        assert found and is_clique(graph, clique)
+
+
+class TestHistoryPages:
+
+    @pytest.fixture
+    def database(self, tmp_path):
+        database = CliqueDatabase(str(tmp_path / "history.db"))
+        for i in range(25):
+            n = 4 + i % 3
+            graph = random_graph(n, 0.5, i)
+            database.save_search_result(graph, 2 + i % 2, i % 4 == 0, None, i, 0.1)
+        # Часть записей с одинаковым временем: порядок задает id
+        with database.transaction() as cursor:
+            cursor.execute(
+                "UPDATE search_sessions SET timestamp = '2024-01-01 00:00:00' WHERE id <= 10"
+            )
+        return database
+
+    def collect(self, database, page_size, **filters):
+        sessions, before = [], None
+        while True:
+            page = database.get_sessions_page(page_size, before=before, **filters)
+            sessions.extend(page)
+            if len(page) < page_size:
+                return sessions
+            before = (page[-1]["timestamp"], page[-1]["id"])
+
+    def test_pages_cover_history(self, database):
+        sessions = self.collect(database, 4)
+        assert [s["id"] for s in sessions] == list(range(25, 0, -1))
+
+    def test_filters(self, database):
+        sessions = self.collect(database, 3, vertices=5, k=2)
+        assert sessions
+        assert all(s["graph_vertices"] == 5 and s["target_k"] == 2 for s in sessions)
+        assert len(sessions) == sum(1 for i in range(25) if i % 3 == 1 and i % 2 == 0)
+
+        found = self.collect(database, 3, found=True)
+        assert [s["id"] for s in found] == [i + 1 for i in range(24, -1, -4)]
+
+    def test_newer_than(self, database):
+        newest = database.get_sessions_page(1)[0]
+        assert (
+            database.get_sessions_page(after=(newest["timestamp"], newest["id"])) == []
+        )
+
+        database.save_search_result([[0, 1], [1, 0]], 2, True, [0, 1], 1, 0.1)
+        newer = database.get_sessions_page(after=(newest["timestamp"], newest["id"]))
+        assert [s["id"] for s in newer] == [26]
+
+    def test_newer_pages_have_no_gaps(self, database):
+        # Новых записей больше, чем помещается на страницу: страницы after
+        # идут от ключа к новым записям и ничего не пропускают
+        newest = database.get_sessions_page(1)[0]
+        after = (newest["timestamp"], newest["id"])
+        for i in range(7):
+            database.save_search_result([[0, 1], [1, 0]], 2, True, [0, 1], i, 0.1)
+
+        ids = []
+        while True:
+            page = database.get_sessions_page(3, after=after)
+            ids.extend(s["id"] for s in page)
+            if len(page) < 3:
+                break
+            after = (page[-1]["timestamp"], page[-1]["id"])
+        assert ids == list(range(26, 33))
+
+    def test_uses_timestamp_index(self, database):
+        with database._reader() as cursor:
+            cursor.execute(
+                """
+                EXPLAIN QUERY PLAN SELECT id FROM search_sessions
+                WHERE (timestamp, id) < ('2030-01-01', 1)
+                ORDER BY timestamp DESC, id DESC LIMIT 10
+            """
+            )
+            plan = " ".join(row[-1] for row in cursor.fetchall())
+        assert "idx_sessions_timestamp" in plan
+        assert "TEMP B-TREE" not in plan
+
+
+class TestStatisticsSummary:
+
+    def test_sketch_quantiles(self):
+        rng = np.random.default_rng(0)
+        values = rng.lognormal(-5, 2, 10000)
+        sketch = LatencySketch()
+        for value in values:
+            sketch.add(value)
+
+        ordered = np.sort(values)
+        for q in (0.0, 0.5, 0.9, 0.99, 1.0):
+            exact = ordered[int(q * (len(values) - 1))]
+            assert abs(sketch.quantile(q) - exact) <= 0.01 * exact
+
+    def test_sketch_merge_and_json(self):
+        first, second, both = LatencySketch(), LatencySketch(), LatencySketch()
+        for i in range(100):
+            (first if i % 2 else second).add(i / 100)
+            both.add(i / 100)
+
+        first.merge(LatencySketch.from_json(second.to_json()))
+        assert first.counts == both.counts
+        assert first.count == 100 and first.zero_count == 1
+        assert first.quantile(0.5) == both.quantile(0.5)
+        assert LatencySketch().quantile(0.5) == 0.0
+
+    def test_summary_matches_sessions(self, tmp_path):
+        database = CliqueDatabase(str(tmp_path / "summary.db"))
+        rng = np.random.default_rng(1)
+        rows = []
+        for i in range(60):
+            n, k = 5 + i % 2, 2 + i % 3
+            row = (n, k, i % 4 == 0, int(rng.integers(1000)), float(rng.random()))
+            rows.append(row)
+            if i < 20:
+                database.save_search_result(
+                    random_graph(n, 0.5, i), k, row[2], None, row[3], row[4]
+                )
+        database.save_search_results_bulk(
+            {
+                "graph": random_graph(n, 0.5, i),
+                "k": k,
+                "found": found,
+                "clique_vertices": None,
+                "steps": steps,
+                "execution_time": execution_time,
+            }
+            for i, (n, k, found, steps, execution_time) in enumerate(rows)
+            if i >= 20
+        )
+
+        stats = database.get_statistics()
+        assert stats["total_searches"] == 60
+        assert stats["successful_searches"] == 15
+        assert stats["avg_steps"] == pytest.approx(np.mean([r[3] for r in rows]))
+        assert stats["max_time"] == max(r[4] for r in rows)
+        median = np.sort([r[4] for r in rows])[29]
+        assert stats["p50_time"] == pytest.approx(median, rel=0.01)
+
+        buckets = database.get_bucket_statistics()
+        assert [(b["graph_vertices"], b["target_k"]) for b in buckets] == sorted(
+            {(r[0], r[1]) for r in rows}
+        )
+        for bucket in buckets:
+            same = [
+                r
+                for r in rows
+                if (r[0], r[1]) == (bucket["graph_vertices"], bucket["target_k"])
+            ]
+            assert bucket["total_searches"] == len(same)
+            assert bucket["max_steps"] == max(r[3] for r in same)
+
+        database.clear_all_data()
+        assert database.get_statistics()["total_searches"] == 0
+        assert database.get_bucket_statistics() == []
+
+    def test_summary_rebuilt_for_old_database(self, tmp_path):
+        path = str(tmp_path / "old_summary.db")
+        database = CliqueDatabase(path)
+        for steps in (3, 5, 10):
+            database.save_search_result([[0, 1], [1, 0]], 2, True, [0, 1], steps, 0.1)
+        with database.transaction() as cursor:
+            cursor.execute("DROP TABLE search_summary")
+        database.close()
+
+        stats = CliqueDatabase(path).get_statistics()
+        assert stats["total_searches"] == 3
+        assert stats["max_steps"] == 10
+        assert stats["avg_steps"] == 6
+
+    def test_empty_graph_bucket_is_not_the_total(self, tmp_path):
+        # Максимальная клика пустого графа сохраняется с k = 0
+        database = CliqueDatabase(str(tmp_path / "empty_bucket.db"))
+        database.save_search_result([], 0, False, None, 0, 0.1)
+        database.save_search_result([[0, 1], [1, 0]], 2, True, [0, 1], 1, 0.1)
+
+        assert database.get_statistics()["total_searches"] == 2
+        buckets = database.get_bucket_statistics()
+        assert [(b["graph_vertices"], b["target_k"]) for b in buckets] == [
+            (0, 0),
+            (2, 2),
+        ]
+        assert buckets[0]["total_searches"] == 1
+
+    def test_summary_rebuilt_for_old_total_key(self, tmp_path):
+        # Итоги под прежним ключом (0, 0) пересчитываются при открытии
+        path = str(tmp_path / "old_total.db")
+        database = CliqueDatabase(path)
+        database.save_search_result([], 0, False, None, 0, 0.1)
+        database.save_search_result([[0, 1], [1, 0]], 2, True, [0, 1], 1, 0.1)
+        with database.transaction() as cursor:
+            cursor.execute(
+                "DELETE FROM search_summary WHERE graph_vertices = 0 AND total = 1"
+            )
+            cursor.execute(
+                "UPDATE search_summary SET graph_vertices = 0, target_k = 0, total = 3 "
+                "WHERE graph_vertices = -1"
+            )
+        database.close()
+
+        reopened = CliqueDatabase(path)
+        assert reopened.get_statistics()["total_searches"] == 2
+        assert len(reopened.get_bucket_statistics()) == 2
+
+
+class TestInstrumentation:
+
+    def test_samples(self):
+        graph = random_graph(30, 0.5, 0)
+        with SamplingTracer(interval=50) as sampler:
+            found, steps, clique, _ = resumable_clique_search(graph, 7, tracer=sampler)
+
+        assert not tracemalloc.is_tracing()
+        sample_steps = [sample[0] for sample in sampler.samples]
+        assert sample_steps[-1] == steps
+        assert all(b - a >= 50 for a, b in zip(sample_steps, sample_steps[1:-1]))
+        assert len(sampler.samples) >= steps // 50
+        elapsed = [sample[1] for sample in sampler.samples]
+        assert elapsed == sorted(elapsed)
+        assert all(sample[2] > 0 for sample in sampler.samples)
+        assert all(0 <= sample[3] <= 7 for sample in sampler.samples)
+
+    def test_forwards_events(self):
+        graph = random_graph(8, 0.5, 1)
+        expected, forwarded = [], []
+        resumable_clique_search(
+            graph, 3, log_function=lambda message, tag=None: expected.append(message)
+        )
+
+        tracer = LogTracer(lambda message, tag=None: forwarded.append(message))
+        with SamplingTracer(10, trace_memory=False, tracer=tracer) as sampler:
+            resumable_clique_search(graph, 3, tracer=sampler)
+
+        assert forwarded == expected
+        assert all(sample[2] == 0 for sample in sampler.samples)
+
+    def test_samples_saved_with_session(self, tmp_path):
+        database = CliqueDatabase(str(tmp_path / "samples.db"))
+        samples = [(0, 0.0, 100, 0), (10, 0.5, 200, 2), (20, 1.0, 150, 1)]
+
+        session_id = database.save_search_result(
+            [[0, 1], [1, 0]], 2, True, [0, 1], 20, 1.0, samples=samples
+        )
+        database.save_search_result([[0, 1], [1, 0]], 1, True, [0], 1, 0.1)
+        database.save_search_results_bulk(
+            [
+                {
+                    "graph": [[0]],
+                    "k": 1,
+                    "found": True,
+                    "clique_vertices": [0],
+                    "steps": 5,
+                    "execution_time": 0.1,
+                    "samples": samples[:2],
+                }
+            ]
+        )
+
+        assert database.get_performance_samples(session_id) == samples
+        assert [s["id"] for s in database.get_instrumented_sessions()] == [
+            session_id + 2,
+            session_id,
+        ]
+
+        database.clear_all_data()
+        assert database.get_performance_samples(session_id) == []
+
+
+class TestBenchmarks:
+
+    def test_moon_moser(self):
+        graph = moon_moser_graph(9)
+        cliques = find_all_maximal_cliques(graph)
+        assert len(cliques) == 3**3
+        assert all(len(clique) == 3 for clique in cliques)
+        with pytest.raises(ValueError):
+            moon_moser_graph(10)
+
+    def test_multipartite_clique_number(self):
+        graph = complete_multipartite_graph([1, 2, 3, 4])
+        assert len(graph) == 10
+        assert len(find_maximum_clique(graph)[2]) == 4
+
+    def test_dimacs_like_graphs(self):
+        graph = hidden_clique_graph(40, 0.3, 8, seed=1)
+        assert graph == [list(row) for row in zip(*graph)]
+        assert bitset_clique_search(graph, 8)[0]
+
+        graph = p_hat_graph(30, 0.2, 0.8, seed=1)
+        assert graph == [list(row) for row in zip(*graph)]
+        assert all(graph[i][i] == 0 for i in range(30))
+
+    def test_run_and_compare(self):
+        results = run_benchmarks(QUICK_SUITE, ("bitset", "iterative"), repeat=2)
+        assert len(results) == 2 * sum(len(k_values) for _, _, k_values in QUICK_SUITE)
+        for result in results:
+            assert result["repeat"] == 2
+            assert result["min_time"] <= result["median_time"]
+            assert result["steps_per_sec"] > 0
+        json.loads(json.dumps(results))
+
+        slower = [
+            dict(result, median_time=result["median_time"] * 2) for result in results
+        ]
+        report = compare_results(results, slower)
+        assert len(report) == len(results)
+        assert all(
+            entry["regression"] and not entry["steps_changed"] for entry in report
+        )
+        assert not any(
+            entry["regression"] for entry in compare_results(results, results)
+        )
+
+
+def write_dimacs(path, graph):
+    edges = [
+        (i, j)
+        for i in range(len(graph))
+        for j in range(i + 1, len(graph))
+        if graph[i][j]
+    ]
+    with open(path, "w") as file:
+        file.write("c случайный граф\n")
+        file.write(f"p edge {len(graph)} {len(edges)}\n")
+        file.writelines(f"e {i + 1} {j + 1}\n" for i, j in edges)
+
+
+class TestGraphLoading:
+
+    def test_dimacs_file(self, tmp_path):
+        graph = random_graph(40, 0.5, 0)
+        path = tmp_path / "graph.clq"
+        write_dimacs(path, graph)
+
+        loaded = load_graph(str(path))
+        assert isinstance(loaded, BitsetGraph)
+        assert loaded.to_matrix() == graph
+        assert loaded.edge_count() == sum(map(sum, graph)) // 2
+
+    def test_isolated_trailing_vertices(self):
+        loaded = load_graph(io.BytesIO(b"p edge 5 1\ne 1 2\n"))
+        assert len(loaded) == 5
+        assert loaded.adjacency == [0b10, 0b1, 0, 0, 0]
+
+    def test_edge_list(self):
+        data = b"# comment\n0 1\n1 2 7\n\n% other comment\n2 0\n3 4\n"
+        loaded = load_graph(io.BytesIO(data))
+        assert len(loaded) == 5
+        assert loaded.edge_count() == 4
+        assert is_clique(loaded, [0, 1, 2])
+        assert not is_clique(loaded, [2, 3])
+
+    @pytest.mark.parametrize(
+        "data",
+        [
+            b"011\n101\n110\n",
+            b"0 1 1\n1 0 1\n1 1 0\n",
+            b"0,1,1\n1,0,1\n1,1,0\n",
+            # Несимметричная матрица с петлей симметризуется
+            b"111\n001\n100\n",
+        ],
+    )
+    def test_matrix(self, data):
+        assert load_graph(io.BytesIO(data)).to_matrix() == [
+            [0, 1, 1],
+            [1, 0, 1],
+            [1, 1, 0],
+        ]
+
+    def test_explicit_format(self, tmp_path):
+        path = tmp_path / "tiny.txt"
+        path.write_bytes(b"01\n10\n")
+        # Две цифры без формата не отличить от ребра
+        with pytest.raises(ValueError):
+            load_graph(str(path))
+        assert load_graph(str(path), "matrix").to_matrix() == [[0, 1], [1, 0]]
+
+    def test_empty_file(self, tmp_path):
+        path = tmp_path / "empty.clq"
+        path.write_bytes(b"")
+        assert len(load_graph(str(path))) == 0
+
+    @pytest.mark.parametrize(
+        "data, graph_format",
+        [
+            (b"p edge 3 1\nx 1 2\n", None),
+            (b"p edge\ne 1 2\n", None),
+            (b"p edge x 1\ne 1 2\n", None),
+            (b"p edge 3 1\ne 1\n", None),
+            (b"0 1\n5\n", None),
+            (b"011\n1x1\n", "matrix"),
+            (b"0110\n1010\n1100\n", "matrix"),
+            (b"0 1\n", "graphml"),
+        ],
+    )
+    def test_invalid_input(self, data, graph_format):
+        with pytest.raises(ValueError):
+            load_graph(io.BytesIO(data), graph_format)
+
+    def test_engines_accept_bitset_graph(self, tmp_path):
+        graph = random_graph(25, 0.5, 3)
+        loaded = BitsetGraph(graph_to_bitsets(graph))
+
+        assert (as_adjacency_matrix(loaded) == np.array(graph)).all()
+        for k in (3, 5, 7):
+            expected = iterative_clique_search(graph, k, [], 0, [0])
+            assert iterative_clique_search(loaded, k, [], 0, [0]) == expected
+            assert backtracking_clique_search(loaded, k, [], 0, [0]) == expected
+            assert numpy_clique_search(loaded, k) == expected
+            assert bitset_clique_search(loaded, k) == bitset_clique_search(graph, k)
+
+        database = CliqueDatabase(str(tmp_path / "loaded.db"))
+        session_id = database.save_search_result(loaded, 3, False, None, 1, 0.1)
+        assert database.get_session_by_id(session_id)["graph_matrix"] == graph
+        assert database.find_cached_result(graph, 3)["session_id"] == session_id
+
+
+class TestSparseGraph:
+
+    def test_from_edges(self):
+        # Петли и повторные ребра отбрасываются, соседи упорядочены
+        graph = SparseGraph.from_edges(5, [0, 1, 2, 1, 1, 0, 3, 3, 4, 0])
+        assert len(graph) == 5
+        assert graph.edge_count() == 3
+        assert graph.neighbours(0).tolist() == [1, 4]
+        assert graph.neighbours(3).tolist() == []
+        assert graph.has_edge(1, 2) and not graph.has_edge(2, 3)
+        assert graph[0][4] == 1 and graph[0][2] == 0
+        assert graph.to_matrix() == BitsetGraph(graph.to_bitsets()).to_matrix()
+
+    def test_core_decomposition(self):
+        # Клика из 4 вершин с «хвостом» из двух вершин
+        graph = SparseGraph.from_edges(
+            6, [0, 1, 0, 2, 0, 3, 1, 2, 1, 3, 2, 3, 3, 4, 4, 5]
+        )
+        order, core = sparse_core_decomposition(graph)
+        assert core == [3, 3, 3, 3, 1, 1]
+        assert sorted(order) == list(range(6))
+        assert set(order[:2]) == {4, 5}
+
+    @pytest.mark.parametrize("seed", range(5))
+    def test_matches_bitset_search(self, seed):
+        graph = random_graph(30, 0.3 + 0.1 * seed, seed)
+        sparse = SparseGraph.from_graph(graph)
+        best = len(find_maximum_clique(graph)[2])
+
+        for k in range(best + 2):
+            found, _, clique = sparse_clique_search(sparse, k)
+            assert found == (k <= best)
+            if found:
+                assert len(clique) == k
+                assert is_clique(graph, clique) and is_clique(sparse, clique)
+            assert bitset_clique_search(sparse, k)[0] == found
+            assert backtracking_clique_search(sparse, k, [], 0, [0])[0] == found
+
+    def test_seed_and_stats(self):
+        graph = random_graph(40, 0.5, 4)
+        sparse = SparseGraph.from_graph(graph)
+        maximum = find_maximum_clique(graph)[2]
+        k = len(maximum)
+
+        stats = {}
+        found, steps, clique = bitset_clique_search(sparse, k, stats, seed=maximum[:-1])
+        assert found and is_clique(graph, clique)
+        assert stats["steps"] == steps
+        assert stats["degeneracy"] >= k - 1
+        assert sparse_clique_search(sparse, k + 1, seed=maximum)[0] is False
+
+    def test_should_stop(self):
+        sparse = SparseGraph.from_graph(moon_moser_graph(24))
+        with pytest.raises(SearchCancelled):
+            sparse_clique_search(sparse, 9, should_stop=lambda: True)
+
+    def test_large_sparse_graph(self):
+        # 20 000 вершин: маски и матрица n x n не строятся
+        n = 20000
+        endpoints = [(vertex, (vertex + 1) % n) for vertex in range(n)]
+        endpoints += [(0, 2), (1, 3), (0, 3)]
+        graph = SparseGraph.from_edges(n, np.array(endpoints).ravel())
+
+        found, steps, clique = sparse_clique_search(graph, 4)
+        assert found and clique == [0, 1, 2, 3]
+        assert steps <= 5
+        assert sparse_clique_search(graph, 5)[0] is False
+        assert is_clique(graph, [0, 1, 2, 3])
+        assert graph._bitsets is None
+
+    def test_load_and_store(self, tmp_path):
+        graph = random_graph(40, 0.5, 5)
+        path = tmp_path / "graph.clq"
+        write_dimacs(path, graph)
+
+        loaded = load_graph(str(path), sparse=True)
+        assert isinstance(loaded, SparseGraph)
+        assert loaded.to_matrix() == graph
+        assert load_graph(io.BytesIO(b"011\n101\n110\n"), sparse=True).edge_count() == 3
+
+        assert graph_hash(loaded) == graph_hash(graph)
+        assert encode_graph_matrix(loaded) == encode_graph_matrix(graph)
+        database = CliqueDatabase(str(tmp_path / "sparse.db"))
+        session_id = database.save_search_result(loaded, 3, False, None, 1, 0.1)
+        assert database.find_cached_result(graph, 3)["session_id"] == session_id
+
+        # Детали сессии для истории обходятся без плотной матрицы
+        details = database.get_session_by_id(session_id, include_graph=False)
+        assert "graph_matrix" not in details
+        assert details["graph_vertices"] == 40 and details["target_k"] == 3
+        assert database.get_session_by_id(session_id)["graph_matrix"] == graph
+
+
+class TestStartup:
+
+    @pytest.mark.parametrize("module", ["clique_app", "main"])
+    def test_import_defers_heavy_modules(self, module):
+        result = measure_import_time(module, repeat=1)
+        assert result["loaded"] == []
+        assert result["median_time"] < 1.0
+
+    def test_database_created_on_first_use(self, tmp_path, monkeypatch):
+        path = str(tmp_path / "env.db")
+        monkeypatch.setenv("CLIQUE_DB_PATH", path)
+        monkeypatch.setattr(clique_app, "_database", None)
+
+        database = clique_app.db
+        assert database.db_path == path
+        assert get_database() is database
+        assert not os.path.exists(path)
+
+        database.get_all_sessions()
+        assert os.path.exists(path)
+        with pytest.raises(AttributeError):
+            clique_app.missing_name
+
+
+def run_cli(argv, stdin=""):
+    output = io.StringIO()
+    code = cli.main(argv, output, io.StringIO(stdin))
+    return code, [json.loads(line) for line in output.getvalue().splitlines()]
+
+
+class TestCommandLine:
+
+    @pytest.fixture
+    def graph_file(self, tmp_path):
+        graph = random_graph(30, 0.5, 6)
+        path = tmp_path / "graph.clq"
+        write_dimacs(path, graph)
+        return graph, str(path)
+
+    @pytest.mark.parametrize("engine", ["bitset", "backtracking", "sparse"])
+    def test_solve(self, graph_file, engine):
+        graph, path = graph_file
+        best = len(find_maximum_clique(graph)[2])
+
+        code, (result,) = run_cli(["solve", path, "-k", str(best), "--engine", engine])
+        assert code == 0
+        assert result["found"] and len(result["clique"]) == best
+        assert is_clique(graph, result["clique"])
+        assert not result["cached"] and not result["timed_out"]
+
+        _, (result,) = run_cli(["solve", path, "-k", str(best + 1), "--engine", engine])
+        assert result["found"] is False
+
+    def test_database_persistence(self, graph_file, tmp_path):
+        graph, path = graph_file
+        db_path = str(tmp_path / "cli.db")
+        _, (maximum,) = run_cli(["max", path, "--db", db_path])
+        assert maximum["found"] and maximum["k"] == len(maximum["clique"])
+
+        # Ответы следуют из записанных границ, поиск не выполняется
+        for k in (maximum["k"], maximum["k"] + 1):
+            _, (result,) = run_cli(["solve", path, "-k", str(k), "--db", db_path])
+            assert result["cached"] and result["found"] == (k == maximum["k"])
+        assert CliqueDatabase(db_path).get_statistics()["total_searches"] == 0
+
+    def test_time_limit(self, tmp_path):
+        path = tmp_path / "moon_moser.clq"
+        write_dimacs(path, moon_moser_graph(30))
+        db_path = str(tmp_path / "limit.db")
+
+        _, (result,) = run_cli(
+            [
+                "solve",
+                str(path),
+                "-k",
+                "11",
+                "--engine",
+                "iterative",
+                "--time-limit",
+                "1e-9",
+                "--db",
+                db_path,
+            ]
+        )
+        assert result["timed_out"] and not result["found"]
+        # Прерванный поиск не записывается как отрицательный ответ
+        assert (
+            CliqueDatabase(db_path).find_cached_result(moon_moser_graph(30), 11) is None
+        )
+
+        with pytest.raises(SystemExit):
+            run_cli(
+                [
+                    "solve",
+                    str(path),
+                    "-k",
+                    "3",
+                    "--engine",
+                    "numpy",
+                    "--time-limit",
+                    "1",
+                ]
+            )
+
+    def test_maximum_time_limit_keeps_best_clique(self, tmp_path):
+        graph = random_graph(80, 0.8, 0)
+        path = tmp_path / "dense.clq"
+        write_dimacs(path, graph)
+        db_path = str(tmp_path / "maximum.db")
+
+        _, (result,) = run_cli(
+            ["max", str(path), "--time-limit", "1e-9", "--db", db_path]
+        )
+        assert result["timed_out"] and result["found"]
+        assert result["k"] == len(result["clique"])
+        assert is_clique(graph, result["clique"])
+
+        # Записана только найденная клика, но не недостижимость k + 1
+        bounds = CliqueDatabase(db_path).get_graph_bounds(graph)
+        assert bounds == {"best_clique": result["clique"], "infeasible_k": None}
+
+    def test_malformed_graph_file(self, tmp_path):
+        # Ошибка в файле — сообщение, а не трассировка; пакет продолжается
+        path = tmp_path / "bad.clq"
+        path.write_bytes(b"p edge\ne 1 2\n")
+        with pytest.raises(SystemExit) as error:
+            run_cli(["solve", str(path), "-k", "2"])
+        assert "bad.clq" in str(error.value.code)
+
+        jobs = [
+            json.dumps({"k": 2, "path": str(path)}),
+            json.dumps({"k": 2, "graph": [[0, 1], [1, 0]]}),
+        ]
+        code, lines = run_cli(["batch"], "\n".join(jobs) + "\n")
+        assert code == 1
+        assert "error" in lines[0] and lines[1]["found"]
+
+    def test_rejects_bad_k(self, graph_file):
+        _, path = graph_file
+        for time_limit in ("0", "-1", "nan", "inf"):
+            with pytest.raises(SystemExit):
+                run_cli(["max", path, "--time-limit", time_limit])
+        with pytest.raises(SystemExit):
+            run_cli(["solve", path, "-k", "-3"])
+        with pytest.raises(SystemExit):
+            run_cli(["solve", path, "-k", "0", "--db"])
+
+    def test_solve_writes_trace(self, graph_file, tmp_path):
+        graph, path = graph_file
+        trace_path = tmp_path / "search.trace"
+        _, (result,) = run_cli(
+            [
+                "solve",
+                path,
+                "-k",
+                "4",
+                "--engine",
+                "iterative",
+                "--trace",
+                str(trace_path),
+            ]
+        )
+        assert result["found"] and is_clique(graph, result["clique"])
+
+        expected = []
+        backtracking_clique_search(
+            graph, 4, [], 0, [0], lambda m, tag=None: expected.append((m, tag))
+        )
+        replayed = []
+        with open(trace_path, "rb") as trace_file:
+            replay_trace(
+                trace_file, LogTracer(lambda m, tag=None: replayed.append((m, tag)))
+            )
+        assert replayed == expected
+
+        with pytest.raises(SystemExit):
+            run_cli(["solve", path, "-k", "4", "--trace", str(trace_path)])
+
+    def test_batch(self, graph_file):
+        graph, path = graph_file
+        jobs = [
+            json.dumps({"id": "file", "k": 3, "path": path}),
+            json.dumps({"k": 2, "graph": [[0, 1], [1, 0]]}),
+            "",
+            "not json",
+            json.dumps({"id": 5, "k": 3, "graph": [[0, 1], [1, 0]]}),
+            json.dumps({"k": 3, "graph": [[0, 1]]}),
+        ]
+        code, lines = run_cli(["batch"], "\n".join(jobs) + "\n")
+        assert code == 1
+
+        by_line = {line["line"]: line for line in lines}
+        assert by_line[1]["id"] == "file" and by_line[1]["found"]
+        assert is_clique(graph, by_line[1]["clique"])
+        assert by_line[2]["clique"] == [0, 1]
+        assert "error" in by_line[4] and "error" in by_line[6]
+        assert by_line[5]["id"] == 5 and by_line[5]["found"] is False
+        assert len(lines) == 5
+
+    @pytest.mark.parametrize(
+        "job",
+        [
+            {"k": 2, "graph": [[0, "x"], ["x", 0]]},
+            {"k": 2, "graph": [[0, 2], [2, 0]]},
+            {"k": 2, "graph": [[0, 1], [0, 0]]},
+            {"k": 1, "graph": [[1, 0], [0, 0]]},
+            {"k": 0, "graph": [[0, 1], [1, 0]]},
+            {"k": -1, "graph": [[0, 1], [1, 0]]},
+        ],
+    )
+    def test_batch_rejects_malformed_job(self, tmp_path, job):
+        # Ошибка одной строки не прерывает пакет, и база ее не видит
+        jobs = [json.dumps(job), json.dumps({"k": 2, "graph": [[0, 1], [1, 0]]})]
+        code, lines = run_cli(
+            ["batch", "--db", str(tmp_path / "batch.db")], "\n".join(jobs) + "\n"
+        )
+        assert code == 1
+        by_line = {line["line"]: line for line in lines}
+        assert "error" in by_line[1]
+        assert by_line[2]["found"] and by_line[2]["clique"] == [0, 1]
+
+
+class TestSearchServer:
+
+    @pytest.fixture
+    def service(self, tmp_path):
+        # Сервер работает в своем цикле событий в отдельном потоке
+        loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=loop.run_forever, daemon=True)
+        thread.start()
+        graph_dir = tmp_path / "graphs"
+        graph_dir.mkdir()
+        service = clique_server.CliqueServer(
+            CliqueDatabase(str(tmp_path / "server.db")),
+            workers=1,
+            graph_dir=str(graph_dir),
+        )
+        asyncio.run_coroutine_threadsafe(service.start(), loop).result(timeout=10)
+        yield service
+        asyncio.run_coroutine_threadsafe(service.close(), loop).result(timeout=30)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=10)
+        loop.close()
+
+    def request(self, service, method, path, payload=None):
+        data = payload
+        if payload is not None and not isinstance(payload, bytes):
+            data = json.dumps(payload).encode()
+        request = urllib.request.Request(
+            f"http://127.0.0.1:{service.port}{path}", data=data, method=method
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=10) as response:
+                return response.status, json.loads(response.read())
+        except urllib.error.HTTPError as error:
+            return error.code, json.loads(error.read())
+
+    def wait_done(self, service, job_id, timeout=20):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            _, job = self.request(service, "GET", f"/jobs/{job_id}")
+            if job["status"] != "running":
+                return job
+            time.sleep(0.02)
+        raise AssertionError(f"Задание {job_id} не завершилось")
+
+    def test_submit_poll_and_cache(self, service):
+        graph = random_graph(20, 0.5, 7)
+        best = len(find_maximum_clique(graph)[2])
+
+        status, job = self.request(
+            service, "POST", "/jobs", {"graph": graph, "k": best}
+        )
+        assert status == 202 and job["status"] == "running"
+        job = self.wait_done(service, job["id"])
+        assert job["result"]["found"] and is_clique(graph, job["result"]["clique"])
+
+        # Повторный запрос отвечается из базы без поиска
+        status, again = self.request(
+            service, "POST", "/jobs", {"graph": graph, "k": best}
+        )
+        assert status == 200 and again["status"] == "done"
+        assert again["result"]["cached"]
+        assert service.database.get_statistics()["total_searches"] == 1
+
+    def test_graph_file(self, service, tmp_path):
+        graph = random_graph(15, 0.5, 8)
+        path = tmp_path / "graphs" / "graph.clq"
+        write_dimacs(path, graph)
+
+        _, job = self.request(service, "POST", "/jobs", {"path": str(path), "k": 3})
+        job = self.wait_done(service, job["id"])
+        assert is_clique(graph, job["result"]["clique"])
+
+        _, job = self.request(service, "POST", "/jobs", {"path": "graph.clq", "k": 3})
+        assert self.wait_done(service, job["id"])["result"]["cached"]
+
+    def test_graph_file_outside_directory(self, service, tmp_path):
+        secret = tmp_path / "secret.txt"
+        secret.write_text("root:secret-value:20360\n")
+        (tmp_path / "graphs" / "bad.clq").write_text("root:secret-value:20360\n")
+        os.symlink(secret, tmp_path / "graphs" / "link.clq")
+
+        for path in (str(secret), "../secret.txt", "link.clq", "bad.clq", "none"):
+            code, body = self.request(service, "POST", "/jobs", {"path": path, "k": 2})
+            assert code == 400
+            assert "secret-value" not in body["error"]
+
+    def test_graph_file_requires_directory(self, tmp_path):
+        service = clique_server.CliqueServer(CliqueDatabase(str(tmp_path / "x.db")))
+        with pytest.raises(clique_server.HttpError) as error:
+            asyncio.run(service.submit({"path": str(tmp_path / "g.clq"), "k": 2}))
+        assert error.value.status == 400
+
+    def test_coalescing_and_cancel(self, service):
+        # Единственный процесс занят долгим поиском, поэтому следующие
+        # задания ждут в очереди
+        blocker = {
+            "graph": moon_moser_graph(45),
+            "k": 16,
+            "engine": "iterative",
+            "time_limit": 1.0,
+        }
+        _, slow = self.request(service, "POST", "/jobs", blocker)
+
+        query = {"graph": random_graph(12, 0.5, 9), "k": 3}
+        _, first = self.request(service, "POST", "/jobs", query)
+        _, second = self.request(service, "POST", "/jobs", query)
+        assert not first["coalesced"] and second["coalesced"]
+        assert self.request(service, "GET", "/health")[1]["searches"] == 2
+
+        status, cancelled = self.request(service, "DELETE", f"/jobs/{first['id']}")
+        assert status == 200 and cancelled["status"] == "cancelled"
+        assert self.request(service, "DELETE", f"/jobs/{first['id']}")[0] == 409
+
+        # Поиск продолжается ради второго задания
+        assert self.wait_done(service, second["id"])["result"]["found"]
+        slow = self.wait_done(service, slow["id"])
+        assert slow["result"]["timed_out"]
+        assert service.database.get_statistics()["total_searches"] == 1
+
+    def test_cancel_stops_running_search(self, service):
+        # Без бюджета этот поиск шел бы минуты; после отмены процесс
+        # освобождается для следующих заданий
+        blocker = {"graph": moon_moser_graph(45), "k": 16, "engine": "iterative"}
+        _, slow = self.request(service, "POST", "/jobs", blocker)
+        time.sleep(0.3)
+
+        status, cancelled = self.request(service, "DELETE", f"/jobs/{slow['id']}")
+        assert status == 200 and cancelled["status"] == "cancelled"
+
+        graph = random_graph(12, 0.5, 10)
+        _, job = self.request(service, "POST", "/jobs", {"graph": graph, "k": 3})
+        job = self.wait_done(service, job["id"], timeout=5)
+        assert job["status"] == "done"
+        assert self.request(service, "GET", "/health")[1]["searches"] == 0
+        assert service.database.get_statistics()["total_searches"] == 1
+
+    @pytest.mark.parametrize(
+        "method, path, payload, status",
+        [
+            ("POST", "/jobs", b"not json", 400),
+            ("POST", "/jobs", {"graph": [[0, 1]], "k": 2}, 400),
+            ("POST", "/jobs", {"graph": [[0]]}, 400),
+            ("POST", "/jobs", {"graph": [[0, "x"], ["x", 0]], "k": 2}, 400),
+            ("POST", "/jobs", {"graph": [[0, 1], [0, 0]], "k": 2}, 400),
+            ("POST", "/jobs", {"graph": [[0, 1], [1, 0]], "k": -1}, 400),
+            ("POST", "/jobs", {"graph": [[0, 1], [1, 0]], "k": 0}, 400),
+            ("POST", "/jobs", {"graph": [[0, 1], [1, 0]], "k": 3}, 400),
+            (
+                "POST",
+                "/jobs",
+                {"graph": [[0, 1], [1, 0]], "k": 2, "time_limit": "nan"},
+                400,
+            ),
+            (
+                "POST",
+                "/jobs",
+                {"graph": [[0, 1], [1, 0]], "k": 2, "time_limit": "inf"},
+                400,
+            ),
+            (
+                "POST",
+                "/jobs",
+                {"graph": [[0, 1], [1, 0]], "k": 2, "time_limit": 0},
+                400,
+            ),
+            ("POST", "/jobs", {"graph": [[0]], "k": 1, "engine": "magic"}, 400),
+            (
+                "POST",
+                "/jobs",
+                {"graph": [[0]], "k": 1, "engine": "numpy", "time_limit": 1},
+                400,
+            ),
+            ("GET", "/jobs/999", None, 404),
+            ("GET", "/jobs/abc", None, 404),
+            ("GET", "/jobs", None, 405),
+            ("GET", "/missing", None, 404),
+        ],
+    )
+    def test_errors(self, service, method, path, payload, status):
+        code, body = self.request(service, method, path, payload)
+        assert code == status and "error" in body
+
+
 def test_performance_small_graph():
     import time
 